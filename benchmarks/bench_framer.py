@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Line framer benchmark for PyMotion
+Compares the old str-buffer framing in IRCBot.listen with LineFramer
+
+Usage: python benchmarks/bench_framer.py [--size-mb 50] [--file recorded.bin] [--chunk 4096]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pymotion_bot import LineFramer
+
+
+def make_burst(size_bytes: int) -> bytes:
+    """Build a synthetic server burst: NAMES replies, playback and chatter."""
+    rng = random.Random(1234)
+    words = ["hello", "world", "pymotion", "naïve", "café", "日本語", "🎸", "kill", "the", "bot", "lol"]
+    nicks = [f"user{i}" for i in range(2000)]
+    lines = []
+    total = 0
+    while total < size_bytes:
+        kind = rng.random()
+        if kind < 0.2:
+            names = " ".join(rng.choice("@+ ") .strip() + rng.choice(nicks) for _ in range(40))
+            line = f":irc.example.net 353 PyMotion = #big :{names}"
+        elif kind < 0.5:
+            line = (f"@time=2024-01-01T00:00:00.000Z :{rng.choice(nicks)}!u@host PRIVMSG #big "
+                    f":{' '.join(rng.choice(words) for _ in range(12))}")
+        else:
+            line = f":{rng.choice(nicks)}!u@host PRIVMSG #big :{' '.join(rng.choice(words) for _ in range(8))}"
+        encoded = line.encode("utf-8") + b"\r\n"
+        lines.append(encoded)
+        total += len(encoded)
+    return b"".join(lines)
+
+
+def frame_old(data: bytes, chunk: int) -> int:
+    """The framing loop IRCBot.listen used before LineFramer."""
+    count = 0
+    buffer = ""
+    for i in range(0, len(data), chunk):
+        buffer += data[i:i + chunk].decode('utf-8', errors='ignore')
+        lines = buffer.split('\r\n')
+        buffer = lines[-1]
+        for line in lines[:-1]:
+            if line:
+                count += 1
+    return count
+
+
+def frame_new(data: bytes, chunk: int) -> int:
+    count = 0
+    framer = LineFramer()
+    for i in range(0, len(data), chunk):
+        count += len(framer.feed(data[i:i + chunk]))
+    return count
+
+
+def bench(name, fn, data, chunk):
+    start = time.perf_counter()
+    lines = fn(data, chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>12}: {lines:>9} lines in {elapsed:6.3f}s = {lines / elapsed:>12,.0f} lines/sec "
+          f"({len(data) / elapsed / 1e6:,.1f} MB/s)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=50.0, help="synthetic burst size")
+    parser.add_argument("--file", help="recorded raw burst to replay instead of synthetic data")
+    parser.add_argument("--chunk", type=int, default=4096, help="bytes per simulated socket read")
+    args = parser.parse_args()
+
+    if args.file:
+        data = Path(args.file).read_bytes()
+    else:
+        data = make_burst(int(args.size_mb * 1024 * 1024))
+    print(f"Framing {len(data) / 1e6:.1f} MB in {args.chunk}-byte reads")
+
+    old = bench("str split", frame_old, data, args.chunk)
+    new = bench("LineFramer", frame_new, data, args.chunk)
+    if old != new:
+        print(f"note: line counts differ ({old} vs {new}); the old framer drops bytes of "
+              f"UTF-8 sequences split across reads and ignores bare-LF lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Per-channel dispatch lane benchmark for PyMotion
+Floods #busy through the local fake server while a slow plugin (standing in
+for an AI call or an await-heavy handler) works through it, pings #quiet at a
+steady rate, and reports reply latency for the #quiet pings: once with a
+single in-order dispatcher (inbound_queue.lanes = 0) and once with lanes.
+
+Usage: python benchmarks/bench_lanes.py [--seconds 5] [--flood-rate 400] [--handler-ms 5] [--ping-every 0.05]
+
+Latency is measured from the ping leaving the server to the reply arriving
+back, so it includes framing, queueing, dispatch and the writer.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from pymotion_bot import LatencyHistogram, PyMotion
+from fake_ircd import FakeIRCServer
+
+
+class SlowHandler:
+    """Spends handler_ms awaiting on every #busy line."""
+    name, priority, enabled = "slow", 90, True
+
+    def __init__(self, handler_ms: float):
+        self.delay = handler_ms / 1000
+
+    async def handle_message(self, bot, nick, channel, message):
+        if channel == "#busy":
+            await asyncio.sleep(self.delay)
+            return True
+        return False
+
+
+class Pong:
+    name, priority, enabled = "pong", 50, True
+
+    async def handle_message(self, bot, nick, channel, message):
+        if message.startswith("ping "):
+            await bot.privmsg(channel, "pong " + message[5:])
+            return True
+        return False
+
+
+async def wait_until(predicate, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("benchmark stalled")
+        await asyncio.sleep(0.005)
+
+
+async def measure(tmp: Path, lanes: int, args) -> dict:
+    server = await FakeIRCServer().start()
+    config_file = tmp / "pymotion.json"
+    config_file.write_text(json.dumps({
+        "server": "127.0.0.1", "port": server.port, "ssl": False, "nick": "PyMotion",
+        "irc_log_file": "", "log_level": "WARNING", "modes": "", "channels": ["#busy", "#quiet"],
+        "keepalive": {"interval": 0}, "plugins": {"enabled": ["admin"]},
+        "inbound_queue": {"lanes": lanes}, "inbound_flood": {"enabled": False},
+    }))
+    bot = PyMotion(str(config_file))
+    bot.plugins = [SlowHandler(args.handler_ms), Pong()]
+    runner = asyncio.create_task(bot.run())
+    await wait_until(lambda: {"#busy", "#quiet"} <= bot.join_confirmed)
+    bot.flood.adaptive = False
+    bot.flood.rate = bot.flood.burst = bot.flood.tokens = 1e6
+
+    sent_at = {}
+    flood_interval = 1 / args.flood_rate
+    started = time.monotonic()
+    next_ping = started
+    flooded = pings = 0
+    while time.monotonic() - started < args.seconds:
+        now = time.monotonic()
+        due = int((now - started) / flood_interval) - flooded
+        if due > 0:
+            server.send(*(f":f{i % 50}!u@h PRIVMSG #busy :flood line {flooded + i}" for i in range(due)))
+            flooded += due
+        if now >= next_ping:
+            sent_at[pings] = time.monotonic()
+            server.send(f":q!u@h PRIVMSG #quiet :ping {pings}")
+            pings += 1
+            next_ping += args.ping_every
+        await asyncio.sleep(0.001)
+
+    def replies():
+        return [(at, line) for at, line in server.received if line.startswith("PRIVMSG #quiet :pong ")]
+    await wait_until(lambda: len(replies()) >= pings, timeout=args.seconds * 20 + 30)
+
+    latency = LatencyHistogram()
+    for at, line in replies():
+        latency.observe(at - sent_at[int(line.rsplit(" ", 1)[1])])
+    stats = bot.inbound_queue_stats()
+    bot.request_stop()
+    await runner
+    await server.close()
+    return {"latency": latency.snapshot(), "flooded": flooded, "pings": pings,
+            "max_depth": stats["max_depth"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="how long to flood #busy")
+    parser.add_argument("--flood-rate", type=float, default=400.0, help="#busy lines per second")
+    parser.add_argument("--handler-ms", type=float, default=5.0, help="time the slow plugin spends per #busy line")
+    parser.add_argument("--ping-every", type=float, default=0.05, help="seconds between #quiet pings")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        PyMotion._state_file = lambda self: tmp / "bot_state.json"
+        PyMotion._flood_limits_file = lambda self: tmp / "flood_limits.json"
+        results = {lanes: asyncio.run(measure(tmp, lanes, args)) for lanes in (0, 32)}
+
+    print(f"#busy: {args.flood_rate:.0f} lines/s for {args.seconds:.0f}s at {args.handler_ms:.1f} ms each; "
+          f"#quiet: ping every {args.ping_every * 1000:.0f} ms")
+    print(f"{'dispatch':>16} {'pings':>6} {'p50':>10} {'p95':>10} {'p99':>10} {'max depth':>10}")
+    for lanes, label in ((0, "single queue"), (32, "channel lanes")):
+        run = results[lanes]
+        latency = run["latency"]
+        print(f"{label:>16} {run['pings']:>6} " + " ".join(
+            f"{latency[key] * 1000:>8.1f}ms" for key in ("p50", "p95", "p99")) + f" {run['max_depth']:>10,}")
+
+
+if __name__ == "__main__":
+    main()
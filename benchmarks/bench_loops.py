@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Event loop benchmark for PyMotion: stdlib asyncio vs uvloop
+Replays IRC traffic from the local fake server into a full PyMotion (config,
+plugins, registration, joins) and reports, for each loop:
+
+  startup       PyMotion() to registered and joined
+  read+parse    lines/sec framed, parsed and queued by the socket reader
+  dispatch      lines/sec through on_message and the plugin chain (minus
+                plugins that sleep for comic timing)
+  write         lines/sec through the writer task onto the socket
+
+Usage: python benchmarks/bench_loops.py [irc_traffic.log] [--lines 50000] [--writes 50000]
+
+Each loop runs in its own subprocess. uvloop is skipped if not installed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from pymotion_bot import PyMotion, run_with_event_loop
+from bench_parser import load_lines
+from fake_ircd import FakeIRCServer
+
+
+# Plugins that pause for comic timing (asyncio.sleep inside handle_message)
+# would make dispatch measure their sleeps rather than the event loop.
+# Two-phase plugins (match/respond) pause in the background and can stay
+PAUSING_PLUGINS = {"decision"}
+BENCH_PLUGINS = sorted(
+    path.stem for path in (ROOT / "plugins").glob("*.py") if path.stem not in PAUSING_PLUGINS
+)
+
+
+async def wait_until(predicate, timeout: float = 120.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark stalled")
+        await asyncio.sleep(0.001)
+    return time.perf_counter()
+
+
+async def measure(lines: list[str], writes: int) -> dict:
+    server = await FakeIRCServer().start()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        PyMotion._state_file = lambda self: tmp / "bot_state.json"
+        PyMotion._flood_limits_file = lambda self: tmp / "flood_limits.json"
+        config_file = tmp / "pymotion.json"
+        config_file.write_text(json.dumps({
+            "server": "127.0.0.1", "port": server.port, "ssl": False, "nick": "PyMotion",
+            "irc_log_file": "", "log_level": "WARNING", "modes": "", "channels": ["#big"],
+            "keepalive": {"interval": 0}, "plugins": {"enabled": BENCH_PLUGINS},
+            "inbound_flood": {"enabled": False},  # measure the loop, not the limiter's drops
+        }))
+
+        started = time.perf_counter()
+        bot = PyMotion(str(config_file))
+        runner = asyncio.create_task(bot.run())
+        joined = await wait_until(lambda: "#big" in bot.join_confirmed)
+        results = {"startup": joined - started}
+
+        # Inbound: the whole replay as fast as the socket takes it
+        base_enqueued = bot.inbound_stats["enqueued"]
+        base_dispatched = bot.inbound_stats["dispatched"]
+        replay_started = time.perf_counter()
+        server.send(*lines)
+        read = await wait_until(lambda: bot.inbound_stats["enqueued"] - base_enqueued >= len(lines))
+        dispatched = await wait_until(lambda: bot.inbound_stats["dispatched"] - base_dispatched >= len(lines))
+        results["read_parse"] = len(lines) / (read - replay_started)
+        results["dispatch"] = len(lines) / (dispatched - replay_started)
+
+        # Outbound: lift the flood limit and time the writer alone
+        bot.flood.adaptive = False
+        bot.flood.rate = bot.flood.burst = bot.flood.tokens = float(writes * 10)
+        before = len(server.received)
+        write_started = time.perf_counter()
+        for i in range(writes):
+            bot.queue_line(f"PRIVMSG #big :benchmark line {i}")
+        written = await wait_until(lambda: len(server.received) - before >= writes)
+        results["write"] = writes / (written - write_started)
+
+        bot.request_stop()
+        await runner
+    await server.close()
+    return results
+
+
+def child(args):
+    logging.disable(logging.CRITICAL)
+    lines = load_lines(args.log)
+    if args.lines:
+        lines = (lines * (args.lines // max(1, len(lines)) + 1))[:args.lines]
+    results = run_with_event_loop(measure(lines, args.writes), args.child)
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", nargs="?", help="recorded irc_traffic.log or raw capture")
+    parser.add_argument("--lines", type=int, default=50000, help="replay this many lines (repeats the log)")
+    parser.add_argument("--writes", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    loops = ["asyncio"]
+    try:
+        import uvloop  # noqa: F401
+        loops.append("uvloop")
+    except ImportError:
+        print("uvloop not installed; measuring asyncio only")
+
+    print(f"{args.lines:,} replayed lines, {args.writes:,} written lines, best of {args.repeat}")
+    print(f"{'loop':>8} {'startup':>10} {'read+parse/s':>14} {'dispatch/s':>12} {'write/s':>12}")
+    for loop in loops:
+        best = {}
+        for _ in range(args.repeat):
+            cmd = [sys.executable, __file__, "--child", loop, "--lines", str(args.lines),
+                   "--writes", str(args.writes)] + ([args.log] if args.log else [])
+            run = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+            best["startup"] = min(best.get("startup", float("inf")), run["startup"])
+            for key in ("read_parse", "dispatch", "write"):
+                best[key] = max(best.get(key, 0.0), run[key])
+        print(f"{loop:>8} {best['startup'] * 1000:>8.1f}ms {best['read_parse']:>14,.0f} "
+              f"{best['dispatch']:>12,.0f} {best['write']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
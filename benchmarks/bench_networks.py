@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Memory cost of extra IRC networks for PyMotion
+Compares one NetworkHub holding N connections with N standalone PyMotion
+instances (what one-systemd-unit-per-network pays for plugins and content)
+
+Usage: python benchmarks/bench_networks.py [--networks 4] [--channels 20]
+
+Each network connects to its own in-process fake server and joins its
+channels before memory is sampled with tracemalloc (Python heap only; a
+separate process also pays for the interpreter itself, typically 10+ MB RSS).
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from pymotion_bot import NetworkHub, PyMotion
+from fake_ircd import FakeIRCServer
+
+
+def write_config(tmp: Path, servers, channels: int) -> Path:
+    config = {
+        "ssl": False, "nick": "pybot", "irc_log_file": "", "log_level": "WARNING", "modes": "",
+        "networks": [
+            {"name": f"net{i}", "server": "127.0.0.1", "port": server.port,
+             "channels": [f"#chan{c}" for c in range(channels)]}
+            for i, server in enumerate(servers)
+        ],
+    }
+    path = tmp / "pymotion.json"
+    path.write_text(json.dumps(config))
+    return path
+
+
+async def settle(servers, channels: int):
+    """Wait until every connection has registered and joined its channels."""
+    for server in servers:
+        await server.wait_for(lambda s=server: len(s.sent_lines("JOIN")) >= channels, timeout=10)
+    await asyncio.sleep(0.1)
+
+
+def heap() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+async def measure_hub(tmp: Path, count: int, channels: int) -> int:
+    servers = [await FakeIRCServer(f"irc.net{i}.test").start() for i in range(count)]
+    config_file = write_config(tmp, servers, channels)
+    before = heap()
+    hub = NetworkHub(str(config_file))
+    runner = asyncio.create_task(hub.run())
+    await settle(servers, channels)
+    used = heap() - before
+    await hub.shutdown()
+    await runner
+    for server in servers:
+        await server.close()
+    return used
+
+
+async def measure_standalone(tmp: Path, count: int, channels: int) -> int:
+    servers = [await FakeIRCServer(f"irc.net{i}.test").start() for i in range(count)]
+    config_file = write_config(tmp, servers, channels)
+    config = json.loads(config_file.read_text())
+    before = heap()
+    bots, runners = [], []
+    for i, network in enumerate(config["networks"]):
+        single = dict(config, networks=[], **{k: v for k, v in network.items() if k != "name"})
+        single_file = tmp / f"single{i}.json"
+        single_file.write_text(json.dumps(single))
+        bot = PyMotion(str(single_file))
+        bots.append(bot)
+        runners.append(asyncio.create_task(bot.run()))
+    await settle(servers, channels)
+    used = heap() - before
+    for bot in bots:
+        bot.request_stop()
+    await asyncio.gather(*runners)
+    for server in servers:
+        await server.close()
+    return used
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        PyMotion._state_file = lambda self: tmp / "bot_state.json"
+        PyMotion._flood_limits_file = lambda self: tmp / "flood_limits.json"
+        tracemalloc.start()
+
+        # First run pays for imports and interned strings; discard it
+        await measure_hub(tmp, 1, args.channels)
+        one = await measure_hub(tmp, 1, args.channels)
+        many = await measure_hub(tmp, args.networks, args.channels)
+        standalone = await measure_standalone(tmp, args.networks, args.channels)
+
+    per_extra = (many - one) / max(1, args.networks - 1)
+    mb = 1024 * 1024
+    print(f"{args.networks} networks x {args.channels} channels (Python heap, tracemalloc)")
+    print(f"  hub, 1 network:        {one / mb:8.2f} MB")
+    print(f"  hub, {args.networks} networks:       {many / mb:8.2f} MB")
+    print(f"  per extra network:     {per_extra / mb:8.2f} MB")
+    print(f"  {args.networks} standalone bots:    {standalone / mb:8.2f} MB "
+          f"({standalone / args.networks / mb:.2f} MB each)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--networks", type=int, default=4)
+    parser.add_argument("--channels", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
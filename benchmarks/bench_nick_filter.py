@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Username filter benchmark for PyMotion
+Builds a synthetic channel of --nicks members and times contains_other_usernames
+on channel messages (a quarter of them naming a member) two ways:
+
+  scan   the original filter: every word against every member, lowercasing
+         each nick every time (O(words x users))
+  index  the current filter: nick-shaped tokens looked up in the channel's
+         folded-nick users dict (O(words))
+
+It also reports how fast JOIN/NICK/PART keep that dict current.
+
+Usage: python benchmarks/bench_nick_filter.py [irc_traffic.log] [--nicks 5000] [--messages 2000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pymotion_bot import PyMotion, parse_irc_message
+from bench_parser import load_lines
+
+
+def scan_filter(bot: PyMotion, channel: str, speaker: str, message: str) -> bool:
+    """The pre-index filter, kept here as the baseline."""
+    bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
+    message_lower = message.lower()
+    for bot_name in bot_names:
+        if message_lower.startswith(bot_name) or message_lower.startswith(f"@{bot_name}"):
+            return False
+    channel_state = bot.get_channel_state(channel)
+    for word in message_lower.split():
+        clean_word = ''.join(c for c in word if c.isalnum())
+        if not clean_word or clean_word == speaker.lower() or clean_word in bot_names:
+            continue
+        for username in channel_state.users:
+            if clean_word == username.lower():
+                return True
+    return False
+
+
+def make_nicks(count: int) -> list:
+    rng = random.Random(5)
+    stems = ["alex", "sam", "kit", "rue", "jo", "max", "lee", "ash", "nova", "pix"]
+    decorations = ["", "_", "|away", "-dev", "[m]", "`", "^", "42"]
+    nicks = set()
+    while len(nicks) < count:
+        nicks.add(f"{rng.choice(stems)}{rng.randrange(10000)}{rng.choice(decorations)}")
+    return sorted(nicks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", nargs="?", help="recorded irc_traffic.log or raw capture")
+    parser.add_argument("--nicks", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    texts = []
+    for line in load_lines(args.log):
+        msg = parse_irc_message(line)
+        if msg and msg.command == "PRIVMSG" and len(msg.params) >= 2 and not msg.params[1].startswith("\001"):
+            texts.append(msg.params[1])
+        if len(texts) >= args.messages:
+            break
+    if not texts:
+        sys.exit("no PRIVMSG lines found in log")
+
+    nicks = make_nicks(args.nicks)
+    rng = random.Random(1)
+    messages = [f"{text} {rng.choice(nicks)}" if i % 4 == 0 else text for i, text in enumerate(texts)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        PyMotion._state_file = lambda self: tmp / "bot_state.json"
+        PyMotion._flood_limits_file = lambda self: tmp / "flood_limits.json"
+        config_file = tmp / "pymotion.json"
+        config_file.write_text(json.dumps({"nick": "PyMotion", "irc_log_file": "", "log_level": "WARNING",
+                                           "plugins": {"enabled": ["admin"]}}))
+        bot = PyMotion(str(config_file))
+        bot.plugins = []
+        for nick in nicks:
+            bot.get_user_state("#big", nick)
+
+        results = {}
+        for label, check in (("scan", scan_filter), ("index", PyMotion.contains_other_usernames)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.process_time()
+                hits = sum(check(bot, "#big", "speaker", text) for text in messages)
+                best = min(best, time.process_time() - start)
+            results[label] = (best, hits)
+
+        churn = []
+        for i, nick in enumerate(nicks[:1000]):
+            churn += [f":{nick}!u@h PART #big", f":{nick}!u@h JOIN #big", f":{nick}!u@h NICK :{nick}x{i}"]
+        parsed = [parse_irc_message(line) for line in churn]
+
+        async def replay():
+            start = time.process_time()
+            for msg in parsed:
+                await bot.dispatch_message(msg)
+            return time.process_time() - start
+        churn_time = asyncio.run(replay())
+
+    print(f"{len(messages):,} messages, #big has {args.nicks:,} members, best of {args.repeat} (CPU time)")
+    for label in ("scan", "index"):
+        best, hits = results[label]
+        print(f"{label:>6}: {best * 1e6 / len(messages):10.1f} us/message ({hits} filtered)")
+    print(f"speedup: {results['scan'][0] / results['index'][0]:.0f}x")
+    print(f"membership upkeep: {len(parsed) / churn_time:,.0f} JOIN/PART/NICK lines/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+IRC parser benchmark for PyMotion
+Compares parse_irc_message with the old split(' ', 3) approach
+
+Usage: python benchmarks/bench_parser.py [irc_traffic.log] [--repeat 5]
+
+The log can be the bot's own irc_traffic.log ("[ts] RECV: line" entries are
+replayed) or a raw capture with one IRC line per row. Without a file a
+synthetic burst is used.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pymotion_bot import parse_irc_message
+from bench_framer import make_burst
+
+
+def load_lines(path: str | None) -> list[str]:
+    if not path:
+        return make_burst(10 * 1024 * 1024).decode("utf-8").split("\r\n")[:-1]
+    lines = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for row in f:
+            row = row.rstrip("\r\n")
+            if "] RECV: " in row:
+                lines.append(row.split("] RECV: ", 1)[1])
+            elif row and not row.startswith("["):
+                lines.append(row)
+    return lines
+
+
+def parse_old(line: str):
+    """The parsing IRCBot.handle_message did before IRCMessage."""
+    if line.startswith(':'):
+        parts = line[1:].split(' ', 3)
+        if len(parts) >= 3:
+            source = parts[0]
+            nick = source.split('!')[0] if '!' in source else source
+            params = parts[2:]
+            if parts[1] == "PRIVMSG" and len(params) >= 2:
+                params[1] = params[1].lstrip(':')
+            return nick, parts[1], params
+    else:
+        parts = line.split(' ', 2)
+        if len(parts) >= 2:
+            return "", parts[0], parts[1:]
+    return None
+
+
+def parse_new(line: str):
+    msg = parse_irc_message(line)
+    return msg and (msg.nick, msg.command, msg.params)
+
+
+def bench(name, fn, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:>16}: {len(lines) / best:>12,.0f} lines/sec ({best * 1e9 / len(lines):,.0f} ns/line)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", nargs="?", help="recorded irc_traffic.log or raw capture")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = load_lines(args.log)
+    if not lines:
+        sys.exit("no IRC lines found in log")
+    print(f"Parsing {len(lines):,} lines, best of {args.repeat}")
+    bench("split(' ', 3)", parse_old, lines, args.repeat)
+    bench("parse_irc_message", parse_new, lines, args.repeat)
+
+    tagged = [line for line in lines if line.startswith("@")]
+    if tagged:
+        bench("  + tag access", lambda line: parse_irc_message(line).tags, tagged, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
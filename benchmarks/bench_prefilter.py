@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Plugin keyword prefilter benchmark for PyMotion
+Replays channel messages through handle_channel_message with every plugin
+enabled, once with the TriggerIndex prefilter and once without, and reports
+CPU time per message and how many plugin message hooks were called.
+
+Usage: python benchmarks/bench_prefilter.py [irc_traffic.log] [--messages 20000] [--repeat 3]
+
+Replies are discarded, plugin pauses (asyncio.sleep) return immediately and
+the username filter is bypassed so only the plugin chain is measured.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pymotion_bot import PyMotion, parse_irc_message
+from bench_parser import load_lines
+
+
+async def no_reply(*args, **kwargs):
+    pass
+
+
+def make_bot(tmp: Path, prefilter: bool) -> PyMotion:
+    config_file = tmp / "pymotion.json"
+    config_file.write_text(json.dumps({
+        "nick": "PyMotion", "irc_log_file": "", "log_level": "WARNING",
+        "plugins": {"enabled": [], "prefilter": prefilter},
+        "inbound_flood": {"enabled": False},  # a replay is one big flood
+        "ai_response": {"enabled_channels": ["#nowhere"]},
+    }))
+    bot = PyMotion(str(config_file))
+    bot.privmsg = bot.action = no_reply
+    bot.contains_other_usernames = lambda *args: False
+    return bot
+
+
+def count_calls(bot: PyMotion) -> list:
+    calls = [0]
+    for plugin in bot.plugins:
+        if hasattr(plugin, 'match'):
+            def counted_match(ctx, _original=plugin.match):
+                calls[0] += 1
+                return _original(ctx)
+            plugin.match = counted_match
+            continue
+        hook = 'handle_context' if hasattr(plugin, 'handle_context') else 'handle_message'
+        original = getattr(plugin, hook)
+
+        async def counted(*args, _original=original):
+            calls[0] += 1
+            return await _original(*args)
+        setattr(plugin, hook, counted)
+    return calls
+
+
+async def replay(bot: PyMotion, messages) -> float:
+    random.seed(1)
+    start = time.process_time()
+    for nick, channel, text in messages:
+        await bot.handle_channel_message(nick, channel, text)
+    await asyncio.gather(*bot.background_tasks)  # two-phase plugin replies
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", nargs="?", help="recorded irc_traffic.log or raw capture")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    messages = []
+    for line in load_lines(args.log):
+        msg = parse_irc_message(line)
+        if msg and msg.command == "PRIVMSG" and len(msg.params) >= 2 and not msg.params[1].startswith("\001"):
+            messages.append((msg.nick, msg.params[0], msg.params[1]))
+        if len(messages) >= args.messages:
+            break
+    if not messages:
+        sys.exit("no PRIVMSG lines found in log")
+
+    async def instant(delay, result=None):
+        return result
+    asyncio.sleep = instant
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        PyMotion._state_file = lambda self: tmp / "bot_state.json"
+        PyMotion._flood_limits_file = lambda self: tmp / "flood_limits.json"
+        results = {}
+        for prefilter in (False, True):
+            bot = make_bot(tmp, prefilter)
+            calls = count_calls(bot)
+            best = min(asyncio.run(replay(bot, messages)) for _ in range(args.repeat))
+            results[prefilter] = (best, calls[0] / args.repeat, len(bot.plugins))
+
+    print(f"{len(messages):,} messages, {results[True][2]} plugins, best of {args.repeat} (CPU time)")
+    for prefilter, label in ((False, "every plugin"), (True, "prefiltered")):
+        best, calls, _ = results[prefilter]
+        print(f"{label:>14}: {best * 1e6 / len(messages):8.1f} us/message, "
+              f"{calls / len(messages):5.2f} plugin calls/message")
+    print(f"       speedup: {results[False][0] / results[True][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
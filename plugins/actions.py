@@ -13,6 +13,7 @@ class ActionPlugin:
         self.name = "actions"
         self.priority = 40
         self.enabled = True
+        self.keywords = []  # Reacts to /me actions only; never needs plain messages
 
         # Positive actions: +1 friendship
         self.positive_actions = {
@@ -13,18 +13,20 @@ class AdminPlugin:
         self.name = "admin"
         self.priority = 90  # High priority
         self.enabled = True
+        self.keywords = ["{nick}", "!kill"]
     
     async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
         """Handle admin commands"""
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
+        addressing = bot.addressing(message)
+        command = addressing.stripped_text
         
         # Check if user is an admin (you can configure this)
         admins = bot.config.get('admins', [])
         is_admin = nick in admins
         
-        for bot_name in bot_names:
+        if addressing.mentioned:
             # Reload command
-            if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\breload\b', message):
+            if re.search(r'(?i)\breload\b', command):
                 if not is_admin:
                     await bot.privmsg(channel, f"{nick}: Sorry, only admins can use that command!")
                     return True
@@ -46,25 +48,72 @@ class AdminPlugin:
                 return True
             
             # Status command
-            if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bstatus\b', message):
+            if re.search(r'(?i)\bstatus\b', command):
                 uptime_seconds = int(__import__('time').time() - bot.start_time)
                 hours = uptime_seconds // 3600
                 minutes = (uptime_seconds % 3600) // 60
                 
                 plugin_names = [p.name for p in bot.plugins if p.enabled]
-                
+                inbound = bot.inbound_queue_stats()
+                flood = bot.flood.stats()
+
                 status_msg = (
                     f"🤖 Status: Online | "
                     f"⏱️ Uptime: {hours}h {minutes}m | "
                     f"🔌 Plugins: {len(plugin_names)} loaded | "
-                    f"📡 Channels: {len(bot.channels)}"
+                    f"📡 Channels: {len(bot.channels)} | "
+                    f"📥 Queue: {inbound['depth']} (p95 {inbound['latency']['p95'] * 1000:.1f}ms, "
+                    f"dropped {inbound['dropped']}) | "
+                    f"📤 Send rate: {flood['rate']:.2f}/s ({flood['throttle_count']} throttles) | "
+                    f"🏓 Lag: {bot.current_lag() * 1000:.0f}ms"
                 )
+                if bot.inbound_flood:
+                    limited = bot.inbound_flood.stats(top=1)
+                    noisiest = next(iter(limited['top']), None)
+                    status_msg += f" | 🚧 Flood-dropped: {limited['dropped']}" + (
+                        f" (most: {bot.inbound_flood.display_name(noisiest)})" if noisiest else "")
                 
                 await bot.privmsg(channel, status_msg)
                 return True
             
+            # Perf command: slowest plugin hooks, or one plugin's hooks
+            perf = re.search(r'(?i)\bperf\b(?:\s+(\S+))?', command)
+            if perf:
+                if not is_admin:
+                    await bot.privmsg(channel, f"{nick}: Sorry, only admins can use that command!")
+                    return True
+
+                profiler = bot.profiler
+                if perf.group(1) == "reset":
+                    profiler.reset()
+                    await bot.privmsg(channel, "⏱️ Plugin profile reset")
+                    return True
+                if perf.group(1):
+                    rows = [(p, h, s) for (p, h), s in sorted(profiler.hooks.items()) if p == perf.group(1)]
+                else:
+                    rows = profiler.top(5)
+                if not rows:
+                    await bot.privmsg(channel, "⏱️ No plugin calls recorded yet")
+                    return True
+
+                minutes = int(__import__('time').time() - profiler.since) // 60
+                parts = []
+                for plugin_name, hook, stats in rows:
+                    latency = stats.latency
+                    part = (
+                        f"{plugin_name}.{hook} {stats.calls} calls/{stats.claims} claims, "
+                        f"{latency.total:.1f}s total, p50/p95/p99 "
+                        f"{latency.percentile(50) * 1000:.1f}/{latency.percentile(95) * 1000:.1f}/"
+                        f"{latency.percentile(99) * 1000:.1f}ms"
+                    )
+                    if stats.exceptions or stats.timeouts:
+                        part += f", {stats.exceptions} errors, {stats.timeouts} timeouts"
+                    parts.append(part)
+                await bot.privmsg(channel, f"⏱️ Plugin perf ({minutes}m): " + " | ".join(parts))
+                return True
+
             # Plugins command
-            if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bplugins\b', message):
+            if re.search(r'(?i)\bplugins\b', command):
                 if not is_admin:
                     await bot.privmsg(channel, f"{nick}: Sorry, only admins can use that command!")
                     return True
@@ -84,11 +133,19 @@ class AdminPlugin:
                 if disabled_plugins:
                     disabled_str = ", ".join(disabled_plugins)
                     await bot.privmsg(channel, f"⏸️  Disabled plugins [{len(disabled_plugins)}]: {disabled_str}")
+
+                # Circuit breakers: plugins skipped or failing after errors/overruns
+                breakers = bot.plugin_breaker_report()
+                if breakers:
+                    breaker_str = "; ".join(f"{name} ({state})" for name, state in sorted(breakers.items()))
+                    await bot.privmsg(channel, f"🧯 Breakers [{len(breakers)}]: {breaker_str}")
+                else:
+                    await bot.privmsg(channel, "🧯 Breakers: all closed")
                 
                 return True
             
             # Help command for admins
-            if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\badmin\s+help\b', message):
+            if re.search(r'(?i)\badmin\s+help\b', command):
                 if not is_admin:
                     await bot.privmsg(channel, f"{nick}: You're not an admin!")
                     return True
@@ -98,12 +155,13 @@ class AdminPlugin:
                     "reload (reload config & plugins), "
                     "status (show bot status), "
                     "plugins (list loaded plugins), "
+                    "perf [plugin|reset] (plugin hook timings), "
                     "!kill (shutdown bot)"
                 )
                 await bot.privmsg(channel, help_text)
                 return True
 
-        # !kill command - shutdown bot (outside bot name loop since it uses ! prefix)
+        # !kill command - shutdown bot (needs no bot name since it uses ! prefix)
         if message.strip().lower() == '!kill':
             if not is_admin:
                 await bot.privmsg(channel, f"{nick}: Sorry, only admins can use that command!")
@@ -111,7 +169,7 @@ class AdminPlugin:
 
             logging.info(f"Bot shutdown initiated by {nick}")
             await bot.privmsg(channel, "Shutting down...")
-            await bot.send("QUIT :Shutdown requested by admin")
+            await bot.send("QUIT :Shutdown requested by admin", wait=True)
 
             # Signal graceful shutdown — exit code 42 prevents systemd restart
             bot.exit_code = 42
@@ -51,11 +51,12 @@ class AIResponsePlugin:
         }
         
         # State tracking
-        self.last_response_time = {}
-        self.response_history = {}
+        self.last_response_time = {}  # {bot.network_key(nick): timestamp}
+        self.response_history = {}  # {bot.network_key(channel): [lines]}
         
         # Initialize HTTP client
         self.http_client = None
+        self._compiled_triggers = (None, [])
         
     def load_config(self, bot_config: Dict[str, Any]):
         """Load configuration from bot config"""
@@ -85,12 +86,6 @@ class AIResponsePlugin:
             logging.info("AI Response plugin configured and enabled")
             logging.debug(f"AI config: model={self.config['model']}, max_length={self.config['max_response_length']}")
     
-    def _get_bot_names(self, bot) -> List[str]:
-        """Get all bot names including aliases"""
-        names = [bot.config['nick'].lower()]
-        names.extend(alias.lower() for alias in bot.config.get('aliases', []))
-        return names
-    
     def _is_allowed_channel(self, channel: str) -> bool:
         """Check if AI responses are allowed in this channel"""
         channel_lower = channel.lower()
@@ -106,10 +101,9 @@ class AIResponsePlugin:
         # If no specific channels configured, allow all
         return True
     
-    def _is_on_cooldown(self, nick: str) -> bool:
-        """Check if user is on cooldown"""
-        nick_lower = nick.lower()
-        last_time = self.last_response_time.get(nick_lower, 0)
+    def _is_on_cooldown(self, nick_key) -> bool:
+        """Check if user (bot.network_key(nick)) is on cooldown"""
+        last_time = self.last_response_time.get(nick_key, 0)
         return time.time() - last_time < self.config['cooldown_seconds']
     
     def _should_ignore_message(self, message: str) -> bool:
@@ -128,27 +122,16 @@ class AIResponsePlugin:
             return False
         
         # Check trigger patterns
-        for pattern in self.config['trigger_patterns']:
-            # Replace {botname} placeholder with actual bot names
-            for bot_name in bot_names:
-                trigger_pattern = pattern.replace('{botname}', re.escape(bot_name))
-                if re.search(trigger_pattern, message_lower):
-                    return True
-        
-        return False
+        return any(pattern.search(message_lower) for pattern in self._trigger_regexes(bot_names))
     
-    def _extract_prompt(self, message: str, bot_names: List[str]) -> str:
-        """Extract the actual prompt from the message"""
-        # Try to find direct messages to bot
-        for bot_name in bot_names:
-            # Pattern: "botname: message" or "botname, message" or "@botname message"
-            pattern = rf'^(?:@?{re.escape(bot_name)}[,:]?\s*)(.+)$'
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        
-        # If no direct pattern found, return the whole message
-        return message
+    def _trigger_regexes(self, bot_names: List[str]) -> List[re.Pattern]:
+        """trigger_patterns with {botname} filled in, compiled once per set of names"""
+        key = (tuple(bot_names), tuple(self.config['trigger_patterns']))
+        if self._compiled_triggers[0] != key:
+            names = "(?:" + "|".join(re.escape(name) for name in bot_names) + ")"
+            compiled = [re.compile(pattern.replace('{botname}', names)) for pattern in key[1]]
+            self._compiled_triggers = (key, compiled)
+        return self._compiled_triggers[1]
     
     def _truncate_response(self, response: str) -> str:
         """Truncate response to fit IRC limits"""
@@ -274,18 +257,15 @@ class AIResponsePlugin:
             logging.debug(f"AI responses disabled in channel: {channel}")
             return False
 
-        # Get bot names
-        bot_names = self._get_bot_names(bot)
-
         # Check if message triggers AI response
-        if not self._is_triggered(message, bot_names):
+        if not self._is_triggered(message, bot.bot_names()):
             return False
 
         # From here on, this plugin claims the message (returns True)
         # to prevent other plugins from responding in AI-enabled channels
 
         # Check cooldown
-        if self._is_on_cooldown(nick):
+        if self._is_on_cooldown(bot.network_key(nick)):
             logging.debug(f"User {nick} is on cooldown for AI responses")
             return True
 
@@ -293,13 +273,15 @@ class AIResponsePlugin:
         if random.random() > self.config['response_probability']:
             return True
         
-        # Extract the actual prompt
-        prompt = self._extract_prompt(message, bot_names)
+        # Extract the actual prompt: what follows "botname:" when addressed
+        addressing = bot.addressing(message)
+        prompt = addressing.stripped_text if addressing.addressed and addressing.stripped_text else message
         
         # Get some context from recent messages if available
         context = ""
-        if hasattr(bot, 'response_history') and channel in bot.response_history:
-            recent_messages = bot.response_history[channel][-3:]  # Last 3 messages
+        history_key = bot.network_key(channel)
+        if history_key in self.response_history:
+            recent_messages = self.response_history[history_key][-3:]  # Last 3 messages
             context = "Recent conversation: " + " | ".join(recent_messages)
         
         # Call OpenRouter API
@@ -311,17 +293,16 @@ class AIResponsePlugin:
             await bot.privmsg(channel, final_response)
             
             # Update cooldown and history
-            self.last_response_time[nick.lower()] = time.time()
+            self.last_response_time[bot.network_key(nick)] = time.time()
             
             # Store response in history for context
-            if channel not in self.response_history:
-                self.response_history[channel] = []
-            self.response_history[channel].append(f"{nick}: {message}")
-            self.response_history[channel].append(f"Bot: {final_response}")
+            history = self.response_history.setdefault(history_key, [])
+            history.append(f"{nick}: {message}")
+            history.append(f"Bot: {final_response}")
             
             # Keep history limited
-            if len(self.response_history[channel]) > 10:
-                self.response_history[channel] = self.response_history[channel][-10:]
+            if len(history) > 10:
+                del history[:-10]
             
             logging.info(f"[{channel}] AI responded to {nick}: {final_response[:50]}...")
             return True
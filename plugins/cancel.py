@@ -16,6 +16,7 @@ class CancelPlugin:
         self.name = "cancel"
         self.priority = 65  # High priority to catch cancel commands
         self.enabled = True
+        self.keywords = ["cancel"]
 
         # Silly accusations that would "cancel" someone
         self.accusations = [
@@ -86,7 +87,7 @@ class CancelPlugin:
         ]
 
         # Track active cancellations with timing
-        self.active_cancellations = {}  # {channel: {target: task}}
+        self.active_cancellations = {}  # {bot.network_key(channel): {target: task}}
 
     def _find_plugin(self, bot, name: str):
         """Find a loaded plugin by name."""
@@ -95,31 +96,32 @@ class CancelPlugin:
                 return plugin
         return None
 
-    async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
-        """Handle message and check for cancel commands"""
+    def match(self, ctx):
+        """Claim cancel commands; the cancellation runs in respond()"""
+        bot, nick, channel = ctx.bot, ctx.nick, ctx.channel
         # Check if someone is trying to cancel someone
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
+        addressing = ctx.addressing
+        if not addressing.mentioned:
+            return None
 
-        logging.debug(f"Cancel plugin checking message in {channel}: {message}")
+        cancel_match = re.search(r'(?i)\bcancel\s+(\w+)', addressing.stripped_text)
+        if not cancel_match:
+            return None
 
-        for bot_name in bot_names:
-            cancel_match = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bcancel\s+(\w+)', message)
-            if cancel_match:
-                logging.debug(f"Found cancel command in {channel} from {nick}")
-                target = cancel_match.group(1)
+        logging.debug(f"Found cancel command in {channel} from {nick}")
+        target = cancel_match.group(1)
 
-                # Don't cancel the bot itself or the person doing the cancelling
-                if target.lower() == bot_name or target.lower() == nick.lower():
-                    await bot.privmsg(channel, f"Nice try, {nick}, but I'm uncancellable!")
-                    return True
+        # Don't cancel the bot itself or the person doing the cancelling
+        if target.lower() == addressing.which_alias or target.lower() == nick.lower():
+            return bot.privmsg, channel, f"Nice try, {nick}, but I'm uncancellable!"
 
-                # Cancel the target!
-                await self.cancel_user(bot, channel, nick, target)
-                return True
-            else:
-                logging.debug(f"No cancel match found for bot_name: {bot_name}")
+        # Cancel the target!
+        return self.cancel_user, bot, channel, nick, target
 
-        return False
+    async def respond(self, claim):
+        """Run the reply picked by match()"""
+        handler, *args = claim
+        await handler(*args)
 
     async def handle_action(self, bot, nick: str, channel: str, action: str) -> bool:
         """Handle /me actions - not used by this plugin"""
@@ -137,13 +139,14 @@ class CancelPlugin:
         """Cancel a user and schedule their punishment"""
 
         # Cancel any existing cancellation for this target in this channel
-        if channel in self.active_cancellations and target in self.active_cancellations[channel]:
-            self.active_cancellations[channel][target].cancel()
+        channel_key = bot.network_key(channel)
+        if channel_key in self.active_cancellations and target in self.active_cancellations[channel_key]:
+            self.active_cancellations[channel_key][target].cancel()
 
         # Check for stealth combo — reveal from shadows if hidden
         stealth_plugin = self._find_plugin(bot, "stealth")
         was_stealth = False
-        if stealth_plugin and hasattr(stealth_plugin, 'is_hidden') and stealth_plugin.is_hidden(channel):
+        if stealth_plugin and hasattr(stealth_plugin, 'is_hidden') and stealth_plugin.is_hidden(bot, channel):
             was_stealth = await stealth_plugin.handle_stealth_attack(bot, channel, "cancellation")
 
         # Pick a random accusation
@@ -173,14 +176,14 @@ class CancelPlugin:
         delay = random.randint(120, 240)  # 2-4 minutes
 
         # Store the task so we can cancel it if needed
-        if channel not in self.active_cancellations:
-            self.active_cancellations[channel] = {}
+        if channel_key not in self.active_cancellations:
+            self.active_cancellations[channel_key] = {}
 
         punishment_task = bot.create_background_task(
             self.deliver_punishment(bot, channel, target, delay),
             name=f"cancel_punishment_{channel}_{target}",
         )
-        self.active_cancellations[channel][target] = punishment_task
+        self.active_cancellations[channel_key][target] = punishment_task
 
         logging.info(f"{canceller} cancelled {target} in {channel}, punishment in {delay} seconds")
 
@@ -199,10 +202,11 @@ class CancelPlugin:
             await bot.privmsg(channel, f"May this serve as a warning to others!")
 
             # Clean up the active cancellation
-            if channel in self.active_cancellations and target in self.active_cancellations[channel]:
-                del self.active_cancellations[channel][target]
-                if not self.active_cancellations[channel]:
-                    del self.active_cancellations[channel]
+            channel_key = bot.network_key(channel)
+            if channel_key in self.active_cancellations and target in self.active_cancellations[channel_key]:
+                del self.active_cancellations[channel_key][target]
+                if not self.active_cancellations[channel_key]:
+                    del self.active_cancellations[channel_key]
 
         except asyncio.CancelledError:
             # Cancellation was cancelled (probably by a new cancellation)
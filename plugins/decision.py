@@ -14,6 +14,8 @@ class DecisionPlugin:
         self.name = "decision"
         self.priority = 55
         self.enabled = True
+        self.keywords = ["coin", "roll"]
+        self.keyword_patterns = [r"\sor\s"]  # "should I X or Y"
         
         # Coin flip outcomes
         self.coin_normal = ["Heads!", "Tails!"]
@@ -52,37 +54,39 @@ class DecisionPlugin:
     
     async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
         """Handle decision-making commands"""
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
+        addressing = bot.addressing(message)
+        if not addressing.mentioned:
+            return False
+        command = addressing.stripped_text
+
+        # Coin flip
+        if re.search(r'(?i)\b(flip|toss)\s+(a\s+)?coin', command):
+            await self.flip_coin(bot, channel, nick)
+            return True
         
-        for bot_name in bot_names:
-            # Coin flip
-            if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\b(flip|toss)\s+(a\s+)?coin', message):
-                await self.flip_coin(bot, channel, nick)
-                return True
-            
-            # Dice roll - matches "roll dice", "roll a die", "roll 2d6", etc.
-            dice_match = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\broll\s+(?:a\s+)?(?:(?:(\d+)d(\d+))|(?:dice?|die))', message)
-            if dice_match:
-                # Check if they specified XdY format
-                if dice_match.group(1) and dice_match.group(2):
-                    num_dice = int(dice_match.group(1))
-                    num_sides = int(dice_match.group(2))
-                else:
-                    # Default to 1d6
-                    num_dice = 1
-                    num_sides = 6
-                
-                await self.roll_dice(bot, channel, nick, num_dice, num_sides)
-                return True
+        # Dice roll - matches "roll dice", "roll a die", "roll 2d6", etc.
+        dice_match = re.search(r'(?i)\broll\s+(?:a\s+)?(?:(?:(\d+)d(\d+))|(?:dice?|die))', command)
+        if dice_match:
+            # Check if they specified XdY format
+            if dice_match.group(1) and dice_match.group(2):
+                num_dice = int(dice_match.group(1))
+                num_sides = int(dice_match.group(2))
+            else:
+                # Default to 1d6
+                num_dice = 1
+                num_sides = 6
             
-            # This or that decision
-            # Matches: "should I X or Y", "do I X or Y", "X or Y?"
-            this_or_that = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*(?:should|do|shall)\s+(?:I|we)\s+(.+?)\s+or\s+(.+?)[\?\.!]*$', message)
-            if this_or_that:
-                option1 = this_or_that.group(1).strip()
-                option2 = this_or_that.group(2).strip()
-                await self.choose_option(bot, channel, nick, option1, option2)
-                return True
+            await self.roll_dice(bot, channel, nick, num_dice, num_sides)
+            return True
+        
+        # This or that decision
+        # Matches: "should I X or Y", "do I X or Y", "X or Y?"
+        this_or_that = re.search(r'(?i)(?:should|do|shall)\s+(?:I|we)\s+(.+?)\s+or\s+(.+?)[\?\.!]*$', command)
+        if this_or_that:
+            option1 = this_or_that.group(1).strip()
+            option2 = this_or_that.group(2).strip()
+            await self.choose_option(bot, channel, nick, option1, option2)
+            return True
         
         return False
     
@@ -14,6 +14,7 @@ class GreetingPlugin:
         self.name = "greetings"
         self.priority = 60
         self.enabled = True
+        self.keywords = ["{nick}"]  # Only ever answers when the bot is named
 
         self.greeting_patterns = [
             r'(?i)\b(hi|hey|hello|yo|greetings|morning|afternoon|evening)\b',
@@ -90,10 +91,7 @@ class GreetingPlugin:
 
     async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
         """Handle greetings"""
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
-        message_lower = message.lower()
-        bot_mentioned = any(bot_name in message_lower for bot_name in bot_names)
-        directed_at_bot = any(message_lower.startswith(bot_name) for bot_name in bot_names) or bot_mentioned
+        directed_at_bot = bot.addressing(message).mentioned
 
         if directed_at_bot:
             if any(re.search(pattern, message) for pattern in self.welcome_back_patterns):
@@ -14,6 +14,7 @@ class KarmaReactionPlugin:
         self.name = "karma_reaction"
         self.priority = 50
         self.enabled = True
+        self.keywords = ["++", "--"]
 
         self.positive_responses = [
             "Aww, thanks {nick}! *beams*",
@@ -15,6 +15,7 @@ class KillPlugin:
         self.name = "kill"
         self.priority = 70
         self.enabled = True
+        self.keywords = ["kill"]
 
         # Tier 1: Gentle (kills 1-3) — original behavior
         self.weapons_gentle = [
@@ -126,40 +127,37 @@ class KillPlugin:
         else:
             return "unkillable"
 
-    async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
-
+    def match(self, ctx):
+        """Claim "<bot> ... kill <target> [with <weapon>]"; respond() plays it out"""
         # Only respond when the bot is addressed
-        addressed = any(
-            re.search(rf'(?i)\b{re.escape(name)}\b', message)
-            for name in bot_names
-        )
-        if not addressed:
-            return False
-
-        kill_match = re.search(r'(?i)kill (\w+)(?:\s+with\s+(.+))?', message)
+        if not ctx.mentioned:
+            return None
+
+        kill_match = re.search(r'(?i)kill (\w+)(?:\s+with\s+(.+))?', ctx.message)
         if not kill_match:
-            return False
+            return None
+        return ctx, kill_match.group(1), kill_match.group(2)
 
-        target = kill_match.group(1)
-        custom_weapon = kill_match.group(2)
+    async def respond(self, claim):
+        ctx, target, custom_weapon = claim
+        bot, nick, channel = ctx.bot, ctx.nick, ctx.channel
 
         # Can't kill the bot
         if target.lower() == bot.config['nick'].lower():
             await bot.privmsg(channel, f"*dodges* You can't kill me, {nick}! I'm immortal!")
-            return True
+            return
 
         # Self-kill
         if target.lower() == nick.lower():
             await bot.privmsg(channel, f"*hands {nick} a mirror* Here you go!")
-            return True
+            return
 
         # Bestie defense
         target_tier = bot.get_friendship_tier(channel, target)
         if target_tier == "bestie":
             response = random.choice(self.bestie_defense).format(target=target, nick=nick)
             await bot.privmsg(channel, response)
-            return True
+            return
 
         # Get and increment kill count
         target_state = bot.get_user_state(channel, target)
@@ -182,7 +180,7 @@ class KillPlugin:
                 await asyncio.sleep(1)
             await bot.privmsg(channel, response)
             target_state.kill_count = 10  # Reset to dramatic tier
-            return True
+            return
 
         if tier == "overkill":
             if tired_intro:
@@ -193,7 +191,7 @@ class KillPlugin:
                 formatted = line.format(target=target, nick=nick)
                 await bot.action(channel, formatted) if not formatted[0].isupper() else await bot.privmsg(channel, formatted)
                 await asyncio.sleep(1.5)
-            return True
+            return
 
         # Gentle / Moderate / Dramatic tiers
         if tier == "gentle":
@@ -210,7 +208,6 @@ class KillPlugin:
             await bot.privmsg(channel, tired_intro)
             await asyncio.sleep(1)
         await bot.action(channel, action)
-        return True
 
     async def handle_action(self, bot, nick: str, channel: str, action: str) -> bool:
         return False
@@ -105,12 +105,12 @@ class LevelsPlugin:
         self.name = "levels"
         self.priority = 5
         self.enabled = True
-        self.channel_last_announcement = {}
+        self.channel_last_announcement = {}  # {bot.network_key(channel): timestamp}
         self.min_interval = 3600  # 1 hour minimum between announcements
 
     async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
         now = time.time()
-        last = self.channel_last_announcement.get(channel.lower(), 0.0)
+        last = self.channel_last_announcement.get(bot.network_key(channel), 0.0)
         if now - last < self.min_interval:
             return False
 
@@ -122,7 +122,7 @@ class LevelsPlugin:
         pct = random.randint(1, 100)
         direction = random.choice(DIRECTIONS)
         await bot.privmsg(channel, f"{noun} levels at {pct}% and {direction}!")
-        self.channel_last_announcement[channel.lower()] = now
+        self.channel_last_announcement[bot.network_key(channel)] = now
         return True
 
     async def handle_action(self, bot, nick: str, channel: str, action: str) -> bool:
@@ -19,12 +19,13 @@ class LilJonPlugin:
 
         # Cooldown settings for the trigger command
         self.trigger_command = "!getcrunk"
+        self.keywords = [self.trigger_command]
         self.cooldown_duration = 300  # 5 minutes in seconds
-        self.last_triggered_time = 0
+        self.last_triggered_time = {}  # {network: timestamp}
 
         # Passive quote timing (every 15 minutes)
         self.passive_interval_seconds = 15 * 60
-        self._passive_task: asyncio.Task | None = None
+        self._passive_tasks: dict[str, asyncio.Task] = {}  # one loop per network
 
         # Lil Jon's greatest hits
         self.quotes = [
@@ -80,15 +81,17 @@ class LilJonPlugin:
                       ]
 
     async def start(self, bot):
-        if self._passive_task and not self._passive_task.done():
+        network = getattr(bot, "network", "")
+        task = self._passive_tasks.get(network)
+        if task and not task.done():
             return
         if hasattr(bot, "create_background_task"):
-            self._passive_task = bot.create_background_task(
+            self._passive_tasks[network] = bot.create_background_task(
                 self._passive_quote_loop(bot),
                 name="liljon_passive_quote_loop",
             )
         else:
-            self._passive_task = asyncio.create_task(self._passive_quote_loop(bot))
+            self._passive_tasks[network] = asyncio.create_task(self._passive_quote_loop(bot))
 
     async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
         # Only active in #crunk
@@ -98,10 +101,10 @@ class LilJonPlugin:
         # Check for !GETCRUNK command (case insensitive)
         if message.strip().lower() == self.trigger_command:
             now = time.time()
-            if (now - self.last_triggered_time) > self.cooldown_duration:
+            if (now - self.last_triggered_time.get(bot.network, 0)) > self.cooldown_duration:
                 quote = random.choice(self.quotes)
                 await bot.privmsg(channel, quote)
-                self.last_triggered_time = now
+                self.last_triggered_time[bot.network] = now
             return True
 
         # Let other plugins (admin, shutup, etc.) handle non-crunk messages
@@ -127,17 +130,17 @@ class LilJonPlugin:
                 if self.target_channel not in getattr(bot, "channels", set()):
                     continue
                 quote = random.choice(self.quotes)
-                await bot.privmsg(self.target_channel, quote)
+                await bot.privmsg(self.target_channel, quote, ambient=True)
         except asyncio.CancelledError:
             return
         except Exception as e:
             logging.error(f"LilJon passive quote loop crashed: {e}")
 
     async def cleanup(self):
-        if self._passive_task:
-            self._passive_task.cancel()
+        tasks, self._passive_tasks = list(self._passive_tasks.values()), {}
+        for task in tasks:
+            task.cancel()
             try:
-                await self._passive_task
+                await task
             except asyncio.CancelledError:
                 pass
-            self._passive_task = None
@@ -15,6 +15,7 @@ class MakeMePlugin:
         self.name = "makeme"
         self.priority = 60
         self.enabled = True
+        self.keywords = ["give", "make"]
 
         # Crafting responses (make/create an item)
         self.crafting_actions = [
@@ -101,66 +102,68 @@ class MakeMePlugin:
             "hostile": 0.20,
         }.get(tier, 0.05)
 
-    async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
-        """Handle make me commands"""
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
-
-        for bot_name in bot_names:
-            # Match "give X to Y" or "give Y an X"
-            give_match = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bgive\s+(?:(\w+)\s+)?(?:a|an)?\s*(.+?)\s+to\s+(\w+)', message)
-            if not give_match:
-                # Try alternate pattern: "give Y X"
-                give_match = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bgive\s+(\w+)\s+(?:a|an)?\s*(.+)', message)
-                if give_match:
-                    recipient = give_match.group(1)
-                    thing = give_match.group(2).strip().rstrip('!?.,')
-                    await self.give_thing(bot, channel, nick, recipient, thing)
-                    return True
+    def match(self, ctx):
+        """Claim give/make requests; the crafting sequence runs in respond()"""
+        bot, nick, channel = ctx.bot, ctx.nick, ctx.channel
+        addressing = ctx.addressing
+        if not addressing.mentioned:
+            return None
+        command = addressing.stripped_text
+
+        # Match "give X to Y" or "give Y an X"
+        give_match = re.search(r'(?i)\bgive\s+(?:(\w+)\s+)?(?:a|an)?\s*(.+?)\s+to\s+(\w+)', command)
+        if not give_match:
+            # Try alternate pattern: "give Y X"
+            give_match = re.search(r'(?i)\bgive\s+(\w+)\s+(?:a|an)?\s*(.+)', command)
+            if give_match:
+                recipient = give_match.group(1)
+                thing = give_match.group(2).strip().rstrip('!?.,')
+                return self.give_thing, bot, channel, nick, recipient, thing
+        else:
+            # Pattern: "give [recipient] [thing] to [recipient]" or "give [thing] to [recipient]"
+            if give_match.group(1):
+                # "give bob a cookie" format - group 1 is recipient, group 2 is thing
+                recipient = give_match.group(1)
+                thing = give_match.group(2).strip().rstrip('!?.,')
             else:
-                # Pattern: "give [recipient] [thing] to [recipient]" or "give [thing] to [recipient]"
-                if give_match.group(1):
-                    # "give bob a cookie" format - group 1 is recipient, group 2 is thing
-                    recipient = give_match.group(1)
-                    thing = give_match.group(2).strip().rstrip('!?.,')
-                else:
-                    # "give a cookie to bob" format - group 2 is thing, group 3 is recipient
-                    thing = give_match.group(2).strip().rstrip('!?.,')
-                    recipient = give_match.group(3)
-
-                await self.give_thing(bot, channel, nick, recipient, thing)
-                return True
-
-            # Match "make me a/an X" or just "make me X"
-            make_match = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bmake\s+me\s+(?:a|an)?\s*(.+)', message)
-            if make_match:
-                thing = make_match.group(1).strip()
-
-                # Don't process empty requests
-                if not thing:
-                    await bot.privmsg(channel, f"{nick}: Make you... what? You have to tell me what!")
-                    return True
-
-                # Remove trailing punctuation
-                thing = thing.rstrip('!?.,')
-
-                await self.make_thing(bot, channel, nick, thing)
-                return True
-
-            # Match "make [user] a/an X" - make something for someone else
-            make_other_match = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bmake\s+(\w+)\s+(?:a|an)?\s*(.+)', message)
-            if make_other_match:
-                target = make_other_match.group(1).strip()
-                thing = make_other_match.group(2).strip().rstrip('!?.,')
-
-                # Don't process empty requests
-                if not thing:
-                    await bot.privmsg(channel, f"{nick}: Make them... what?")
-                    return True
-
-                await self.make_thing(bot, channel, target, thing)
-                return True
+                # "give a cookie to bob" format - group 2 is thing, group 3 is recipient
+                thing = give_match.group(2).strip().rstrip('!?.,')
+                recipient = give_match.group(3)
 
-        return False
+            return self.give_thing, bot, channel, nick, recipient, thing
+
+        # Match "make me a/an X" or just "make me X"
+        make_match = re.search(r'(?i)\bmake\s+me\s+(?:a|an)?\s*(.+)', command)
+        if make_match:
+            thing = make_match.group(1).strip()
+
+            # Don't process empty requests
+            if not thing:
+                return bot.privmsg, channel, f"{nick}: Make you... what? You have to tell me what!"
+
+            # Remove trailing punctuation
+            thing = thing.rstrip('!?.,')
+
+            return self.make_thing, bot, channel, nick, thing
+
+        # Match "make [user] a/an X" - make something for someone else
+        make_other_match = re.search(r'(?i)\bmake\s+(\w+)\s+(?:a|an)?\s*(.+)', command)
+        if make_other_match:
+            target = make_other_match.group(1).strip()
+            thing = make_other_match.group(2).strip().rstrip('!?.,')
+
+            # Don't process empty requests
+            if not thing:
+                return bot.privmsg, channel, f"{nick}: Make them... what?"
+
+            return self.make_thing, bot, channel, target, thing
+
+        return None
+
+    async def respond(self, claim):
+        """Run the reply picked by match() (it pauses between lines)"""
+        handler, *args = claim
+        await handler(*args)
 
     async def make_thing(self, bot, channel: str, nick: str, thing: str):
         """Process the make request with various outcomes"""
@@ -257,8 +260,7 @@ class MakeMePlugin:
             return
 
         # Check if trying to give to the bot
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
-        if recipient.lower() in bot_names:
+        if recipient.lower() in bot.bot_names():
             bot_responses = [
                 "For me? You shouldn't have! *accepts graciously*",
                 "I don't have pockets, but thanks!",
@@ -13,6 +13,9 @@ class MusicPlugin:
         self.name = "music"
         self.priority = 45  # Mid-priority conversational plugin
         self.enabled = True
+        # Cheap literals covering every pattern in handle_message
+        self.keywords = ["listen", "hearing", "playing", "jamming", "bumping", "vibing",
+                         "on repeat", "favorite", "music"]
 
         # Band name components
         self.band_prefixes = [
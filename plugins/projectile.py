@@ -15,6 +15,7 @@ class ProjectilePlugin:
         self.name = "projectile"
         self.priority = 65  # High priority to catch fire commands
         self.enabled = True
+        self.keywords = ["fire"]
 
         # Launching devices/methods
         self.launchers = [
@@ -106,37 +107,43 @@ class ProjectilePlugin:
             "*lackluster pew pew*",
         ]
 
-    async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
-        """Handle fire commands"""
+    def match(self, ctx):
+        """Claim fire commands; the firing sequence runs in respond()"""
+        bot, nick, channel = ctx.bot, ctx.nick, ctx.channel
         # Check if someone is trying to fire something
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
-
-        for bot_name in bot_names:
-            # Pattern: "botnick fire <projectile> at <target>"
-            fire_match = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bfire\s+(.+?)\s+at\s+(\w+)', message)
-            if fire_match:
-                projectile_raw = fire_match.group(1).strip()
-                target = fire_match.group(2)
-
-                # Handle special projectiles
-                if projectile_raw.lower() in ['everything', 'something', 'anything', 'stuff']:
-                    projectile = random.choice(self.random_projectiles)
-                else:
-                    projectile = projectile_raw
-
-                await self.fire_at_target(bot, channel, nick, target, projectile)
-                return True
-
-            # Pattern: "botnick fire at <target>" (no projectile specified)
-            fire_match_no_projectile = re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bfire\s+at\s+(\w+)', message)
-            if fire_match_no_projectile:
-                target = fire_match_no_projectile.group(1)
+        addressing = ctx.addressing
+        if not addressing.mentioned:
+            return None
+        command = addressing.stripped_text
+
+        # Pattern: "botnick fire <projectile> at <target>"
+        fire_match = re.search(r'(?i)\bfire\s+(.+?)\s+at\s+(\w+)', command)
+        if fire_match:
+            projectile_raw = fire_match.group(1).strip()
+            target = fire_match.group(2)
+
+            # Handle special projectiles
+            if projectile_raw.lower() in ['everything', 'something', 'anything', 'stuff']:
                 projectile = random.choice(self.random_projectiles)
+            else:
+                projectile = projectile_raw
 
-                await self.fire_at_target(bot, channel, nick, target, projectile)
-                return True
+            return self.fire_at_target, bot, channel, nick, target, projectile
 
-        return False
+        # Pattern: "botnick fire at <target>" (no projectile specified)
+        fire_match_no_projectile = re.search(r'(?i)\bfire\s+at\s+(\w+)', command)
+        if fire_match_no_projectile:
+            target = fire_match_no_projectile.group(1)
+            projectile = random.choice(self.random_projectiles)
+
+            return self.fire_at_target, bot, channel, nick, target, projectile
+
+        return None
+
+    async def respond(self, claim):
+        """Run the firing sequence picked by match()"""
+        handler, *args = claim
+        await handler(*args)
 
     async def fire_at_target(self, bot, channel: str, firer: str, target: str, projectile: str):
         """Execute the firing sequence"""
@@ -147,8 +154,7 @@ class ProjectilePlugin:
             return
 
         # Special response if firing at the bot
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
-        if target.lower() in bot_names:
+        if target.lower() in bot.bot_names():
             defense = random.choice(self.self_defense)
             await bot.privmsg(channel, defense)
             return
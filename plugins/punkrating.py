@@ -23,11 +23,12 @@ class PunkRatingPlugin:
     name = "punkrating"
     priority = 50  # Higher priority to catch commands early
     enabled = True
+    keywords = ["!rate", "!suggest"]
     
     def __init__(self):
         # Memory and cooldown management
         self.memory: Dict[str, Dict[str, str]] = {}
-        self.cooldowns: Dict[str, float] = {}
+        self.cooldowns: Dict[tuple, float] = {}  # {bot.network_key(nick): timestamp}
         
         # These will be set by load_config
         self.api_base = None
@@ -154,13 +155,14 @@ class PunkRatingPlugin:
         user_prompt = f"Suggest a similar but way more punk alternative to: {thing}"
         return await self._call_deepseek(system_prompt, user_prompt)
     
-    def _check_cooldown(self, nick: str) -> bool:
+    def _check_cooldown(self, bot, nick: str) -> bool:
         """Check if user is on cooldown. Returns True if they should wait."""
         now = time.time()
-        last_time = self.cooldowns.get(nick, 0)
+        key = bot.network_key(nick)
+        last_time = self.cooldowns.get(key, 0)
         if now - last_time < self.cooldown_seconds:
             return True
-        self.cooldowns[nick] = now
+        self.cooldowns[key] = now
         return False
     
     async def handle_message(self, bot, nick, channel, message):
@@ -184,7 +186,7 @@ class PunkRatingPlugin:
         thing = parts[1].strip()
         
         # Check cooldown
-        if self._check_cooldown(nick):
+        if self._check_cooldown(bot, nick):
             await bot.privmsg(
                 channel,
                 f"{nick}: cool your jets. Try again in a bit."
@@ -13,6 +13,7 @@ class QuestionPlugin:
         self.name = "questions"
         self.priority = 35
         self.enabled = True
+        self.keywords = ["?"]
 
         self.yes_no_responses = [
             "Yes!", "No!", "Maybe!", "Definitely!", "Absolutely not!",
@@ -82,29 +83,15 @@ class QuestionPlugin:
             "Through the power of friendship! And explosions!"
         ]
     
-    async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
-        if not message.endswith('?'):
+    async def handle_context(self, ctx) -> bool:
+        if not ctx.is_question:
             return False
 
-        # Check if the question is directed at the bot (including aliases)
-        bot_names = [bot.config['nick'].lower()] + [
-            alias.lower() for alias in bot.config.get('aliases', [])
-        ]
-        lowered = message.lower()
-
-        def addressed_to_bot():
-            for name in bot_names:
-                if re.search(r'\b' + re.escape(name) + r'\b', lowered):
-                    return True
-                if lowered.startswith(name) or lowered.startswith(f"{name}:") or lowered.startswith(f"{name},"):
-                    return True
+        # Always respond if bot is mentioned (including aliases), otherwise only 5% of the time
+        if not ctx.mentioned and random.random() > 0.05:
             return False
 
-        bot_mentioned = addressed_to_bot()
-
-        # Always respond if bot is mentioned, otherwise only 5% of the time
-        if not bot_mentioned and random.random() > 0.05:
-            return False
+        message = ctx.plain
 
         # Choose response based on question type (order matters - check specific types first)
         if re.search(r'(?i)\bhow many\b', message):
@@ -130,7 +117,7 @@ class QuestionPlugin:
         else:
             response = random.choice(self.yes_no_responses)
 
-        await bot.privmsg(channel, f"{nick}: {response}")
+        await ctx.bot.privmsg(ctx.channel, f"{ctx.nick}: {response}")
         return True
     
     async def handle_action(self, bot, nick: str, channel: str, action: str) -> bool:
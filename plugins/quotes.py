@@ -252,11 +252,12 @@ class QuotesPlugin:
         now = time.time()
         
         # Update last activity for this channel
-        if channel not in self.last_activity:
-            self.last_activity[channel] = now
+        channel_key = bot.network_key(channel)
+        if channel_key not in self.last_activity:
+            self.last_activity[channel_key] = now
         
-        time_since_activity = now - self.last_activity[channel]
-        self.last_activity[channel] = now
+        time_since_activity = now - self.last_activity[channel_key]
+        self.last_activity[channel_key] = now
         
         # Calculate dynamic chance based on chat activity
         base_chance = 0.02
@@ -274,51 +275,49 @@ class QuotesPlugin:
             return True
         
         # Check for direct quote requests
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
-        
-        for bot_name in bot_names:
-            if f"{bot_name} quote" in message.lower() or f"{bot_name}, quote" in message.lower():
-                category = None
-                message_lower = message.lower()
-                
-                if "sci" in message_lower or "space" in message_lower: category = "sci_fi"
-                elif "fantasy" in message_lower or "magic" in message_lower: category = "fantasy"
-                elif "anime" in message_lower or "manga" in message_lower: category = "anime"
-                elif "funny" in message_lower or "comedy" in message_lower: category = "comedy"
-                elif "game" in message_lower or "gaming" in message_lower: category = "gaming"
-                elif "tech" in message_lower or "code" in message_lower: category = "tech"
-                elif "zim" in message_lower: category = "invader_zim"
-                elif "adventure" in message_lower: category = "adventure_time"
-                elif "bang" in message_lower or "bazinga" in message_lower: category = "big_bang_theory"
-                elif "rick" in message_lower or "morty" in message_lower: category = "rick_and_morty"
-                elif "star wars" in message_lower or "mandalorian" in message_lower: category = "star_wars_tv"
-                elif "doctor" in message_lower or "who" in message_lower: category = "doctor_who"
-                elif "futurama" in message_lower or "bender" in message_lower: category = "futurama"
-                elif "it crowd" in message_lower: category = "the_it_crowd"
-                elif "sponge" in message_lower or "patrick" in message_lower or "bikini bottom" in message_lower:
-                    category = "spongebob"
-                elif "johnny" in message_lower or "homicidal" in message_lower or "nny" in message_lower:
-                    category = "johnny_homicidal"
-                elif "metal" in message_lower or "mosh" in message_lower or "riff" in message_lower:
-                    category = "metalhead"
-                elif "evil dead" in message_lower or "ash" in message_lower or "boomstick" in message_lower:
-                    category = "evil_dead"
-                # --- NEW CATEGORY LOGIC ---
-                elif "legacy of kain" in message_lower or ("legacy" in message_lower and "kain" in message_lower) or "nosgoth" in message_lower or "raziel" in message_lower:
-                    category = "legacy_of_kain"
-                elif "rice boy" in message_lower or "riceboy" in message_lower or "one electronic" in message_lower:
-                    category = "rice_boy"
+        addressing = bot.addressing(message)
+        if addressing.mentioned and addressing.stripped_text.lower().startswith("quote"):
+            category = None
+            message_lower = message.lower()
+            
+            if "sci" in message_lower or "space" in message_lower: category = "sci_fi"
+            elif "fantasy" in message_lower or "magic" in message_lower: category = "fantasy"
+            elif "anime" in message_lower or "manga" in message_lower: category = "anime"
+            elif "funny" in message_lower or "comedy" in message_lower: category = "comedy"
+            elif "game" in message_lower or "gaming" in message_lower: category = "gaming"
+            elif "tech" in message_lower or "code" in message_lower: category = "tech"
+            elif "zim" in message_lower: category = "invader_zim"
+            elif "adventure" in message_lower: category = "adventure_time"
+            elif "bang" in message_lower or "bazinga" in message_lower: category = "big_bang_theory"
+            elif "rick" in message_lower or "morty" in message_lower: category = "rick_and_morty"
+            elif "star wars" in message_lower or "mandalorian" in message_lower: category = "star_wars_tv"
+            elif "doctor" in message_lower or "who" in message_lower: category = "doctor_who"
+            elif "futurama" in message_lower or "bender" in message_lower: category = "futurama"
+            elif "it crowd" in message_lower: category = "the_it_crowd"
+            elif "sponge" in message_lower or "patrick" in message_lower or "bikini bottom" in message_lower:
+                category = "spongebob"
+            elif "johnny" in message_lower or "homicidal" in message_lower or "nny" in message_lower:
+                category = "johnny_homicidal"
+            elif "metal" in message_lower or "mosh" in message_lower or "riff" in message_lower:
+                category = "metalhead"
+            elif "evil dead" in message_lower or "ash" in message_lower or "boomstick" in message_lower:
+                category = "evil_dead"
+            # --- NEW CATEGORY LOGIC ---
+            elif "legacy of kain" in message_lower or ("legacy" in message_lower and "kain" in message_lower) or "nosgoth" in message_lower or "raziel" in message_lower:
+                category = "legacy_of_kain"
+            elif "rice boy" in message_lower or "riceboy" in message_lower or "one electronic" in message_lower:
+                category = "rice_boy"
 
-                # Select quote
-                if category and category in self.quotes:
-                    quote = self._select_quote(self.quotes[category], category)
-                    await bot.privmsg(channel, f"[{category.replace('_', ' ').upper()}] {quote}")
-                else:
-                    quote = self._select_quote(self.all_quotes)
-                    await bot.privmsg(channel, quote)
-                
-                self.last_quote = now
-                return True
+            # Select quote
+            if category and category in self.quotes:
+                quote = self._select_quote(self.quotes[category], category)
+                await bot.privmsg(channel, f"[{category.replace('_', ' ').upper()}] {quote}")
+            else:
+                quote = self._select_quote(self.all_quotes)
+                await bot.privmsg(channel, quote)
+            
+            self.last_quote = now
+            return True
         
         return False
     
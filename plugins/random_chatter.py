@@ -15,7 +15,7 @@ class RandomChatterPlugin:
         self.name = "random_chatter"
         self.priority = 10
         self.enabled = True
-        self.channel_last_chatter = {}
+        self.channel_last_chatter = {}  # {bot.network_key(channel): timestamp}
         self.min_interval = 300  # 5 minutes minimum between random chatter
         self.idle_threshold = 180  # only chatter if channel quiet for 3 minutes
 
@@ -95,7 +95,7 @@ class RandomChatterPlugin:
         if idle_time < self.idle_threshold:
             return False
 
-        last_chatter = self.channel_last_chatter.get(channel.lower(), 0.0)
+        last_chatter = self.channel_last_chatter.get(bot.network_key(channel), 0.0)
         if now - last_chatter < self.min_interval:
             return False
 
@@ -109,8 +109,8 @@ class RandomChatterPlugin:
             if random.random() < 0.3:
                 opinion = self._get_opinion_phrase(bot)
                 if opinion:
-                    await bot.privmsg(channel, opinion)
-                    self.channel_last_chatter[channel.lower()] = now
+                    await bot.privmsg(channel, opinion, ambient=True)
+                    self.channel_last_chatter[bot.network_key(channel)] = now
                     return True
 
             # Time-of-day flavored phrases
@@ -121,8 +121,8 @@ class RandomChatterPlugin:
             else:
                 response = random.choice(self.random_phrases)
 
-            await bot.privmsg(channel, response)
-            self.channel_last_chatter[channel.lower()] = now
+            await bot.privmsg(channel, response, ambient=True)
+            self.channel_last_chatter[bot.network_key(channel)] = now
             return True
 
         return False
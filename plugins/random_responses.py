@@ -23,8 +23,8 @@ class RandomResponsePlugin:
         self.user_cooldown_seconds = 90
         self.channel_cooldown_seconds = 35
 
-        self.last_user_response = {}
-        self.last_channel_response = {}
+        self.last_user_response = {}  # {bot.network_key(nick): timestamp}
+        self.last_channel_response = {}  # {bot.network_key(channel): timestamp}
         self.recent_responses = defaultdict(lambda: deque(maxlen=3))
 
         # Triggers that adjust friendship
@@ -109,9 +109,9 @@ class RandomResponsePlugin:
                 return True
         return False
 
-    def _cooldowns_allow(self, nick: str, channel: str, now: float) -> bool:
-        nick_key = nick.lower()
-        channel_key = channel.lower()
+    def _cooldowns_allow(self, bot, nick: str, channel: str, now: float) -> bool:
+        nick_key = bot.network_key(nick)
+        channel_key = bot.network_key(channel)
 
         last_user = self.last_user_response.get(nick_key, 0)
         if now - last_user < self.user_cooldown_seconds:
@@ -123,9 +123,9 @@ class RandomResponsePlugin:
 
         return True
 
-    def _record_response(self, nick: str, channel: str, now: float):
-        self.last_user_response[nick.lower()] = now
-        self.last_channel_response[channel.lower()] = now
+    def _record_response(self, bot, nick: str, channel: str, now: float):
+        self.last_user_response[bot.network_key(nick)] = now
+        self.last_channel_response[bot.network_key(channel)] = now
 
     def _select_response(self, trigger_name: str, responses):
         history = self.recent_responses[trigger_name]
@@ -157,18 +157,18 @@ class RandomResponsePlugin:
 
         if len(message) > 5 and message.isupper() and any(c.isalpha() for c in message):
             chance = 0.30 if addressed_to_bot else 0.02
-            if random.random() < chance and self._cooldowns_allow(nick, channel, now):
+            if random.random() < chance and self._cooldowns_allow(bot, nick, channel, now):
                 response = self._select_response("caps", self.caps_responses)
                 await bot.privmsg(channel, response)
-                self._record_response(nick, channel, now)
+                self._record_response(bot, nick, channel, now)
                 return True
 
         for trigger in self.triggers:
             if trigger["pattern"].search(message):
-                if self._should_respond(trigger, addressed_to_bot, message, energy) and self._cooldowns_allow(nick, channel, now):
+                if self._should_respond(trigger, addressed_to_bot, message, energy) and self._cooldowns_allow(bot, nick, channel, now):
                     response = self._select_response(trigger["name"], trigger["responses"])
                     await bot.privmsg(channel, response)
-                    self._record_response(nick, channel, now)
+                    self._record_response(bot, nick, channel, now)
 
                     # Friendship gain on thanks/love
                     gain = self._friendship_triggers.get(trigger["name"], 0)
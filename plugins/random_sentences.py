@@ -219,11 +219,12 @@ class RandomSentencesPlugin:
         now = time.time()
         
         # Update last activity for this channel
-        if channel not in self.last_activity:
-            self.last_activity[channel] = now
+        channel_key = bot.network_key(channel)
+        if channel_key not in self.last_activity:
+            self.last_activity[channel_key] = now
         
-        time_since_activity = now - self.last_activity[channel]
-        self.last_activity[channel] = now
+        time_since_activity = now - self.last_activity[channel_key]
+        self.last_activity[channel_key] = now
         
         # Calculate dynamic chance based on chat activity
         base_chance = 0.015
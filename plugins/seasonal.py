@@ -192,6 +192,10 @@ class SeasonalPlugin:
             }
         }
 
+        # Prefilter: holiday trigger words, or the bot being named
+        self.keywords = ["{nick}"]
+        self.keyword_patterns = [p for h in self.holidays.values() for p in h['triggers']]
+
     def is_holiday_active(self, holiday_name: str) -> bool:
         """Check if we're currently in a holiday period"""
         today = date.today()
@@ -17,12 +17,12 @@ class ShutUpPlugin:
         self.name = "shutup"
         self.priority = 100  # Highest priority
         self.enabled = True
-        self.shut_up_until = 0
+        self.shut_up_until = {}  # {network: timestamp}
         self.shut_up_duration = 300  # 5 minutes default
 
         # Grudge tracking
-        self.silenced_by = {}  # {channel: nick}
-        self.grudge_comments_remaining = {}  # {channel: {nick: int}}
+        self.silenced_by = {}  # {bot.network_key(channel): nick}
+        self.grudge_comments_remaining = {}  # {bot.network_key(channel): {casefolded nick: int}}
 
         # Passive-aggressive responses when grudge is active
         self.grudge_comments = [
@@ -48,73 +48,70 @@ class ShutUpPlugin:
             "At this point, {nick}, it's basically tradition.",
         ]
 
-    def is_shut_up(self) -> bool:
-        """Check if bot should be quiet"""
-        return time.time() < self.shut_up_until
+    def is_shut_up(self, bot) -> bool:
+        """Check if bot should be quiet on this bot's network"""
+        return time.time() < self.shut_up_until.get(bot.network, 0)
 
     async def handle_message(self, bot, nick: str, channel: str, message: str) -> bool:
         """Handle messages and check for shut up commands"""
         # Check for grudge comments BEFORE checking silence (grudge fires after silence ends)
-        if not self.is_shut_up() and channel in self.grudge_comments_remaining:
-            nick_lower = nick.lower()
-            grudges = self.grudge_comments_remaining[channel]
-            if nick_lower in grudges and grudges[nick_lower] > 0:
+        channel_key = bot.network_key(channel)
+        if not self.is_shut_up(bot) and channel_key in self.grudge_comments_remaining:
+            nick_key = bot.casefold(nick)
+            grudges = self.grudge_comments_remaining[channel_key]
+            if nick_key in grudges and grudges[nick_key] > 0:
                 if random.random() < 0.6:  # 60% chance per message
                     comment = random.choice(self.grudge_comments).format(nick=nick)
                     await bot.privmsg(channel, comment)
-                    grudges[nick_lower] -= 1
-                    if grudges[nick_lower] <= 0:
-                        del grudges[nick_lower]
+                    grudges[nick_key] -= 1
+                    if grudges[nick_key] <= 0:
+                        del grudges[nick_key]
                     if not grudges:
-                        del self.grudge_comments_remaining[channel]
+                        del self.grudge_comments_remaining[channel_key]
                     # Don't return True — let other plugins still process
 
         # Check if someone told bot to shut up
-        bot_names = [bot.config['nick'].lower()] + [alias.lower() for alias in bot.config.get('aliases', [])]
+        addressing = bot.addressing(message)
+        if addressing.mentioned and re.search(r'(?i)\b(shut up|stfu|be quiet|shush)\b', addressing.stripped_text):
+            until = self.shut_up_until[bot.network] = time.time() + self.shut_up_duration
 
-        for bot_name in bot_names:
-            if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\b(shut up|stfu|be quiet|shush)\b', message):
-                self.shut_up_until = time.time() + self.shut_up_duration
+            # Track who silenced us
+            self.silenced_by[channel_key] = nick
 
-                # Track who silenced us
-                self.silenced_by[channel] = nick
+            # Friendship: -3
+            user_state = bot.get_user_state(channel, nick)
+            user_state.friendship -= 3
+            user_state.shutup_count += 1
+            user_state.last_shutup_time = time.time()
 
-                # Friendship: -3
-                user_state = bot.get_user_state(channel, nick)
-                user_state.friendship -= 3
-                user_state.shutup_count += 1
-                user_state.last_shutup_time = time.time()
+            # Repeat offender callout
+            if user_state.shutup_count >= 3:
+                response = random.choice(self.repeat_offender_responses).format(
+                    nick=nick, count=user_state.shutup_count
+                )
+                await bot.privmsg(channel, response)
+            else:
+                await bot.privmsg(channel, f"*sulks* Fine, I'll be quiet for {self.shut_up_duration // 60} minutes...")
 
-                # Repeat offender callout
-                if user_state.shutup_count >= 3:
-                    response = random.choice(self.repeat_offender_responses).format(
-                        nick=nick, count=user_state.shutup_count
-                    )
-                    await bot.privmsg(channel, response)
-                else:
-                    await bot.privmsg(channel, f"*sulks* Fine, I'll be quiet for {self.shut_up_duration // 60} minutes...")
+            logging.info(f"Bot told to shut up by {nick} (count: {user_state.shutup_count}) until {datetime.fromtimestamp(until)}")
 
-                logging.info(f"Bot told to shut up by {nick} (count: {user_state.shutup_count}) until {datetime.fromtimestamp(self.shut_up_until)}")
+            # Set up grudge comments for when silence ends
+            grudge_count = random.randint(2, 4)
+            self.grudge_comments_remaining.setdefault(channel_key, {})[bot.casefold(nick)] = grudge_count
 
-                # Set up grudge comments for when silence ends
-                grudge_count = random.randint(2, 4)
-                if channel not in self.grudge_comments_remaining:
-                    self.grudge_comments_remaining[channel] = {}
-                self.grudge_comments_remaining[channel][nick.lower()] = grudge_count
-
-                return True
+            return True
 
         # Block all other plugins if we're shut up
-        return self.is_shut_up()
+        return self.is_shut_up(bot)
 
     async def handle_action(self, bot, nick: str, channel: str, action: str) -> bool:
         """Handle /me actions - block if shut up"""
-        return self.is_shut_up()
+        return self.is_shut_up(bot)
 
     async def handle_join(self, bot, nick: str, channel: str) -> bool:
         """Block join handlers while shut up"""
-        return self.is_shut_up()
+        return self.is_shut_up(bot)
 
     async def handle_part(self, bot, nick: str, channel: str, reason: str) -> bool:
         """Block part handlers while shut up"""
-        return self.is_shut_up()
+        return self.is_shut_up(bot)
@@ -15,9 +15,10 @@ class StealthPlugin:
         self.name = "stealth"
         self.priority = 80  # High priority to set stealth state
         self.enabled = True
+        self.keywords = ["sneak", "reveal", "unhide", "come out", "show yourself"]
         
         # Track stealth state per channel
-        self.stealth_state = {}  # {channel: {"hidden": bool, "method": str, "time": float}}
+        self.stealth_state = {}  # {bot.network_key(channel): {"hidden": bool, "method": str, "time": float}}
         
         # Ways to go into stealth
         self.stealth_methods = [
@@ -72,27 +73,28 @@ class StealthPlugin:
             "goes loud and proud"
         ]
     
-    def get_stealth_state(self, channel: str) -> dict:
+    def get_stealth_state(self, bot, channel: str) -> dict:
         """Get stealth state for a channel"""
-        if channel not in self.stealth_state:
-            self.stealth_state[channel] = {
+        key = bot.network_key(channel)
+        if key not in self.stealth_state:
+            self.stealth_state[key] = {
                 "hidden": False,
                 "method": "",
                 "time": 0
             }
-        return self.stealth_state[channel]
+        return self.stealth_state[key]
     
-    def is_hidden(self, channel: str) -> bool:
+    def is_hidden(self, bot, channel: str) -> bool:
         """Check if bot is currently hidden in this channel"""
-        return self.get_stealth_state(channel)["hidden"]
+        return self.get_stealth_state(bot, channel)["hidden"]
     
-    def get_stealth_method(self, channel: str) -> str:
+    def get_stealth_method(self, bot, channel: str) -> str:
         """Get current stealth method"""
-        return self.get_stealth_state(channel)["method"]
+        return self.get_stealth_state(bot, channel)["method"]
     
-    def set_stealth(self, channel: str, hidden: bool, method: str = ""):
+    def set_stealth(self, bot, channel: str, hidden: bool, method: str = ""):
         """Set stealth state"""
-        state = self.get_stealth_state(channel)
+        state = self.get_stealth_state(bot, channel)
         state["hidden"] = hidden
         state["method"] = method
         state["time"] = time.time()
@@ -104,23 +106,23 @@ class StealthPlugin:
         for bot_name in bot_names:
             # Sneak command
             if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\bsneak\b', message):
-                if self.is_hidden(channel):
+                if self.is_hidden(bot, channel):
                     await bot.privmsg(channel, "I'm already hidden! *whispers from the shadows*")
                 else:
                     method = random.choice(self.stealth_methods)
-                    self.set_stealth(channel, True, method)
+                    self.set_stealth(bot, channel, True, method)
                     await bot.action(channel, method)
                     await bot.privmsg(channel, "*is now hidden*")
                 return True
             
             # Reveal/unhide command
             if re.search(rf'(?i)\b{re.escape(bot_name)}\b.*\b(reveal|unhide|come out|show yourself)\b', message):
-                if not self.is_hidden(channel):
+                if not self.is_hidden(bot, channel):
                     await bot.privmsg(channel, "I'm not hiding! I'm right here!")
                 else:
                     reveal = random.choice(self.reveal_methods)
-                    old_method = self.get_stealth_method(channel)
-                    self.set_stealth(channel, False)
+                    old_method = self.get_stealth_method(bot, channel)
+                    self.set_stealth(bot, channel, False)
                     await bot.action(channel, f"{reveal}!")
                     await bot.privmsg(channel, f"*is no longer hidden* (was: {old_method})")
                 return True
@@ -129,10 +131,10 @@ class StealthPlugin:
     
     async def handle_stealth_attack(self, bot, channel: str, action_description: str):
         """Handle revealing during an attack - called by other plugins"""
-        if self.is_hidden(channel):
+        if self.is_hidden(bot, channel):
             reveal = random.choice(self.reveal_methods)
-            old_method = self.get_stealth_method(channel)
-            self.set_stealth(channel, False)
+            old_method = self.get_stealth_method(bot, channel)
+            self.set_stealth(bot, channel, False)
             
             # Dramatic stealth attack sequence
             await bot.action(channel, f"{reveal} from {old_method}!")
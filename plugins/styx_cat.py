@@ -13,6 +13,7 @@ class StyxCatPlugin:
         self.name = "styx_cat"
         self.priority = 70  # Run before most plugins
         self.enabled = True
+        self.keywords = ["cat"]
 
         self.hints = [
             "if i went to a wedding and stood up, glass in hand to give a speech, i'd be giving a?",
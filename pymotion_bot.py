@@ -5,41 +5,812 @@ Because TCL is awful and life is too short for eggdrop
 """
 
 import asyncio
+import bisect
 import re
 import random
 import json
 import time
 import logging
+import traceback
+import unicodedata
 import ssl
 import base64
 import importlib
 import importlib.util
 import inspect
+import string
 import sys
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable, Any
+from functools import cached_property
+from typing import Dict, List, NamedTuple, Optional, Set, Callable, Any
 from dataclasses import dataclass, field
 from pathlib import Path
 import aiofiles
 
+class LineFramer:
+    """Incremental IRC line framer working on raw bytes.
+
+    Reads are appended to a bytearray and scanned for LF; only complete lines
+    are decoded (through a memoryview, so no intermediate bytes copies), which
+    keeps multi-byte UTF-8 sequences split across reads intact. Both CRLF and
+    bare LF terminators are accepted.
+    """
+
+    # IRCv3 allows 8191 bytes of tags plus the 512-byte message body
+    MAX_LINE_BYTES = 16384
+
+    __slots__ = ("_buf", "_scan_from", "encoding", "errors")
+
+    def __init__(self, encoding: str = 'utf-8', errors: str = 'ignore'):
+        self._buf = bytearray()
+        self._scan_from = 0  # bytes before this offset are known to hold no LF
+        self.encoding = encoding
+        self.errors = errors
+
+    def feed(self, data: bytes) -> List[str]:
+        """Append a chunk of socket data and return the complete lines in it."""
+        buf = self._buf
+        buf += data
+        pos = buf.find(b'\n', self._scan_from)
+        if pos < 0:
+            if len(buf) > self.MAX_LINE_BYTES:
+                logging.warning(f"Discarding {len(buf)} bytes without a line terminator")
+                buf.clear()
+            self._scan_from = len(buf)
+            return []
+
+        # Decode everything up to the last terminator in one go; LF never
+        # occurs inside a multi-byte UTF-8 sequence, so the cut is always safe
+        last = buf.rfind(b'\n', pos)
+        end = last - 1 if last and buf[last - 1] == 0x0D else last
+        with memoryview(buf) as view:
+            text = str(view[:end], self.encoding, self.errors)
+        del buf[:last + 1]
+        self._scan_from = len(buf)
+
+        lines = text.split('\r\n')
+        if '\n' in text:  # bare-LF server
+            lines = [part.rstrip('\r') for line in lines for part in line.split('\n')]
+        if '' in lines:
+            lines = [line for line in lines if line]
+        return lines
+
+    def pending(self) -> int:
+        """Number of buffered bytes belonging to an incomplete line."""
+        return len(self._buf)
+
+
+_TAG_UNESCAPES = {':': ';', 's': ' ', '\\': '\\', 'r': '\r', 'n': '\n'}
+
+
+def _unescape_tag_value(value: str) -> str:
+    """Undo IRCv3 message-tag value escaping."""
+    if '\\' not in value:
+        return value
+    out = []
+    i = 0
+    length = len(value)
+    while i < length:
+        ch = value[i]
+        if ch == '\\':
+            i += 1
+            if i < length:  # a lone trailing backslash is dropped
+                out.append(_TAG_UNESCAPES.get(value[i], value[i]))
+        else:
+            out.append(ch)
+        i += 1
+    return ''.join(out)
+
+
+class IRCMessage:
+    """A parsed IRC line: tags, source (nick/user/host), command and params.
+
+    ``params`` holds every parameter with the trailing one (if any) last, so
+    handlers never see leading colons. Tag values are only unescaped the first
+    time ``tags`` is read. ``tracked`` and ``quiet`` are set once the bot has
+    applied the line's membership changes (see IRCBot.track_roster).
+    """
+
+    __slots__ = ("raw", "_raw_tags", "_tags", "source", "nick", "user", "host", "command", "params",
+                 "tracked", "quiet")
+
+    def __init__(self, raw: str, raw_tags: Optional[str], source: str, command: str, params: List[str]):
+        self.raw = raw
+        self._raw_tags = raw_tags
+        self._tags = None
+        self.source = source
+        self.command = command
+        self.params = params
+        self.tracked = False
+        self.quiet = False  # membership applied, but skip the join/part callbacks (a netjoin)
+
+        # nick!user@host, or just a server name
+        nick, user, host = source, "", ""
+        at = source.find('@')
+        if at >= 0:
+            nick, host = source[:at], source[at + 1:]
+        bang = nick.find('!')
+        if bang >= 0:
+            nick, user = nick[:bang], nick[bang + 1:]
+        self.nick = nick
+        self.user = user
+        self.host = host
+
+    @property
+    def tags(self) -> Dict[str, str]:
+        if self._tags is None:
+            tags = {}
+            if self._raw_tags:
+                for item in self._raw_tags.split(';'):
+                    if not item:
+                        continue
+                    key, _, value = item.partition('=')
+                    tags[key] = _unescape_tag_value(value)
+            self._tags = tags
+        return self._tags
+
+    @property
+    def trailing(self) -> str:
+        """The last parameter (message text for PRIVMSG/NOTICE/PART/QUIT...)."""
+        return self.params[-1] if self.params else ""
+
+    def __repr__(self) -> str:
+        return f"IRCMessage({self.raw!r})"
+
+
+def parse_irc_message(line: str) -> Optional[IRCMessage]:
+    """Parse one IRC line in a single pass; returns None for malformed lines."""
+    rest = line
+    raw_tags = None
+    if rest.startswith('@'):
+        raw_tags, _, rest = rest[1:].partition(' ')
+        rest = rest.lstrip(' ')
+
+    source = ""
+    if rest.startswith(':'):
+        source, _, rest = rest[1:].partition(' ')
+        rest = rest.lstrip(' ')
+
+    command, _, rest = rest.partition(' ')
+    if not command:
+        return None
+
+    if rest.startswith(':'):
+        params = [rest[1:]]
+    else:
+        middle, sep, trailing = rest.partition(' :')
+        params = middle.split()
+        if sep:
+            params.append(trailing)
+
+    return IRCMessage(line, raw_tags, source, command.upper(), params)
+
+
+class LatencyHistogram:
+    """Log-scale latency histogram (seconds) cheap enough for per-line use.
+
+    Buckets double from 50us up to ~100s; percentiles report the upper bound
+    of the bucket they fall in.
+    """
+
+    BOUNDS = tuple(0.00005 * 2 ** i for i in range(22))
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class OutboundScheduler:
+    """Deficit round robin over per-target queues of outbound lines.
+
+    Lines are keyed by target (channel or nick, "" for server commands). Each
+    target with pending lines gets ``quantum`` bytes of credit per turn, so a
+    long sequence in one channel only delays other channels by about one
+    turn instead of by its whole length.
+    """
+
+    def __init__(self, quantum: int = 512):
+        self.quantum = quantum
+        self.queues: Dict[str, deque] = {}
+        self.deficit: Dict[str, int] = {}
+        self.active: deque = deque()  # targets with pending lines, in turn order
+        self.peak_depth = 0
+        self._in_turn = False
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def push(self, target: str, item: Any, cost: int):
+        queue = self.queues.get(target)
+        if queue is None:
+            queue = self.queues[target] = deque()
+            self.deficit[target] = 0
+            self.active.append(target)
+        queue.append((cost, item))
+        self._len += 1
+        if len(queue) > self.peak_depth:
+            self.peak_depth = len(queue)
+
+    def pop(self) -> Any:
+        """Return the next item in DRR order, or None when empty."""
+        active = self.active
+        while active:
+            target = active[0]
+            if not self._in_turn:
+                self.deficit[target] += self.quantum
+                self._in_turn = True
+            queue = self.queues[target]
+            cost, item = queue[0]
+            if self.deficit[target] >= cost:
+                self.deficit[target] -= cost
+                queue.popleft()
+                self._len -= 1
+                if not queue:
+                    del self.queues[target]
+                    del self.deficit[target]
+                    active.popleft()
+                    self._in_turn = False
+                return item
+            # Out of credit for this turn; move on to the next target
+            active.rotate(-1)
+            self._in_turn = False
+        return None
+
+    def drain(self) -> List[Any]:
+        """Remove and return every queued item."""
+        items = [item for queue in self.queues.values() for _, item in queue]
+        self.queues.clear()
+        self.deficit.clear()
+        self.active.clear()
+        self._in_turn = False
+        self._len = 0
+        return items
+
+    def depths(self) -> Dict[str, int]:
+        return {target: len(queue) for target, queue in self.queues.items()}
+
+
+def _is_grapheme_extender(ch: str) -> bool:
+    """True for code points that attach to the previous character."""
+    return (unicodedata.combining(ch) != 0
+            or ch in '\u200d\ufe0e\ufe0f'
+            or '\U0001F3FB' <= ch <= '\U0001F3FF'  # skin tone modifiers
+            or '\U000E0020' <= ch <= '\U000E007F')  # tag sequences (flags)
+
+
+def split_message(text: str, max_bytes: int) -> List[str]:
+    """Split text into chunks of at most max_bytes UTF-8 bytes.
+
+    Breaks at the last space that fits, otherwise at a grapheme boundary, and
+    never inside a code point. Embedded CR/LF start a new chunk.
+    """
+    chunks = []
+    for paragraph in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+        rest = paragraph
+        while len(rest.encode('utf-8')) > max_bytes:
+            encoded = rest.encode('utf-8')
+            cut = max_bytes
+            while cut > 0 and (encoded[cut] & 0xC0) == 0x80:  # inside a code point
+                cut -= 1
+            head = encoded[:cut].decode('utf-8')
+
+            space = head.rfind(' ')
+            if space > 0:
+                end, skip = space, space + 1
+            else:
+                end = max(len(head), 1)
+                while end > 1 and (_is_grapheme_extender(rest[end]) or rest[end - 1] == '\u200d'):
+                    end -= 1
+                skip = end
+            chunks.append(rest[:end])
+            rest = rest[skip:].lstrip(' ')
+        if rest:
+            chunks.append(rest)
+    return chunks
+
+# Nick/channel case folding tables for the ISUPPORT CASEMAPPING values.
+# rfc1459 (the protocol default) also folds []\~ to {}|^
+_CASEMAPS = {
+    "ascii": str.maketrans(string.ascii_uppercase, string.ascii_lowercase),
+    "strict-rfc1459": str.maketrans(string.ascii_uppercase + "[]\\",
+                                    string.ascii_lowercase + "{}|"),
+    "rfc1459": str.maketrans(string.ascii_uppercase + "[]\\~",
+                             string.ascii_lowercase + "{}|^"),
+}
+
+
+def casefold(text: str, casemapping: str = "rfc1459") -> str:
+    """Fold a nick or channel name under an IRC casemapping.
+
+    Unknown mappings (e.g. rfc7613, which allows non-ASCII nicks) fall back
+    to rfc1459 plus Unicode lowercasing.
+    """
+    table = _CASEMAPS.get(casemapping)
+    if table is None:
+        return text.translate(_CASEMAPS["rfc1459"]).lower()
+    return text.translate(table)
+
+
+def plan_joins(channels: List[tuple], line_limit: int = 512,
+               max_targets: Optional[int] = None) -> List[str]:
+    """Pack (channel, key) pairs into as few ``JOIN #a,#b key1,key2`` lines
+    as fit in line_limit bytes (CRLF included) and max_targets channels.
+
+    Keyed channels lead each line so the key list lines up positionally.
+    """
+    ordered = [c for c in channels if c[1]] + [c for c in channels if not c[1]]
+    lines = []
+    names: List[str] = []
+    keys: List[str] = []
+    names_len = keys_len = 0
+    for channel, key in ordered:
+        new_names = names_len + len(channel.encode('utf-8')) + (1 if names else 0)
+        new_keys = keys_len + (len(key.encode('utf-8')) + (1 if keys else 0) if key else 0)
+        length = len("JOIN ") + new_names + (1 + new_keys if new_keys else 0) + 2
+        if names and (length > line_limit or (max_targets and len(names) >= max_targets)):
+            lines.append(f"JOIN {','.join(names)} {','.join(keys)}".rstrip())
+            names, keys = [], []
+            names_len = keys_len = 0
+            new_names = len(channel.encode('utf-8'))
+            new_keys = len(key.encode('utf-8')) if key else 0
+        names.append(channel)
+        names_len = new_names
+        if key:
+            keys.append(key)
+            keys_len = new_keys
+    if names:
+        lines.append(f"JOIN {','.join(names)} {','.join(keys)}".rstrip())
+    return lines
+
+
+class FloodLimiter:
+    """Token bucket for outbound lines whose rate adapts to the server.
+
+    Additive increase: every ``ramp_interval`` seconds in which we actually ran
+    out of tokens and the server stayed quiet, the rate grows by ``ramp_step``.
+    Multiplicative decrease: an Excess Flood ERROR, RPL_TRYAGAIN or a
+    disconnect right after heavy sending cuts it by ``backoff_factor``.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: float = 5.0, min_rate: float = 0.5,
+                 max_rate: float = 8.0, ramp_step: float = 0.25, ramp_interval: float = 60.0,
+                 backoff_factor: float = 0.5, adaptive: bool = True):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.ramp_step = ramp_step
+        self.ramp_interval = ramp_interval
+        self.backoff_factor = backoff_factor
+        self.adaptive = adaptive
+
+        self.tokens = min(3.0, burst)
+        self.last_refill = time.time()
+        self.last_adjust = self.last_refill
+        self.saturated_at = 0.0  # last time a line had to wait for a token
+        self.throttle_count = 0
+        self.throttle_events: deque = deque(maxlen=20)  # (timestamp, reason, new_rate)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'FloodLimiter':
+        keys = ('rate', 'burst', 'min_rate', 'max_rate', 'ramp_step',
+                'ramp_interval', 'backoff_factor', 'adaptive')
+        return cls(**{k: config[k] for k in keys if k in config})
+
+    def new_connection(self):
+        """The server's flood counter starts over on a new connection."""
+        self.tokens = max(self.tokens, min(3.0, self.burst))
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def take(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until the next token; also marks the bucket as saturated."""
+        self.saturated_at = time.time()
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def recently_saturated(self, window: float = 10.0) -> bool:
+        return time.time() - self.saturated_at < window
+
+    def _set_rate(self, rate: float):
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        # Keep the original 2.5 s worth of burst at any rate
+        self.burst = max(2.0, self.rate * 2.5)
+        self.tokens = min(self.tokens, self.burst)
+
+    def maybe_ramp_up(self, now: float):
+        """Grow the rate after a quiet interval in which we were rate limited."""
+        if not self.adaptive or now - self.last_adjust < self.ramp_interval:
+            return
+        if self.saturated_at >= self.last_adjust and self.rate < self.max_rate:
+            self._set_rate(self.rate + self.ramp_step)
+            logging.info(f"Flood limiter: server quiet, raising rate to {self.rate:.2f} msg/s")
+        self.last_adjust = now
+
+    def on_throttle(self, reason: str):
+        """Back off after the server signalled we were sending too fast."""
+        now = time.time()
+        if self.throttle_events and now - self.throttle_events[-1][0] < 5.0:
+            return  # ERROR + disconnect for the same incident count once
+        self.throttle_count += 1
+        if self.adaptive:
+            self._set_rate(self.rate * self.backoff_factor)
+        self.tokens = 0.0
+        self.last_adjust = now
+        self.throttle_events.append((now, reason, self.rate))
+        logging.warning(f"Flood limiter: {reason}, rate now {self.rate:.2f} msg/s")
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'rate': self.rate, 'burst': self.burst}
+
+    def restore(self, data: Dict[str, float]):
+        if 'rate' in data:
+            self._set_rate(float(data['rate']))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'tokens': self.tokens,
+            'throttle_count': self.throttle_count,
+            'throttle_events': [
+                {'time': ts, 'reason': reason, 'rate': rate}
+                for ts, reason, rate in self.throttle_events
+            ],
+        }
+
+
+class GCRA:
+    """Generic cell rate algorithm: a token bucket of ``burst`` refilling at
+    ``rate`` per second, stored as one timestamp per key."""
+
+    __slots__ = ("interval", "tolerance", "tat")
+
+    def __init__(self, rate: float, burst: float):
+        self.interval = 1.0 / rate
+        self.tolerance = (max(1.0, burst) - 1.0) * self.interval
+        self.tat: Dict[str, float] = {}  # key -> theoretical arrival time
+
+    def conforms(self, key: str, now: float) -> bool:
+        """Whether ``allow`` would pass, without spending anything."""
+        return self.tat.get(key, now) - now <= self.tolerance
+
+    def charge(self, key: str, now: float):
+        self.tat[key] = max(self.tat.get(key, now), now) + self.interval
+
+    def allow(self, key: str, now: float) -> bool:
+        if not self.conforms(key, now):
+            return False
+        self.charge(key, now)
+        return True
+
+    def prune(self, now: float):
+        """Forget keys whose bucket has refilled; they behave as new keys."""
+        self.tat = {key: tat for key, tat in self.tat.items() if tat > now}
+
+
+class InboundFloodControl:
+    """Inbound budgets per user (user@host, else folded nick) and per channel,
+    with separate buckets for commands (lines addressed to the bot or
+    starting with "!") and for ambient chatter.
+
+    ``check`` returns "ok", "drop" or "warn"; "warn" is a dropped command
+    from a user who has not been warned in ``warn_cooldown`` seconds. A line
+    is only charged to its buckets once both have room, so lines dropped
+    for the channel do not eat into the sender's budget.
+    """
+
+    KINDS = ("command", "ambient")
+
+    def __init__(self, user: Dict[str, Dict[str, float]], channel: Dict[str, Dict[str, float]],
+                 warn: bool = True, warn_cooldown: float = 300.0):
+        self.user = {kind: GCRA(**user[kind]) for kind in self.KINDS}
+        self.channel = {kind: GCRA(**channel[kind]) for kind in self.KINDS}
+        self.warn = warn
+        self.warn_cooldown = warn_cooldown
+        self.warned: Dict[str, float] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}  # key -> allowed/dropped/warned
+        self.nicks: Dict[str, str] = {}  # user key -> nick it was last seen as
+        self.last_prune = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'InboundFloodControl':
+        keys = ('user', 'channel', 'warn', 'warn_cooldown')
+        return cls(**{k: config[k] for k in keys if k in config})
+
+    def _count(self, key: str, outcome: str):
+        counters = self.counters.get(key)
+        if counters is None:
+            counters = self.counters[key] = {'allowed': 0, 'dropped': 0, 'warned': 0}
+        counters[outcome] += 1
+
+    def check(self, user_key: str, channel_key: Optional[str], command: bool, now: float,
+              nick: Optional[str] = None) -> str:
+        if now - self.last_prune > 60.0:
+            self.prune(now)
+        if nick:
+            self.nicks[user_key] = nick
+        kind = "command" if command else "ambient"
+        user, channel = self.user[kind], self.channel[kind]
+        if not user.conforms(user_key, now):
+            blamed = user_key
+        elif channel_key is not None and not channel.conforms(channel_key, now):
+            blamed = channel_key
+        else:
+            user.charge(user_key, now)
+            if channel_key is not None:
+                channel.charge(channel_key, now)
+            self._count(user_key, 'allowed')
+            return "ok"
+        self._count(blamed, 'dropped')
+        if command and self.warn and blamed == user_key and now - self.warned.get(user_key, -1e9) >= self.warn_cooldown:
+            self.warned[user_key] = now
+            self._count(user_key, 'warned')
+            return "warn"
+        return "drop"
+
+    def prune(self, now: float):
+        """Drop idle buckets, expired warnings and counters for quiet keys."""
+        self.last_prune = now
+        for buckets in (self.user, self.channel):
+            for bucket in buckets.values():
+                bucket.prune(now)
+        self.warned = {key: at for key, at in self.warned.items() if now - at < self.warn_cooldown}
+        active = {key for buckets in (self.user, self.channel) for bucket in buckets.values() for key in bucket.tat}
+        self.counters = {
+            key: counters for key, counters in self.counters.items()
+            if key in active or key in self.warned
+        }
+        self.nicks = {key: nick for key, nick in self.nicks.items() if key in self.counters}
+
+    def display_name(self, key: str) -> str:
+        """The nick behind a user key (keys can be user@host), else the key."""
+        return self.nicks.get(key, key)
+
+    def stats(self, top: int = 5) -> Dict[str, Any]:
+        dropped = sum(counters['dropped'] for counters in self.counters.values())
+        noisiest = sorted(
+            ((key, counters) for key, counters in self.counters.items() if counters['dropped']),
+            key=lambda item: item[1]['dropped'], reverse=True,
+        )[:top]
+        return {'dropped': dropped, 'keys': len(self.counters), 'top': dict(noisiest)}
+
+
+class CapabilityManager:
+    """IRCv3 capability negotiation state (CAP LS 302, REQ/ACK/NAK, NEW/DEL).
+
+    The on_* methods take the CAP arguments after the subcommand and return
+    the lines to send back. ``enabled`` is what plugins and the core consult.
+    """
+
+    DEFAULT_CAPS = (
+        "message-tags", "server-time", "multi-prefix", "extended-join",
+        "away-notify", "account-notify", "chghost", "echo-message",
+        "batch", "cap-notify",
+    )
+
+    def __init__(self, wanted, sasl: bool = False):
+        self.wanted = set(wanted)
+        if sasl:
+            self.wanted.add("sasl")
+        self.reset()
+
+    def reset(self):
+        """Forget everything negotiated on the previous connection."""
+        self.available: Dict[str, str] = {}  # cap -> value, e.g. sasl -> "PLAIN,EXTERNAL"
+        self.enabled: set = set()
+        self.pending: set = set()  # requested but not yet ACKed/NAKed
+        self.sasl_pending = False
+        self.ended = False
+        self._ls_buffer: List[str] = []
+
+    @staticmethod
+    def _parse_caps(text: str) -> Dict[str, str]:
+        caps = {}
+        for item in text.split():
+            name, _, value = item.partition('=')
+            caps[name] = value
+        return caps
+
+    def _request(self, names) -> List[str]:
+        """CAP REQ lines for names, each kept well inside the 512-byte limit."""
+        lines, current = [], []
+        for name in sorted(names):
+            if current and len(' '.join(current + [name])) > 400:
+                lines.append(f"CAP REQ :{' '.join(current)}")
+                current = []
+            current.append(name)
+        if current:
+            lines.append(f"CAP REQ :{' '.join(current)}")
+        self.pending.update(names)
+        return lines
+
+    def _maybe_end(self) -> List[str]:
+        if self.ended or self.pending or self.sasl_pending:
+            return []
+        self.ended = True
+        return ["CAP END"]
+
+    def on_ls(self, args: List[str]) -> List[str]:
+        # Multi-line replies mark every line but the last with "*"
+        if len(args) >= 2 and args[0] == '*':
+            self._ls_buffer.append(args[1])
+            return []
+        self._ls_buffer.append(args[-1] if args else "")
+        self.available.update(self._parse_caps(' '.join(self._ls_buffer)))
+        self._ls_buffer = []
+        if self.ended:
+            return []
+        wanted = {cap for cap in self.wanted if cap in self.available} - self.enabled
+        return self._request(wanted) + self._maybe_end()
+
+    def on_ack(self, args: List[str]) -> List[str]:
+        lines = []
+        for name in (args[-1] if args else "").split():
+            if name.startswith('-'):
+                self.enabled.discard(name[1:])
+                self.pending.discard(name[1:])
+                continue
+            self.pending.discard(name)
+            self.enabled.add(name)
+            if name == "sasl" and not self.ended:
+                self.sasl_pending = True
+                lines.append("AUTHENTICATE PLAIN")
+        return lines + self._maybe_end()
+
+    def on_nak(self, args: List[str]) -> List[str]:
+        for name in (args[-1] if args else "").split():
+            self.pending.discard(name)
+        return self._maybe_end()
+
+    def on_new(self, args: List[str]) -> List[str]:
+        new = self._parse_caps(args[-1] if args else "")
+        self.available.update(new)
+        # SASL only makes sense during registration
+        wanted = {cap for cap in new if cap in self.wanted and cap != "sasl"} - self.enabled
+        return self._request(wanted)
+
+    def on_del(self, args: List[str]) -> List[str]:
+        for name in (args[-1] if args else "").split():
+            self.available.pop(name, None)
+            self.enabled.discard(name)
+        return []
+
+    def sasl_done(self) -> List[str]:
+        self.sasl_pending = False
+        return self._maybe_end()
+
+
 # Simple IRC client implementation
 class IRCBot:
+    # Handled inline by the socket reader instead of waiting in the inbound
+    # queue: keepalive (both directions), capability negotiation, SASL and registration numerics
+    FAST_LANE_COMMANDS = frozenset({
+        "PING", "PONG", "CAP", "AUTHENTICATE", "001", "433", "903", "904", "905",
+        "906", "908", "ERROR", "263",
+    })
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.reader = None
         self.writer = None
         self.channels = set()
+        self.channel_keys: Dict[str, str] = {}
+
+        # JOIN tracking for the current connection, keyed by lowercase name
+        self.join_pending: Dict[str, tuple] = {}   # -> (channel, key) sent, not confirmed
+        self.join_confirmed: set = set()
+        self.join_failed: Dict[str, str] = {}      # -> numeric and reason
+        self._join_tokens = 0.0
+        self._join_refill_at = 0.0
+        self._join_retry_task: Optional[asyncio.Task] = None
+        self._welcome_done = asyncio.Event()       # end of MOTD: ISUPPORT is complete
         self.connected = False
         self.registered = False
         self.sasl_in_progress = False
         self.exit_code = 0
 
-        # Token-bucket rate limiter for outgoing messages
-        self._send_tokens = 3.0       # current tokens (messages we can send now)
-        self._send_max_tokens = 5.0   # burst capacity
-        self._send_rate = 2.0         # tokens refilled per second
-        self._send_last_refill = time.time()
-        
+        # Server-provided limits: ISUPPORT tokens and our nick!user@host
+        self.isupport: Dict[str, str] = {}
+        self.own_prefix: Optional[str] = None
+        self._apply_isupport()
+
+        # IRCv3 capabilities and the per-user facts they give us for free
+        self.caps = CapabilityManager(
+            config.get('capabilities', CapabilityManager.DEFAULT_CAPS),
+            sasl=config.get('sasl', {}).get('enabled', False),
+        )
+        # Client-side keepalive: we PING the server and time the PONG
+        keepalive = config.get('keepalive', {})
+        self.keepalive_interval = keepalive.get('interval', 30)
+        self.keepalive_max_lag = keepalive.get('max_lag', 120)
+        self.ambient_max_lag = keepalive.get('ambient_max_lag', 5)
+        self.lag = 0.0  # last measured round trip, seconds
+        self.lag_histogram = LatencyHistogram()
+        self.lag_reconnects = 0
+        self._ping_token: Optional[str] = None
+        self._ping_sent_at: Optional[float] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+        self.accounts: Dict[str, Optional[str]] = {}  # lowercase nick -> services account
+        self.away: set = set()                        # lowercase nicks marked away
+        self.batches: Dict[str, List[str]] = {}       # open BATCH ref -> [type, params...]
+
+        # Adaptive token-bucket rate limiter for outgoing messages
+        self.flood = FloodLimiter.from_config(config.get('flood_control', {}))
+
+        # Small separate budget for protocol-control replies (PONG, CAP, SASL...)
+        self._urgent_tokens = 4.0
+        self._urgent_max_tokens = 4.0
+        self._urgent_rate = 1.0
+        self._urgent_last_refill = time.time()
+
+        # Outbound lines wait here for the single writer task
+        self._outbound = OutboundScheduler()
+        self._outbound_urgent: deque = deque()
+        self._outbound_ambient = OutboundScheduler()  # unsolicited chatter, held back while lagging
+        self._outbound_wakeup = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self.outbound_stats = {'lines': 0, 'writes': 0}
+
+        # Inbound line queue between the socket reader and dispatchers
+        self._inbound: Optional[asyncio.Queue] = None
+        self._inbound_max = 10000
+        # Per-channel dispatch lanes (used instead of _inbound when enabled)
+        self._lanes: Dict[str, asyncio.Queue] = {}
+        self._lane_tasks: Dict[str, asyncio.Task] = {}
+        self._lanes_waiting: deque = deque()
+        self._lanes_idle: Set[str] = set()
+        self._lane_backlog = 0
+        self._lane_space = asyncio.Event()
+        self._lane_limit = 0
+        self._lane_idle = 30
+        self._lanes_closing = False
+        self.lane_stats = {'started': 0, 'reaped': 0, 'waited': 0, 'max_active': 0}
+        self.inbound_stats = {'enqueued': 0, 'dispatched': 0, 'dropped': 0, 'blocked': 0, 'max_depth': 0}
+        self.inbound_latency = LatencyHistogram()
+
     async def connect(self):
         """Connect to IRC server with SSL support"""
         try:
@@ -59,14 +830,29 @@ class IRCBot:
                 ssl=ssl_context
             )
             self.connected = True
+            self.registered = False
+            self._welcome_done = asyncio.Event()
+            self.join_pending.clear()
+            self.join_confirmed.clear()
+            self.join_failed.clear()
+            self.isupport = {}
+            self._apply_isupport()
+            self.own_prefix = None
+            self.caps.reset()
+            self.accounts.clear()
+            self.away.clear()
+            self.batches.clear()
+            self._start_writer()
+            self._start_keepalive()
             
-            # Send connection sequence
-            await self.send(f"NICK {self.config['nick']}")
-            await self.send(f"USER {self.config['nick']} 0 * :{self.config['realname']}")
-            
-            # Request capabilities if using SASL
-            if self.config.get('sasl', {}).get('enabled', False):
-                await self.send("CAP LS 302")
+            # Send connection sequence; CAP LS goes first so the server holds
+            # registration until we send CAP END
+            if self.caps.wanted:
+                await self.send("CAP LS 302", urgent=True)
+            else:
+                self.caps.ended = True
+            await self.send(f"NICK {self.config['nick']}", urgent=True)
+            await self.send(f"USER {self.config['nick']} 0 * :{self.config['realname']}", urgent=True)
             
             ssl_status = "with SSL" if ssl_context else "without SSL"
             logging.info(f"Connected to {self.config['server']}:{port} {ssl_status}")
@@ -84,58 +870,383 @@ class IRCBot:
             return "PRIVMSG NickServ :IDENTIFY [REDACTED]"
         return message
 
-    async def send(self, message: str):
-        """Send raw IRC message with token-bucket rate limiting."""
-        if self.writer:
-            # Refill tokens based on elapsed time
-            now = time.time()
-            elapsed = now - self._send_last_refill
-            self._send_tokens = min(self._send_max_tokens,
-                                    self._send_tokens + elapsed * self._send_rate)
-            self._send_last_refill = now
-
-            # Wait if no tokens available
-            if self._send_tokens < 1.0:
-                wait = (1.0 - self._send_tokens) / self._send_rate
-                await asyncio.sleep(wait)
-                self._send_tokens = 1.0
-                self._send_last_refill = time.time()
-
-            self._send_tokens -= 1.0
-
-            self.writer.write(f"{message}\r\n".encode())
-            await self.writer.drain()
-            log_message = self._redact_sensitive(message)
+    def _refill_tokens(self, now: float):
+        """Top up both token buckets for the time elapsed since the last call."""
+        self.flood.refill(now)
+        self._urgent_tokens = min(self._urgent_max_tokens,
+                                  self._urgent_tokens + (now - self._urgent_last_refill) * self._urgent_rate)
+        self._urgent_last_refill = now
+
+    def _line_target(self, message: str) -> str:
+        """Fair-scheduling key for an outbound line: the folded PRIVMSG/NOTICE target."""
+        if message.startswith(("PRIVMSG ", "NOTICE ")):
+            return self.casefold(message.split(' ', 2)[1])
+        return ""
+
+    def queue_line(self, message: str, urgent: bool = False, target: Optional[str] = None,
+                   ambient: bool = False) -> asyncio.Future:
+        """Hand a raw line to the writer task.
+
+        Returns a future that resolves to True once the line has been written
+        and drained, or False if the connection went away first.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if not self.writer or self._writer_task is None:
+            future.set_result(False)
+            return future
+        if urgent:
+            self._outbound_urgent.append((message, future))
+        else:
+            if target is None:
+                target = self._line_target(message)
+            queue = self._outbound_ambient if ambient else self._outbound
+            queue.push(target, (message, future), len(message) + 2)
+        self._outbound_wakeup.set()
+        return future
+
+    async def send(self, message: str, urgent: bool = False, wait: bool = False,
+                   ambient: bool = False):
+        """Queue a raw IRC message for the rate-limited writer task.
+
+        Urgent lines (PONG, CAP, AUTHENTICATE, NICK retries) bypass the main
+        bucket while the small urgent budget lasts, so they never queue behind
+        channel output. Ambient lines (unprompted chatter) only go out when
+        nothing else is queued and lag is under ambient_max_lag. Pass
+        wait=True to block until the line is on the wire.
+        """
+        future = self.queue_line(message, urgent=urgent, ambient=ambient)
+        if wait:
+            return await future
+        return future
+
+    def _start_writer(self):
+        self.flood.new_connection()
+        self._urgent_tokens = self._urgent_max_tokens
+        self._outbound.drain()
+        self._outbound_ambient.drain()
+        self._outbound_urgent.clear()
+        self._outbound_wakeup = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._writer_loop(), name="outbound_writer")
+
+    async def _stop_writer(self, flush_timeout: float = 2.0):
+        """Give queued lines a moment to go out, then stop the writer task."""
+        task = self._writer_task
+        if task is None:
+            return
+        deadline = time.monotonic() + flush_timeout
+        while (self._outbound or self._outbound_urgent) and not task.done() \
+                and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._writer_task = None
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        pending = list(self._outbound_urgent) + self._outbound.drain() + self._outbound_ambient.drain()
+        for _, future in pending:
+            if not future.done():
+                future.set_result(False)
+        self._outbound_urgent.clear()
+
+    def _take_eligible_lines(self) -> List[tuple]:
+        """Pop every queued line the buckets allow right now."""
+        self._refill_tokens(time.time())
+        batch = []
+        while self._outbound_urgent:
+            if self._urgent_tokens >= 1.0:
+                self._urgent_tokens -= 1.0
+            elif not self.flood.take():
+                break
+            batch.append(self._outbound_urgent.popleft())
+        while self._outbound and self.flood.take():
+            batch.append(self._outbound.pop())
+        if not self._outbound and not self.congested():
+            while self._outbound_ambient and self.flood.take():
+                batch.append(self._outbound_ambient.pop())
+        return batch
+
+    async def _writer_loop(self):
+        """Single owner of the socket's write side: rate limits queued lines
+        and coalesces everything eligible into one write() + drain()."""
+        while True:
+            if not (self._outbound or self._outbound_urgent or self._outbound_ambient):
+                self._outbound_wakeup.clear()
+                await self._outbound_wakeup.wait()
+
+            batch = self._take_eligible_lines()
+            if not batch:
+                # Out of tokens: sleep until the next one, or until an urgent
+                # line arrives that its own budget may cover. If only ambient
+                # lines are left, the link is lagging: check back shortly
+                if self._outbound or self._outbound_urgent or not self.congested():
+                    wait = self.flood.wait_time()
+                else:
+                    wait = 0.5
+                self._outbound_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._outbound_wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                self.writer.write("".join(f"{message}\r\n" for message, _ in batch).encode())
+                await self.writer.drain()
+            except Exception as e:
+                logging.error(f"Error writing to socket: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(False)
+                continue
+
+            self.outbound_stats['lines'] += len(batch)
+            self.outbound_stats['writes'] += 1
+            self.flood.maybe_ramp_up(time.time())
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(True)
+            await self._log_sent([message for message, _ in batch])
+
+    async def _log_sent(self, messages: List[str]):
+        log_messages = [self._redact_sensitive(message) for message in messages]
+        for log_message in log_messages:
             logging.debug(f"SENT: {log_message}")
 
-            # Also log to file if configured
-            if hasattr(self, 'irc_log_file') and self.irc_log_file:
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                async with aiofiles.open(self.irc_log_file, 'a') as f:
-                    await f.write(f"[{timestamp}] SENT: {log_message}\n")
-    
-    async def privmsg(self, target: str, message: str):
-        """Send PRIVMSG, truncating if it would exceed IRC line limits."""
-        # IRC line limit is 512 bytes including CRLF; leave room for protocol overhead
-        max_msg_len = 400
-        if len(message.encode('utf-8')) > max_msg_len:
-            message = message[:max_msg_len].rsplit(' ', 1)[0] + "..."
-        await self.send(f"PRIVMSG {target} :{message}")
-
-    async def action(self, target: str, message: str):
-        """Send ACTION (/me), truncating if it would exceed IRC line limits."""
-        max_msg_len = 390  # slightly less to account for \001ACTION\001 wrapper
-        if len(message.encode('utf-8')) > max_msg_len:
-            message = message[:max_msg_len].rsplit(' ', 1)[0] + "..."
-        await self.send(f"PRIVMSG {target} :\001ACTION {message}\001")
-    
+        # Also log to file if configured
+        if hasattr(self, 'irc_log_file') and self.irc_log_file:
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            async with aiofiles.open(self.irc_log_file, 'a') as f:
+                await f.write("".join(f"[{timestamp}] SENT: {m}\n" for m in log_messages))
+
+    def outbound_queue_stats(self) -> Dict[str, Any]:
+        """Pending outbound lines per target plus writer and limiter state."""
+        stats = dict(self.outbound_stats)
+        stats['flood'] = self.flood.stats()
+        stats['urgent'] = len(self._outbound_urgent)
+        stats['pending'] = len(self._outbound)
+        stats['ambient'] = len(self._outbound_ambient)
+        stats['peak_target_depth'] = self._outbound.peak_depth
+        stats['targets'] = self._outbound.depths()
+        return stats
+
+    def _start_keepalive(self):
+        self.lag = 0.0
+        self._ping_token = None
+        self._ping_sent_at = None
+        if self.keepalive_interval > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop(), name="keepalive")
+
+    async def _stop_keepalive(self):
+        task, self._keepalive_task = self._keepalive_task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def current_lag(self) -> float:
+        """Round-trip lag in seconds, counting a PING still awaiting its PONG."""
+        if self._ping_sent_at is not None:
+            return max(self.lag, time.monotonic() - self._ping_sent_at)
+        return self.lag
+
+    def congested(self) -> bool:
+        """True while lag is high enough that ambient chatter should wait."""
+        return self.current_lag() > self.ambient_max_lag
+
+    async def _keepalive_loop(self):
+        """PING the server every keepalive_interval and drop the connection
+        if a PONG takes longer than keepalive_max_lag (a dead NAT/TLS path
+        otherwise leaves read() hanging until TCP gives up)."""
+        tick = min(1.0, self.keepalive_interval / 4)
+        last_ping = time.monotonic()
+        while self.connected:
+            await asyncio.sleep(tick)
+            now = time.monotonic()
+            if self._ping_sent_at is not None:
+                if now - self._ping_sent_at > self.keepalive_max_lag:
+                    logging.warning(f"No PONG for {now - self._ping_sent_at:.0f}s, reconnecting")
+                    self.lag_reconnects += 1
+                    self._ping_sent_at = None
+                    if self.writer:
+                        self.writer.transport.abort()  # close() would wait on the dead socket
+                    return
+            elif self.registered and now - last_ping >= self.keepalive_interval:
+                last_ping = now
+                self._ping_token = f"pymotion-{int(now * 1000)}"
+                self._ping_sent_at = now
+                self.queue_line(f"PING :{self._ping_token}", urgent=True)
+
+    def _handle_pong(self, msg: IRCMessage):
+        if self._ping_sent_at is None or msg.trailing != self._ping_token:
+            return
+        self.lag = time.monotonic() - self._ping_sent_at
+        self.lag_histogram.observe(self.lag)
+        self._ping_sent_at = None
+
+    async def disconnect(self, flush_timeout: float = 2.0):
+        """Flush and stop the writer task, then close the socket."""
+        if self._join_retry_task:
+            self._join_retry_task.cancel()
+            self._join_retry_task = None
+        await self._stop_keepalive()
+        await self._stop_writer(flush_timeout)
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+    def _text_budget(self, target: str, overhead: int = 0) -> int:
+        """UTF-8 bytes of message text that fit in one PRIVMSG to target.
+
+        Uses our real nick!user@host as relayed by the server (learned from
+        our own JOIN echo) and the server's LINELEN, falling back to a
+        worst-case hostmask until we have seen one.
+        """
+        prefix = self.own_prefix or f"{self.config['nick']}!{'u' * 10}@{'h' * 63}"
+        line_len = int(self.isupport.get('LINELEN') or 512)
+        header = len(f":{prefix} PRIVMSG {target} :".encode('utf-8'))
+        return line_len - header - overhead - 2  # CRLF
+
+    def _split_reply(self, target: str, message: str, overhead: int = 0) -> List[str]:
+        """Split a reply into wire-sized chunks, capped at max_reply_lines."""
+        budget = self._text_budget(target, overhead)
+        chunks = split_message(message, budget)
+        max_lines = max(1, int(self.config.get('max_reply_lines', 4)))
+        if len(chunks) > max_lines:
+            last = split_message(chunks[max_lines - 1], budget - 3)[0]
+            chunks = chunks[:max_lines - 1] + [last + "..."]
+        return chunks
+
+    async def privmsg(self, target: str, message: str, ambient: bool = False):
+        """Send PRIVMSG, splitting into continuation lines at the byte limit.
+
+        Pass ambient=True for unprompted chatter that can wait out lag.
+        """
+        for chunk in self._split_reply(target, message):
+            await self.send(f"PRIVMSG {target} :{chunk}", ambient=ambient)
+
+    async def action(self, target: str, message: str, ambient: bool = False):
+        """Send ACTION (/me), splitting into continuation lines at the byte limit."""
+        for chunk in self._split_reply(target, message, overhead=len("\001ACTION \001")):
+            await self.send(f"PRIVMSG {target} :\001ACTION {chunk}\001", ambient=ambient)
+
     async def join_channel(self, channel: str, key: str = None):
         """Join a channel with optional key"""
-        if key:
-            await self.send(f"JOIN {channel} {key}")
-        else:
-            await self.send(f"JOIN {channel}")
-        self.channels.add(channel)
+        await self.join_channels([(channel, key)])
+
+    def _chanlimits(self) -> Dict[str, Optional[int]]:
+        """Per-channel-type join limits from CHANLIMIT (or old MAXCHANNELS)."""
+        limits: Dict[str, Optional[int]] = {}
+        if 'CHANLIMIT' in self.isupport:
+            for entry in self.isupport['CHANLIMIT'].split(','):
+                prefixes, _, limit = entry.partition(':')
+                for prefix in prefixes:
+                    limits[prefix] = int(limit) if limit else None
+        elif self.isupport.get('MAXCHANNELS'):
+            for prefix in self.isupport.get('CHANTYPES', '#&'):
+                limits[prefix] = int(self.isupport['MAXCHANNELS'])
+        return limits
+
+    def _targmax(self, command: str) -> Optional[int]:
+        """TARGMAX limit for command; None when unlimited or not advertised."""
+        for entry in self.isupport.get('TARGMAX', '').split(','):
+            name, _, limit = entry.partition(':')
+            if name.upper() == command and limit:
+                return int(limit)
+        return None
+
+    async def join_channels(self, channels: List[tuple]):
+        """Join (channel, key) pairs in as few JOIN lines as the server allows.
+
+        Honours CHANLIMIT, TARGMAX, LINELEN and the join_throttle config;
+        confirmations and failures land in join_confirmed / join_failed.
+        """
+        limits = self._chanlimits()
+        in_use: Dict[str, int] = {}
+        for folded in list(self.join_confirmed) + list(self.join_pending):
+            in_use[folded[:1]] = in_use.get(folded[:1], 0) + 1
+
+        todo = []
+        for channel, key in channels:
+            folded = self.casefold(channel)
+            if folded in self.join_confirmed or folded in self.join_pending:
+                continue
+            prefix = channel[:1]
+            limit = limits.get(prefix)
+            if limit is not None and in_use.get(prefix, 0) >= limit:
+                logging.warning(f"Not joining {channel}: CHANLIMIT {prefix}:{limit} reached")
+                self.join_failed[folded] = "CHANLIMIT"
+                continue
+            in_use[prefix] = in_use.get(prefix, 0) + 1
+            self.channels.add(channel)
+            if key:
+                self.channel_keys[channel] = key
+            self.join_pending[folded] = (channel, key)
+            todo.append((channel, key))
+        await self._send_joins(todo)
+
+    async def _send_joins(self, channels: List[tuple]):
+        throttle = self.config.get('join_throttle', {})
+        per_second = throttle.get('channels_per_second', 0)
+        burst = max(1, throttle.get('burst', 20))
+        max_targets = self._targmax('JOIN')
+        if per_second > 0:
+            max_targets = min(max_targets or burst, burst)
+        line_limit = int(self.isupport.get('LINELEN') or 512)
+
+        for line in plan_joins(channels, line_limit, max_targets):
+            if per_second > 0:
+                # Channel-count token bucket for servers that throttle joins
+                needed = line.split(' ')[1].count(',') + 1
+                now = time.monotonic()
+                self._join_tokens = min(burst, self._join_tokens + (now - self._join_refill_at) * per_second)
+                self._join_refill_at = now
+                if self._join_tokens < needed:
+                    await asyncio.sleep((needed - self._join_tokens) / per_second)
+                    self._join_tokens = needed
+                    self._join_refill_at = time.monotonic()
+                self._join_tokens -= needed
+            await self.send(line)
+
+    def _join_confirmed(self, channel: str):
+        folded = self.casefold(channel)
+        self.join_confirmed.add(folded)
+        if self.join_pending.pop(folded, None) is not None and not self.join_pending:
+            self.on_joins_settled()
+
+    def _join_rejected(self, msg: IRCMessage):
+        """A JOIN error numeric: give up on the channel, or retry if throttled."""
+        if msg.command == "263":  # RPL_TRYAGAIN <client> <command>
+            if len(msg.params) > 1 and msg.params[1].upper() == "JOIN":
+                self._schedule_join_retry()
+            return
+        if len(msg.params) < 2:
+            return
+        folded = self.casefold(msg.params[1])
+        if folded not in self.join_pending:
+            return
+        if msg.command in ("437", "439"):  # ERR_UNAVAILRESOURCE / ERR_TARGETTOOFAST
+            self._schedule_join_retry()
+            return
+        channel, _ = self.join_pending.pop(folded)
+        self.join_failed[folded] = f"{msg.command} {msg.trailing}"
+        logging.warning(f"Could not join {channel}: {msg.trailing} ({msg.command})")
+        self._forget_channel(channel)
+        if not self.join_pending:
+            self.on_joins_settled()
+
+    def _schedule_join_retry(self):
+        if self._join_retry_task and not self._join_retry_task.done():
+            return
+        delay = self.config.get('join_throttle', {}).get('retry_after', 10)
+
+        async def retry():
+            await asyncio.sleep(delay)
+            if self.connected and self.join_pending:
+                logging.info(f"Retrying JOIN for {len(self.join_pending)} throttled channels")
+                await self._send_joins(list(self.join_pending.values()))
+
+        self._join_retry_task = asyncio.create_task(retry(), name="join_retry")
+
+    def on_joins_settled(self):
+        """Called when every JOIN sent on this connection has been answered."""
+        pass
     
     async def set_mode(self, target: str, modes: str):
         """Set modes on target (user or channel)"""
@@ -152,39 +1263,264 @@ class IRCBot:
         
         if not username or not password:
             logging.error("SASL enabled but username/password not provided")
+            # Abort so the server answers 906 and CAP negotiation can finish
+            await self.send("AUTHENTICATE *", urgent=True)
             return
         
         # SASL PLAIN: \0username\0password
         auth_string = f"\0{username}\0{password}"
         auth_b64 = base64.b64encode(auth_string.encode()).decode()
         
-        await self.send(f"AUTHENTICATE {auth_b64}")
+        await self.send(f"AUTHENTICATE {auth_b64}", urgent=True)
         self.sasl_in_progress = True
     
     async def listen(self):
-        """Main message loop"""
-        buffer = ""
+        """Main message loop: a reader frames lines into a bounded buffer and
+        dispatchers feed them to dispatch_message, so slow handlers never
+        stop the socket from being read.
+
+        With inbound_queue.lanes > 0 (the default) each channel, each private
+        message sender and the server itself get their own ordered lane, so a
+        flood in one channel no longer delays replies in another. Order is only
+        kept within a lane, so the reader applies membership changes itself
+        (track_roster) before queueing a line."""
+        queue_config = self.config.get('inbound_queue', {})
+        self._inbound_max = max(1, queue_config.get('max_size', 10000))
+        self._lane_limit = max(0, queue_config.get('lanes', 32))
+        self._lane_idle = queue_config.get('lane_idle_seconds', 30)
+        dispatchers = []
+        if self._lane_limit:
+            self._inbound = None
+            self._lanes_closing = False
+        else:
+            self._inbound = asyncio.Queue(maxsize=self._inbound_max)
+            dispatchers = [
+                asyncio.create_task(self._dispatch_loop(), name=f"inbound_dispatcher_{i}")
+                for i in range(max(1, queue_config.get('dispatchers', 1)))
+            ]
+        try:
+            await self._read_loop()
+            if self.connected and self.flood.recently_saturated():
+                # Dropped by the server while we were sending flat out
+                self.flood.on_throttle("disconnected while rate limited")
+        finally:
+            self._lanes_closing = True
+            dispatchers.extend(self._lane_tasks.values())
+            for task in dispatchers:
+                task.cancel()
+            await asyncio.gather(*dispatchers, return_exceptions=True)
+            self._lanes.clear()
+            self._lanes_waiting.clear()
+            self._lane_backlog = 0
+
+    async def _read_loop(self):
+        """Read from the socket and enqueue complete lines."""
+        framer = LineFramer()
         while self.connected:
             try:
                 data = await self.reader.read(4096)
                 if not data:
                     break
-                    
-                buffer += data.decode('utf-8', errors='ignore')
-                lines = buffer.split('\r\n')
-                buffer = lines[-1]  # Keep incomplete line
-                
-                for line in lines[:-1]:
-                    if line:
-                        await self.handle_message(line)
-                        
+
+                for line in framer.feed(data):
+                    msg = parse_irc_message(line)
+                    if msg is None:
+                        logging.debug(f"Ignoring malformed line: {self._redact_sensitive(line)}")
+                    elif msg.command in self.FAST_LANE_COMMANDS:
+                        # Protocol control is handled by the reader itself
+                        await self.dispatch_message(msg)
+                    else:
+                        if msg.command in self.ROSTER_COMMANDS:
+                            try:
+                                self.track_roster(msg)
+                            except Exception as e:
+                                logging.error(f"Error tracking membership: {e}")
+                        await self._enqueue_inbound(msg)
+
             except Exception as e:
                 logging.error(f"Error in listen loop: {e}")
                 break
-    
+
+    async def _enqueue_inbound(self, msg: IRCMessage):
+        """Queue a message for dispatch, applying the configured overflow policy."""
+        if self._inbound is None:
+            return await self._enqueue_lane(msg)
+        queue = self._inbound
+        item = (time.monotonic(), msg)
+        if queue.full():
+            policy = self.config.get('inbound_queue', {}).get('overflow', 'block')
+            if policy == 'drop_newest':
+                self.inbound_stats['dropped'] += 1
+                return
+            if policy == 'drop_oldest':
+                queue.get_nowait()
+                queue.task_done()
+                self.inbound_stats['dropped'] += 1
+            else:
+                self.inbound_stats['blocked'] += 1
+                await queue.put(item)
+                self.inbound_stats['enqueued'] += 1
+                return
+        queue.put_nowait(item)
+        self.inbound_stats['enqueued'] += 1
+        depth = queue.qsize()
+        if depth > self.inbound_stats['max_depth']:
+            self.inbound_stats['max_depth'] = depth
+
+    async def _dispatch_loop(self):
+        """Consume queued messages and hand them to dispatch_message."""
+        queue = self._inbound
+        while True:
+            enqueued_at, msg = await queue.get()
+            self.inbound_latency.observe(time.monotonic() - enqueued_at)
+            try:
+                await self.dispatch_message(msg)
+            except Exception as e:
+                logging.error(f"Error dispatching line: {e}")
+            finally:
+                self.inbound_stats['dispatched'] += 1
+                queue.task_done()
+
+    # Channel-scoped commands and the parameter that names the channel
+    LANE_CHANNEL_PARAM = {
+        "JOIN": 0, "PART": 0, "KICK": 0, "TOPIC": 0, "MODE": 0,
+        "332": 1, "333": 1, "366": 1, "353": 2,
+    }
+
+    def _lane_key(self, msg: IRCMessage) -> str:
+        """Dispatch lane for a message: the folded channel, "pm:" plus the
+        folded sender for private messages, or "" (the server lane) for
+        anything not tied to one channel (QUIT, NICK, most numerics)."""
+        command, params = msg.command, msg.params
+        if command in ("PRIVMSG", "NOTICE"):
+            target = params[0] if params else ""
+            if target[:1] in self.statusmsg and self.is_channel(target[1:]):
+                target = target[1:]
+            if self.is_channel(target):
+                return self.casefold(target)
+            return "pm:" + self.casefold(msg.nick) if msg.nick else ""
+        index = self.LANE_CHANNEL_PARAM.get(command)
+        if index is not None and len(params) > index and self.is_channel(params[index]):
+            return self.casefold(params[index])
+        return ""
+
+    async def _enqueue_lane(self, msg: IRCMessage):
+        """Append a message to its lane. The inbound bound covers every lane
+        together; drop_oldest sheds from the longest lane, the flooding one."""
+        stats = self.inbound_stats
+        if self._lane_backlog >= self._inbound_max:
+            policy = self.config.get('inbound_queue', {}).get('overflow', 'block')
+            if policy == 'drop_newest':
+                stats['dropped'] += 1
+                return
+            if policy == 'drop_oldest':
+                max(self._lanes.values(), key=asyncio.Queue.qsize).get_nowait()
+                self._lane_backlog -= 1
+                stats['dropped'] += 1
+            else:
+                stats['blocked'] += 1
+                while self._lane_backlog >= self._inbound_max:
+                    self._lane_space.clear()
+                    await self._lane_space.wait()
+
+        key = self._lane_key(msg)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = asyncio.Queue()
+            if len(self._lane_tasks) < self._lane_limit:
+                self._start_lane(key)
+            else:
+                self._lanes_waiting.append(key)
+                self.lane_stats['waited'] += 1
+                # An idle lane gives up its slot rather than lingering
+                for idle_key in self._lanes_idle:
+                    self._lane_tasks[idle_key].cancel()
+                self._lanes_idle.clear()
+        lane.put_nowait((time.monotonic(), msg))
+        self._lane_backlog += 1
+        stats['enqueued'] += 1
+        if self._lane_backlog > stats['max_depth']:
+            stats['max_depth'] = self._lane_backlog
+
+    def _start_lane(self, key: str):
+        self._lane_tasks[key] = asyncio.create_task(self._lane_loop(key), name=f"inbound_lane_{key or 'server'}")
+        self.lane_stats['started'] += 1
+        if len(self._lane_tasks) > self.lane_stats['max_active']:
+            self.lane_stats['max_active'] = len(self._lane_tasks)
+
+    async def _lane_loop(self, key: str):
+        """Dispatch one lane in order. The worker exits (and the lane is
+        reaped) once it has been idle for lane_idle_seconds, or straight
+        away when other lanes are waiting for a slot."""
+        lane = self._lanes[key]
+        try:
+            while True:
+                if lane.empty():
+                    if self._lanes_waiting:
+                        break
+                    self._lanes_idle.add(key)
+                    try:
+                        item = await asyncio.wait_for(lane.get(), self._lane_idle)
+                    except asyncio.TimeoutError:
+                        item = None
+                    except asyncio.CancelledError:
+                        if self._lanes_closing:
+                            raise
+                        asyncio.current_task().uncancel()  # asked to make room
+                        item = None
+                    finally:
+                        self._lanes_idle.discard(key)
+                    if item is None:
+                        if lane.empty():
+                            break
+                        continue
+                else:
+                    item = lane.get_nowait()
+                self._lane_backlog -= 1
+                self._lane_space.set()
+                enqueued_at, msg = item
+                self.inbound_latency.observe(time.monotonic() - enqueued_at)
+                try:
+                    await self.dispatch_message(msg)
+                except Exception as e:
+                    logging.error(f"Error dispatching line: {e}")
+                finally:
+                    self.inbound_stats['dispatched'] += 1
+        finally:
+            del self._lane_tasks[key]
+            if lane.empty():
+                del self._lanes[key]
+                self.lane_stats['reaped'] += 1
+            elif not self._lanes_closing:
+                self._lanes_waiting.append(key)  # cancelled mid-backlog
+            while self._lanes_waiting and not self._lanes_closing:
+                waiting = self._lanes_waiting.popleft()
+                if waiting in self._lanes and waiting not in self._lane_tasks:
+                    self._start_lane(waiting)
+                    break
+
+    def inbound_queue_stats(self) -> Dict[str, Any]:
+        """Queue depth counters plus enqueue-to-dispatch latency percentiles."""
+        stats = dict(self.inbound_stats)
+        if self._inbound is not None:
+            stats['depth'] = self._inbound.qsize()
+        else:
+            stats['depth'] = self._lane_backlog
+            stats['lanes'] = dict(self.lane_stats, active=len(self._lane_tasks), waiting=len(self._lanes_waiting))
+        stats['latency'] = self.inbound_latency.snapshot()
+        return stats
+
     async def handle_message(self, line: str):
-        """Override this to handle IRC messages"""
-        log_line = self._redact_sensitive(line)
+        """Parse and dispatch one raw IRC line"""
+        msg = parse_irc_message(line)
+        if msg is None:
+            logging.debug(f"Ignoring malformed line: {self._redact_sensitive(line)}")
+            return
+        await self.dispatch_message(msg)
+
+    async def dispatch_message(self, msg: IRCMessage):
+        """Log a parsed message, answer PINGs and pass the rest to on_message"""
+        log_line = self._redact_sensitive(msg.raw)
         logging.debug(f"RECV: {log_line}")
 
         # Also log to file if configured
@@ -194,29 +1530,205 @@ class IRCBot:
                 await f.write(f"[{timestamp}] RECV: {log_line}\n")
 
         # Handle PING — support both "PING :token" and "PING token"
-        if line.startswith('PING'):
-            token = line.split(':', 1)[1] if ':' in line else line.split(' ', 1)[1]
-            await self.send(f"PONG :{token}")
+        if msg.command == "PING":
+            await self.send(f"PONG :{msg.trailing}", urgent=True)
             return
-            
-        # Parse IRC message
-        if line.startswith(':'):
-            parts = line[1:].split(' ', 3)
-            if len(parts) >= 3:
-                source = parts[0]
-                command = parts[1]
-                params = parts[2:]
-                
-                await self.on_message(source, command, params)
+        if msg.command == "PONG":
+            self._handle_pong(msg)
+            return
+
+        if msg.command in self._PROTOCOL_HANDLERS:
+            await getattr(self, self._PROTOCOL_HANDLERS[msg.command])(msg)
+            return
+
+        if msg.command == "001":  # RPL_WELCOME
+            self.registered = True
+        elif msg.command == "005":  # RPL_ISUPPORT
+            self._update_isupport(msg.params[1:-1])
+        elif msg.command == "263":  # RPL_TRYAGAIN
+            self.flood.on_throttle(f"RPL_TRYAGAIN for {msg.params[1] if len(msg.params) > 1 else '?'}")
+        elif msg.command == "ERROR" and "flood" in msg.trailing.lower():
+            self.flood.on_throttle(f"ERROR: {msg.trailing}")
+        elif msg.command == "JOIN" and self.is_me(msg.nick):
+            # Our own JOIN echo carries the exact prefix the server relays
+            self.own_prefix = msg.source
+            if msg.params:
+                self._join_confirmed(msg.params[0])
+        elif msg.command in self._JOIN_ERRORS:
+            self._join_rejected(msg)
+        elif msg.command in ("376", "422"):  # end of MOTD / no MOTD
+            self._welcome_done.set()
+        elif msg.command == "PART" and msg.params and self.is_me(msg.nick):
+            self._forget_channel(msg.params[0])
+        elif msg.command == "KICK" and len(msg.params) >= 2 and self.is_me(msg.params[1]):
+            self._forget_channel(msg.params[0])
+        if msg.command in self.ROSTER_COMMANDS:
+            self.track_roster(msg)  # a no-op for lines the reader already applied
+        elif msg.command in ("ACCOUNT", "AWAY", "CHGHOST"):
+            self._track_capability_events(msg)
+
+        await self.on_message(msg)
+
+    # Lines that change who is where (and the BATCHes that group them). Lanes
+    # would reorder them across channels (a QUIT overtaking the JOIN before
+    # it), so their state changes are applied in arrival order by the reader.
+    ROSTER_COMMANDS = frozenset({"JOIN", "PART", "KICK", "QUIT", "NICK", "353", "BATCH"})
+
+    def track_roster(self, msg: IRCMessage):
+        """Apply a roster line's state changes, once per line."""
+        if msg.tracked:
+            return
+        msg.tracked = True
+        if msg.command in ("JOIN", "QUIT", "BATCH"):
+            self._track_capability_events(msg)
+        self.on_roster(msg)
+
+    def on_roster(self, msg: IRCMessage):
+        """Override this to keep membership state; runs synchronously, in
+        arrival order, before the line reaches on_message. Set msg.quiet to
+        have on_message skip the per-user callbacks."""
+        pass
+
+    # Commands handled entirely by the protocol layer, not passed to on_message
+    _PROTOCOL_HANDLERS = {
+        "CAP": "_handle_cap",
+        "AUTHENTICATE": "_handle_authenticate",
+        "903": "_handle_sasl_result",  # RPL_SASLSUCCESS
+        "904": "_handle_sasl_result",  # ERR_SASLFAIL
+        "905": "_handle_sasl_result",  # ERR_SASLTOOLONG
+        "906": "_handle_sasl_result",  # ERR_SASLABORTED
+        "908": "_handle_sasl_result",  # RPL_SASLMECHS
+    }
+
+    # Replies to a JOIN that did not go through
+    _JOIN_ERRORS = frozenset({
+        "263", "403", "405", "437", "439", "471", "473", "474", "475", "476", "477",
+    })
+
+    def has_cap(self, name: str) -> bool:
+        """True if the server ACKed capability `name` on this connection"""
+        return name in self.caps.enabled
+
+    async def _handle_cap(self, msg: IRCMessage):
+        if len(msg.params) < 2:
+            return
+        subcommand, args = msg.params[1].upper(), msg.params[2:]
+        handler = {
+            "LS": self.caps.on_ls,
+            "ACK": self.caps.on_ack,
+            "NAK": self.caps.on_nak,
+            "NEW": self.caps.on_new,
+            "DEL": self.caps.on_del,
+        }.get(subcommand)
+        if handler is None:
+            return
+        for line in handler(args):
+            await self.send(line, urgent=True)
+        if subcommand in ("ACK", "DEL"):
+            logging.info(f"Capabilities enabled: {', '.join(sorted(self.caps.enabled)) or 'none'}")
+
+    async def _handle_authenticate(self, msg: IRCMessage):
+        if msg.params and msg.params[0] == "+":
+            await self.handle_sasl_auth()
+
+    async def _handle_sasl_result(self, msg: IRCMessage):
+        if msg.command == "908":  # mechanism list; 904 follows
+            return
+        if msg.command == "903":
+            logging.info("SASL authentication successful")
         else:
-            # Handle messages without source (like CAP, AUTHENTICATE)
-            parts = line.split(' ', 2)
-            if len(parts) >= 2:
-                command = parts[0]
-                params = parts[1:]
-                await self.on_message("", command, params)
-    
-    async def on_message(self, source: str, command: str, params: List[str]):
+            logging.error(f"SASL authentication failed ({msg.command})")
+        self.sasl_in_progress = False
+        for line in self.caps.sasl_done():
+            await self.send(line, urgent=True)
+
+    def _track_capability_events(self, msg: IRCMessage):
+        """Keep account/away/batch state fed by the negotiated capabilities"""
+        command = msg.command
+        nick = self.casefold(msg.nick)
+        if command == "JOIN" and len(msg.params) >= 3:  # extended-join
+            account = msg.params[1]
+            self.accounts[nick] = None if account == "*" else account
+        elif command == "ACCOUNT" and msg.params:  # account-notify
+            account = msg.params[0]
+            self.accounts[nick] = None if account == "*" else account
+        elif command == "AWAY":  # away-notify
+            if msg.params:
+                self.away.add(nick)
+            else:
+                self.away.discard(nick)
+        elif command == "CHGHOST" and len(msg.params) >= 2:
+            if self.is_me(msg.nick):
+                self.own_prefix = f"{msg.nick}!{msg.params[0]}@{msg.params[1]}"
+        elif command == "QUIT":
+            self.accounts.pop(nick, None)
+            self.away.discard(nick)
+        elif command == "BATCH" and msg.params:
+            ref = msg.params[0]
+            if ref.startswith('+'):
+                self.batches[ref[1:]] = msg.params[1:]
+            elif ref.startswith('-'):
+                self.batches.pop(ref[1:], None)
+
+    def batch_type(self, msg: IRCMessage) -> Optional[str]:
+        """Type of the open BATCH a message belongs to (netsplit, netjoin, ...)."""
+        ref = msg.tags.get('batch') if msg._raw_tags else None
+        batch = self.batches.get(ref) if ref else None
+        return batch[0].lower() if batch else None
+
+    def _forget_channel(self, channel: str):
+        """Stop tracking a channel we parted or were kicked from."""
+        folded = self.casefold(channel)
+        for joined in [c for c in self.channels if self.casefold(c) == folded]:
+            self.channels.discard(joined)
+            self.channel_keys.pop(joined, None)
+
+    def _update_isupport(self, tokens: List[str]):
+        """Record ISUPPORT tokens (KEY=value, KEY, or -KEY to unset)."""
+        for token in tokens:
+            if token.startswith('-'):
+                self.isupport.pop(token[1:], None)
+            else:
+                key, _, value = token.partition('=')
+                self.isupport[key] = value
+        self._apply_isupport()
+
+    def _apply_isupport(self):
+        """Derive casemapping, prefixes and channel types from ISUPPORT."""
+        self.casemapping = self.isupport.get('CASEMAPPING') or "rfc1459"
+        self._casemap = _CASEMAPS.get(self.casemapping)
+        self._folded_nick = None
+
+        # PREFIX=(qaohv)~&@%+ maps channel modes to the symbols in NAMES
+        modes, _, symbols = self.isupport.get('PREFIX', '(ov)@+').lstrip('(').partition(')')
+        self.prefix_modes: Dict[str, str] = dict(zip(modes, symbols))
+        self.prefix_symbols = symbols
+        self.chantypes = self.isupport.get('CHANTYPES', '#&')
+        self.statusmsg = self.isupport.get('STATUSMSG', '')
+        nicklen = self.isupport.get('NICKLEN')
+        self.nicklen: Optional[int] = int(nicklen) if nicklen and nicklen.isdigit() else None
+
+    def casefold(self, text: str) -> str:
+        """Fold a nick or channel name under the server's CASEMAPPING."""
+        if self._casemap is None:
+            return casefold(text, self.casemapping)
+        return text.translate(self._casemap)
+
+    def is_me(self, nick: str) -> bool:
+        """True if nick is our current nick under the server's casemapping."""
+        if self._folded_nick is None or self._folded_nick[0] != self.config['nick']:
+            self._folded_nick = (self.config['nick'], self.casefold(self.config['nick']))
+        return self.casefold(nick) == self._folded_nick[1]
+
+    def is_channel(self, target: str) -> bool:
+        """True if target names a channel (per CHANTYPES)."""
+        return target[:1] in self.chantypes if target else False
+
+    def strip_prefixes(self, name: str) -> str:
+        """Drop PREFIX status symbols (@, +, ... several with multi-prefix)."""
+        return name.lstrip(self.prefix_symbols)
+
+    async def on_message(self, msg: IRCMessage):
         """Override this to handle parsed IRC messages"""
         pass
 
@@ -243,6 +1755,82 @@ class ChannelState:
     topic: str = ""
     mood: float = 0.5  # 0.0 = depressed, 1.0 = euphoric
 
+class NetsplitTracker:
+    """Coalesces netsplit QUIT storms and the netjoin that follows.
+
+    QUITs with a split reason (two server names, e.g. "*.net *.split") or
+    inside a "netsplit" BATCH are not applied one by one: the nicks collect
+    in ``pending`` until the burst settles and are then removed in one pass
+    from every channel they have not already rejoined. Their user state is
+    parked, so when they come back within ``rejoin_window`` seconds the JOIN
+    restores it and skips the per-user join callbacks (no greeting storm).
+    """
+
+    SPLIT_REASON = re.compile(r"[^\s/.]+(?:\.[^\s/.]+)+ [^\s/.]+(?:\.[^\s/.]+)+")
+
+    def __init__(self, rejoin_window: float = 900.0, settle: float = 1.0):
+        self.rejoin_window = rejoin_window
+        self.settle = settle
+        self.pending: Dict[str, Set[str]] = {}  # folded nick in the current burst -> channels rejoined
+        self.reason = ""
+        self.parked: Dict[str, tuple] = {}  # folded nick -> (split at, {folded channel: UserState})
+        self.stats = {'bursts': 0, 'split_quits': 0, 'netjoins': 0, 'restored': 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'NetsplitTracker':
+        keys = ('rejoin_window', 'settle')
+        return cls(**{k: config[k] for k in keys if k in config})
+
+    @classmethod
+    def is_split_reason(cls, reason: str) -> bool:
+        return cls.SPLIT_REASON.fullmatch(reason) is not None
+
+    def quit(self, folded: str, reason: str) -> bool:
+        """Record a split QUIT; True if it opens a new burst."""
+        first = not self.pending
+        if first:
+            self.stats['bursts'] += 1
+            self.reason = reason
+        self.pending[folded] = set()
+        self.stats['split_quits'] += 1
+        return first
+
+    def take_pending(self, now: float) -> Dict[str, Set[str]]:
+        """The burst's nicks, each with the channels it already rejoined, ready
+        to be removed; forgets stale parked state."""
+        pending, self.pending = self.pending, {}
+        cutoff = now - self.rejoin_window
+        for folded in [n for n, (at, _) in self.parked.items() if at < cutoff]:
+            del self.parked[folded]
+        return pending
+
+    def park(self, folded: str, channel_key: str, state: UserState, now: float):
+        self.parked.setdefault(folded, (now, {}))[1][channel_key] = state
+
+    def returning(self, folded: str, now: float) -> bool:
+        """True if a JOIN from this nick is part of a netjoin."""
+        if folded in self.pending:
+            return True
+        entry = self.parked.get(folded)
+        return entry is not None and now - entry[0] <= self.rejoin_window
+
+    def rejoin(self, folded: str, channel_key: str) -> Optional[UserState]:
+        """Count a netjoin; returns the user's parked state for the channel."""
+        self.stats['netjoins'] += 1
+        if folded in self.pending:
+            self.pending[folded].add(channel_key)  # back here before the burst was applied
+            return None
+        entry = self.parked.get(folded)
+        if entry is None:
+            return None
+        state = entry[1].pop(channel_key, None)
+        if not entry[1]:
+            del self.parked[folded]
+        if state is not None:
+            self.stats['restored'] += 1
+        return state
+
+
 class Plugin:
     """Base class for bot plugins"""
     def __init__(self, name: str, priority: int = 50):
@@ -253,6 +1841,10 @@ class Plugin:
     async def handle_message(self, bot: 'PyMotion', nick: str, channel: str, message: str) -> bool:
         """Return True if plugin handled the message and no further processing needed"""
         return False
+
+    async def handle_context(self, ctx: 'MessageContext') -> bool:
+        """MessageContext entry point; override it instead of handle_message to opt in"""
+        return await self.handle_message(ctx.bot, ctx.nick, ctx.channel, ctx.message)
     
     async def handle_action(self, bot: 'PyMotion', nick: str, channel: str, action: str) -> bool:
         """Handle /me actions"""
@@ -266,23 +1858,362 @@ class Plugin:
         """Handle user parts"""
         pass
 
+
+class TriggerIndex:
+    """Prefilter that decides which plugins could care about a message.
+
+    A plugin may declare ``keywords`` (literal, case-insensitive substrings;
+    "{nick}" stands for the bot's nick and every alias) and/or
+    ``keyword_patterns`` (regex strings, searched case-insensitively). Its
+    handle_message is only called when one of them appears. A plugin that
+    declares neither always runs; an empty list means it never does.
+
+    Every literal across all plugins goes into one alternation scanned once
+    per message, and the patterns are OR-ed into one regex that is only
+    unpicked per plugin when it hits.
+    """
+
+    def __init__(self, plugins: List[Any], names: List[str]):
+        self.plugins = plugins
+        self.names = tuple(names)
+        self.always: set = set()
+        owners: Dict[str, set] = {}
+        self._patterns: List[tuple] = []
+        for plugin in plugins:
+            keywords = getattr(plugin, 'keywords', None)
+            patterns = getattr(plugin, 'keyword_patterns', None)
+            if keywords is None and patterns is None:
+                self.always.add(plugin)
+                continue
+            for keyword in keywords or []:
+                for word in (self.names if keyword == "{nick}" else [keyword]):
+                    if word:
+                        owners.setdefault(word.lower(), set()).add(plugin)
+            for pattern in patterns or []:
+                try:
+                    self._patterns.append((re.compile(pattern, re.IGNORECASE), plugin))
+                except re.error as e:
+                    logging.error(f"Bad keyword pattern in plugin {plugin.name}: {e}; it will always run")
+                    self.always.add(plugin)
+
+        # Longest first inside a lookahead: each position reports its longest
+        # keyword, and a keyword inherits the owners of its own prefixes, so
+        # overlapping keywords ("play", "playing") are never shadowed
+        ordered = sorted(owners, key=len, reverse=True)
+        self._owners = {
+            word: frozenset().union(*(owners[other] for other in ordered if word.startswith(other)))
+            for word in ordered
+        }
+        self._literals = (
+            re.compile("(?=(" + "|".join(re.escape(word) for word in ordered) + "))")
+            if ordered else None
+        )
+        # Leading global flags like "(?i)" are only legal at the very start,
+        # so they become scoped groups inside the combined pattern
+        self._any_pattern = None
+        if self._patterns:
+            scoped = []
+            for pattern, _ in self._patterns:
+                flags = re.match(r'\(\?([aiLmsux]+)\)', pattern.pattern)
+                if flags:
+                    scoped.append(f"(?{flags.group(1)}:{pattern.pattern[flags.end():]})")
+                else:
+                    scoped.append(f"(?:{pattern.pattern})")
+            try:
+                self._any_pattern = re.compile("|".join(scoped), re.IGNORECASE)
+            except re.error:
+                pass  # e.g. group references; fall back to testing each pattern
+
+    def matches(self, message: str, folded: Optional[str] = None) -> set:
+        """Plugins with a keyword or pattern in message (always-run ones excluded)."""
+        hits: set = set()
+        if self._literals:
+            for match in self._literals.finditer(message.lower() if folded is None else folded):
+                hits |= self._owners[match.group(1)]
+        if self._patterns and (self._any_pattern is None or self._any_pattern.search(message)):
+            for pattern, plugin in self._patterns:
+                if plugin not in hits and pattern.search(message):
+                    hits.add(plugin)
+        return hits
+
+
+class Addressing(NamedTuple):
+    """How a message refers to the bot; see PyMotion.addressing."""
+    addressed: bool              # opens with a bot name: "pybot: hi", "@pybot, hi", "pybot hi"
+    mentioned: bool              # a bot name appears anywhere as a word (also true when addressed)
+    stripped_text: str           # the text after the first bot name and its ",:" separator
+    which_alias: Optional[str]   # that name, lowercased; None if not mentioned
+
+
+class AddressMatcher:
+    """One compiled regex for the bot's nick and aliases.
+
+    Built once per config load or nick change instead of every plugin
+    formatting rf'\b{re.escape(name)}\b' patterns per message.
+    """
+
+    def __init__(self, nick: str, aliases: List[str]):
+        self.source = (nick, tuple(aliases))
+        self.names = tuple(dict.fromkeys(name.lower() for name in (nick, *aliases) if name))
+        alternation = "|".join(re.escape(name) for name in sorted(self.names, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?<!\w)@?({alternation})(?!\w)([,:]?)(\s*)", re.IGNORECASE)
+
+    def match(self, message: str) -> Addressing:
+        found = self._pattern.search(message) if self.names else None
+        if not found:
+            return Addressing(False, False, message, None)
+        addressed = (not message[:found.start()].strip()
+                     and bool(found.group(2) or found.group(3) or found.end() == len(message)))
+        return Addressing(addressed, True, message[found.end():], found.group(1).lower())
+
+
+# mIRC-style formatting: bold, colour (with optional fg,bg), hex colour,
+# reset, monospace, reverse, italic, strikethrough, underline
+_FORMATTING = re.compile(
+    r'\x03(?:\d{1,2}(?:,\d{1,2})?)?|\x04(?:[0-9a-fA-F]{6}(?:,[0-9a-fA-F]{6})?)?|[\x02\x0f\x11\x16\x1d\x1e\x1f]'
+)
+
+
+# Runs of characters that can appear in a nick ("bob's" -> "bob", "s")
+_NICK_TOKEN = re.compile(r"[\w\-\[\]\\^{}|`]+")
+
+
+class MessageContext:
+    """One channel or private message as plugins see it.
+
+    Derived views are computed on first use and cached, so the core and
+    every plugin share one lowercasing, one tokenization and one addressing
+    check per message. Plugins opt in by defining ``handle_context(ctx)``;
+    plugins with only ``handle_message(bot, nick, channel, message)`` are
+    called exactly as before.
+
+    Plugins whose replies take a while (typing pauses, API calls) can split
+    into two phases instead: a cheap synchronous ``match(ctx)`` returning a
+    claim (anything truthy, or None to pass) and ``async respond(claim)``,
+    which the core runs as a tracked background task. Priority order and
+    "first claim wins" are unchanged; the next line is dispatched without
+    waiting for the reply to finish.
+    """
+
+    def __init__(self, bot: 'PyMotion', nick: str, channel: str, message: str):
+        self.bot = bot
+        self.nick = nick
+        self.channel = channel
+        self.message = message
+
+    @cached_property
+    def plain(self) -> str:
+        """The message with IRC formatting codes removed."""
+        return _FORMATTING.sub('', self.message)
+
+    @cached_property
+    def folded(self) -> str:
+        """Lowercased plain text, for keyword checks."""
+        return self.plain.lower()
+
+    @cached_property
+    def words(self) -> tuple:
+        """Folded whitespace tokens with punctuation dropped (empty ones skipped)."""
+        cleaned = (''.join(c for c in word if c.isalnum()) for word in self.folded.split())
+        return tuple(word for word in cleaned if word)
+
+    @cached_property
+    def nick_tokens(self) -> frozenset:
+        """Distinct nick-shaped tokens, casefolded under the server's CASEMAPPING."""
+        casefold = self.bot.casefold
+        return frozenset(casefold(token) for token in _NICK_TOKEN.findall(self.plain))
+
+    @cached_property
+    def addressing(self) -> Addressing:
+        return self.bot.addressing(self.plain)
+
+    @property
+    def addressed(self) -> bool:
+        return self.addressing.addressed
+
+    @property
+    def mentioned(self) -> bool:
+        return self.addressing.mentioned
+
+    @cached_property
+    def mentioned_nicks(self) -> frozenset:
+        """Casefolded nicks of other channel members named in the message.
+
+        One hash lookup per token against the channel's users dict, which is
+        keyed by folded nick and kept current on JOIN/PART/QUIT/KICK/NICK/353.
+        """
+        bot = self.bot
+        users = bot.get_channel_state(self.channel).users
+        skip = {bot.casefold(name) for name in (self.nick, *bot.bot_names())}
+        return frozenset(key for key in self.nick_tokens if key in users and key not in skip)
+
+    @cached_property
+    def is_question(self) -> bool:
+        return self.plain.rstrip().endswith('?')
+
+    @cached_property
+    def is_caps(self) -> bool:
+        """Shouting: more than five characters and no lowercase letters."""
+        return len(self.plain) > 5 and self.plain.isupper()
+
+
+class PluginBreaker:
+    """Circuit breaker for one plugin.
+
+    ``threshold`` failures (exceptions or budget overruns) within ``window``
+    seconds trip it open and the plugin is skipped for ``base_delay``
+    seconds, doubling on every trip in a row up to ``max_delay``. When the
+    delay is up one call is let through (half-open): success closes the
+    breaker and resets the backoff, failure trips it again straight away.
+    """
+
+    def __init__(self, threshold: int = 3, window: float = 300.0, base_delay: float = 60.0,
+                 max_delay: float = 3600.0):
+        self.threshold = max(1, threshold)
+        self.window = window
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = "closed"  # closed | open | half_open
+        self.failures: deque = deque()  # timestamps within the window
+        self.streak = 0        # trips without a success in between
+        self.trips = 0
+        self.open_until = 0.0
+        self.last_error = ""
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'PluginBreaker':
+        keys = ('threshold', 'window', 'base_delay', 'max_delay')
+        return cls(**{k: config[k] for k in keys if k in config})
+
+    def allow(self, now: float) -> bool:
+        if self.state == "open":
+            if now < self.open_until:
+                return False
+            self.state = "half_open"
+        return True
+
+    def record_success(self):
+        if self.state != "closed":
+            self.state = "closed"
+            self.streak = 0
+
+    def record_failure(self, reason: str, now: float) -> Optional[float]:
+        """Count a failure; returns the cool-down if this tripped the breaker."""
+        failures = self.failures
+        failures.append(now)
+        while failures[0] < now - self.window:
+            failures.popleft()
+        self.last_error = reason
+        if self.state != "half_open" and len(failures) < self.threshold:
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** self.streak)
+        self.state = "open"
+        self.open_until = now + delay
+        self.streak += 1
+        self.trips += 1
+        failures.clear()
+        return delay
+
+    def describe(self, now: float) -> str:
+        if self.state == "open":
+            return f"open {max(0, self.open_until - now):.0f}s, {self.trips} trips, last: {self.last_error}"
+        if self.state == "half_open":
+            return f"half-open, {self.trips} trips, last: {self.last_error}"
+        recent = sum(1 for at in self.failures if at >= now - self.window)
+        return f"closed, {recent} recent failures, last: {self.last_error}" if recent else "closed"
+
+
+class HookStats:
+    """Counters and wall-clock latency for one plugin hook."""
+
+    __slots__ = ("calls", "claims", "exceptions", "timeouts", "skipped", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.claims = 0      # calls that returned something truthy (handled/claimed)
+        self.exceptions = 0
+        self.timeouts = 0
+        self.skipped = 0     # not called: breaker open
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        latency = self.latency.snapshot()
+        return {
+            'calls': self.calls, 'claims': self.claims, 'exceptions': self.exceptions,
+            'timeouts': self.timeouts, 'skipped': self.skipped,
+            'total': self.latency.total, **{k: latency[k] for k in ('p50', 'p95', 'p99', 'max')},
+        }
+
+
+class PluginProfiler:
+    """Per plugin, per hook HookStats. Latency is wall-clock, so it includes
+    awaited I/O and comic-timing sleeps as well as CPU."""
+
+    def __init__(self):
+        self.since = time.time()
+        self.hooks: Dict[tuple, HookStats] = {}
+
+    def hook(self, plugin: str, hook: str) -> HookStats:
+        stats = self.hooks.get((plugin, hook))
+        if stats is None:
+            stats = self.hooks[(plugin, hook)] = HookStats()
+        return stats
+
+    def snapshot(self) -> Dict[str, Any]:
+        plugins: Dict[str, Dict[str, Any]] = {}
+        for (plugin, hook), stats in sorted(self.hooks.items()):
+            plugins.setdefault(plugin, {})[hook] = stats.snapshot()
+        return {'since': self.since, 'plugins': plugins}
+
+    def top(self, count: int = 5) -> List[tuple]:
+        """(plugin, hook, HookStats) with the most total time first."""
+        ranked = sorted(self.hooks.items(), key=lambda item: item[1].latency.total, reverse=True)
+        return [(plugin, hook, stats) for (plugin, hook), stats in ranked[:count]]
+
+    def reset(self):
+        self.since = time.time()
+        self.hooks.clear()
+
+
 class PyMotion(IRCBot):
     """Main bot class"""
     
-    def __init__(self, config_file: str = "pymotion.json"):
+    def __init__(self, config_file: str = "pymotion.json", network: Optional[str] = None,
+                 hub: Optional["NetworkHub"] = None):
         # Load configuration — resolve relative to script location
         self._base_dir = Path(__file__).resolve().parent
         self.config_file = self._base_dir / config_file
-        self.config = self.load_config()
+        # Under a NetworkHub, config is the shared config merged with this
+        # network's overrides, and plugins/opinions/state file are the hub's
+        self.hub = hub
+        self.config = hub.network_config(network) if hub else self.load_config()
+        self.network = network or self.config.get('network_name') or self.config['server']
         
         super().__init__(self.config)
         
         # Bot state
         self.channels_state: Dict[str, ChannelState] = {}
-        self.plugins: List[Plugin] = []
+        self.plugins: List[Plugin] = hub.plugins if hub else []
+        self._trigger_index: Optional[TriggerIndex] = None
+        self._address_matcher: Optional[AddressMatcher] = None
+        self._last_addressing: tuple = (None, None, None)
+        self.plugin_breakers: Dict[str, PluginBreaker] = {}
+        self.inbound_flood: Optional[InboundFloodControl] = None
+        self.configure_inbound_flood()
+        self.netsplits = NetsplitTracker.from_config(self.config.get('netsplit', {}))
+        self._netsplit_flush: Optional[asyncio.TimerHandle] = None
+        self.profiler: PluginProfiler = hub.profiler if hub else PluginProfiler()
         self.start_time = time.time()
         self.background_tasks: set[asyncio.Task] = set()
-        self.opinions: Dict[str, Dict] = {}  # {"topic": {"sentiment": float, "mentions": int, "last_mentioned": float, "formed_at": float}}
+        self._stop_requested = asyncio.Event()
+
+        # Warm reconnects: plugins, caches and state stay loaded across
+        # connections; only the socket and channel joins are redone
+        self._warm = False
+        self._registration_task: Optional[asyncio.Task] = None
+        self._connection_lost_at: Optional[float] = None
+        self.reconnect_stats: Dict[str, Any] = {"count": 0, "last_rejoin_seconds": None}
+        self.opinions: Dict[str, Dict] = hub.opinions if hub else {}  # {"topic": {"sentiment": float, "mentions": int, "last_mentioned": float, "formed_at": float}}
         
         # Set up logging first
         log_level = getattr(logging, self.config.get('log_level', 'INFO').upper())
@@ -296,8 +2227,11 @@ class PyMotion(IRCBot):
         if self.irc_log_file:
             logging.info(f"IRC traffic will be logged to: {self.irc_log_file}")
         
+        self.load_flood_limits()
+
         # Initialize plugins
-        self.load_plugins()
+        if not hub:
+            self.load_plugins()
     
     def create_background_task(self, coro, name: str | None = None) -> asyncio.Task:
         task = asyncio.create_task(coro, name=name)
@@ -341,6 +2275,9 @@ class PyMotion(IRCBot):
     
     async def reload_config_and_plugins(self):
         """Reload config and plugins with cleanup, for hot-reload."""
+        if self.hub:
+            await self.hub.reload_config_and_plugins()
+            return
         await self._cancel_background_tasks()
         for plugin in self.plugins:
             if hasattr(plugin, "cleanup"):
@@ -351,6 +2288,8 @@ class PyMotion(IRCBot):
         
         self.config = self.load_config()
         self.load_plugins()
+        self.plugin_breakers.clear()  # reload re-enables tripped plugins
+        self.configure_inbound_flood()
         await self.start_plugins()
     
     @staticmethod
@@ -382,12 +2321,75 @@ class PyMotion(IRCBot):
                 "username": "",
                 "password": ""
             },
+            "capabilities": [  # IRCv3 caps requested when the server offers them
+                "message-tags", "server-time", "multi-prefix", "extended-join",
+                "away-notify", "account-notify", "chghost", "echo-message",
+                "batch", "cap-notify"
+            ],
+            "event_loop": "asyncio",  # or "uvloop" (pip install uvloop); falls back to asyncio if missing
+            "networks": [],  # [{"name": "libera", "server": ..., "channels": [...]}, ...] runs several networks in one process
             "modes": "+B",  # User modes to set on connect
+            "max_reply_lines": 4,  # Long replies are split, then cut with "..." after this many lines
+            "join_throttle": {
+                "channels_per_second": 0,  # 0 = only the flood limiter; set for servers that throttle JOINs
+                "burst": 20,
+                "retry_after": 10          # seconds before re-sending JOINs refused with 263/437/439
+            },
+            "keepalive": {
+                "interval": 30,        # seconds between our own PINGs (0 disables)
+                "max_lag": 120,        # reconnect when a PONG is this late
+                "ambient_max_lag": 5   # hold unprompted chatter while lag is above this
+            },
+            "inbound_flood": {
+                "enabled": True,
+                # Per user (user@host) and per channel; "command" lines mention the
+                # bot or start with "!", everything else is "ambient"
+                "user": {"command": {"rate": 0.2, "burst": 4}, "ambient": {"rate": 1.0, "burst": 10}},
+                "channel": {"command": {"rate": 1.0, "burst": 8}, "ambient": {"rate": 10.0, "burst": 50}},
+                "warn": True,          # tell a user once per warn_cooldown that their commands are dropped
+                "warn_cooldown": 300,
+                "warning": "{nick}: easy there, I'm ignoring you for a bit."
+            },
+            "flood_control": {
+                "adaptive": True,      # learn the server's tolerance (saved in flood_limits.json)
+                "rate": 2.0,           # starting messages/sec
+                "burst": 5.0,
+                "min_rate": 0.5,
+                "max_rate": 8.0,
+                "ramp_step": 0.25,     # added after each quiet, busy ramp_interval
+                "ramp_interval": 60,
+                "backoff_factor": 0.5  # applied on Excess Flood / 263 / flood disconnect
+            },
             "irc_log_file": "irc_traffic.log",  # Log all IRC traffic to file
             "log_level": "DEBUG",  # Set to DEBUG to see everything
+            "inbound_queue": {
+                "max_size": 10000,    # lines buffered between socket reader and dispatchers
+                "overflow": "block",  # block | drop_oldest | drop_newest
+                "lanes": 32,          # channels/PM senders dispatched concurrently, in order per lane
+                "lane_idle_seconds": 30,  # idle lanes are reaped after this
+                "dispatchers": 1      # only with lanes 0: >1 processes lines concurrently (no ordering guarantee)
+            },
             "plugins": {
                 "enabled": ["shutup", "admin", "greetings", "random_responses", "actions", "questions", "kill", "random_chatter", "cancel", "quotes", "projectile", "stealth", "decision", "makeme", "liljon", "ai_response"],
-                "disabled": []
+                "disabled": [],
+                "prefilter": True  # skip plugins whose declared keywords are not in the message
+            },
+            "netsplit": {
+                "rejoin_window": 900,  # JOINs this soon after a split QUIT are a netjoin (no greeting)
+                "settle": 1.0          # seconds a QUIT burst is gathered before it is applied
+            },
+            "plugin_profile": {
+                "dump_file": "plugin_profile.json",  # per plugin/hook counters and latency; "" disables
+                "dump_interval": 300  # seconds between dumps, 0 = only on demand
+            },
+            "plugin_limits": {
+                # Wall-clock seconds per hook call (0 = unlimited); overruns are cancelled
+                "budgets": {"handle_message": 30, "handle_action": 10, "handle_join": 10,
+                            "handle_part": 10, "respond": 60},
+                "per_plugin": {},  # e.g. {"ai_response": {"handle_message": 45}}
+                # threshold failures/overruns within window seconds disable a plugin
+                # for base_delay, doubling per consecutive trip up to max_delay
+                "breaker": {"threshold": 3, "window": 300, "base_delay": 60, "max_delay": 3600}
             },
             "ai_response": {
                 "openrouter_api_key_env": "OPENROUTER_API_KEY",  # env var name for API key
@@ -479,7 +2481,8 @@ class PyMotion(IRCBot):
                             continue
                         
                         # Check if it has the required interface
-                        if (hasattr(obj, 'handle_message') and  # Must have handle_message method
+                        if ((hasattr(obj, 'handle_message') or hasattr(obj, 'handle_context')
+                             or hasattr(obj, 'match')) and  # Must handle messages
                             hasattr(obj, '__init__') and        # Must be instantiable
                             obj.__module__ == module.__name__):  # Must be defined in this module
                             plugin_classes.append(obj)
@@ -537,8 +2540,61 @@ class PyMotion(IRCBot):
     def _state_file(self) -> Path:
         return self._base_dir / "bot_state.json"
 
+    def _flood_limits_file(self) -> Path:
+        return self._base_dir / "flood_limits.json"
+
+    def _server_key(self) -> str:
+        return f"{self.config['server']}:{self.config.get('port', 6697)}"
+
+    def load_flood_limits(self):
+        """Restore the send rate previously learned for this server."""
+        path = self._flood_limits_file()
+        if not path.exists() or not self.flood.adaptive:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                learned = json.load(f).get(self._server_key())
+            if learned:
+                self.flood.restore(learned)
+                logging.info(f"Restored flood limit for {self._server_key()}: {self.flood.rate:.2f} msg/s")
+        except Exception as e:
+            logging.error(f"Error loading flood limits: {e}")
+
+    def save_flood_limits(self):
+        """Persist the learned send rate, keyed by server."""
+        if not self.flood.adaptive:
+            return
+        path = self._flood_limits_file()
+        data: Dict[str, Any] = {}
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logging.error(f"Error reading flood limits: {e}")
+        data[self._server_key()] = self.flood.to_dict()
+        tmp = str(path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        import os
+        os.replace(tmp, path)
+
     def save_state(self):
         """Persist user/channel state to disk."""
+        if self.hub:
+            self.hub.save_state()
+            return
+        data = self.state_snapshot()
+        data["_opinions"] = self.opinions
+        tmp = str(self._state_file()) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        import os
+        os.replace(tmp, self._state_file())
+        logging.debug("Bot state saved to disk")
+
+    def state_snapshot(self) -> Dict[str, Any]:
+        """Channel/user state as a JSON-ready dict, keyed by channel."""
         data: Dict[str, Any] = {}
         for ch_name, ch_state in self.channels_state.items():
             users = {}
@@ -557,16 +2613,12 @@ class PyMotion(IRCBot):
                 "topic": ch_state.topic,
                 "users": users,
             }
-        data["_opinions"] = self.opinions
-        tmp = str(self._state_file()) + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        import os
-        os.replace(tmp, self._state_file())
-        logging.debug("Bot state saved to disk")
+        return data
 
     def load_state(self):
         """Load persisted user/channel state from disk."""
+        if self.hub:
+            return  # loaded once for every network by the hub
         path = self._state_file()
         if not path.exists():
             return
@@ -576,46 +2628,86 @@ class PyMotion(IRCBot):
             # Load opinions
             if "_opinions" in data:
                 self.opinions = data.pop("_opinions")
-            for ch_name, ch_data in data.items():
-                if not isinstance(ch_data, dict):
-                    continue
-                ch_state = self.get_channel_state(ch_name)
-                ch_state.mood = ch_data.get("mood", 0.5)
-                ch_state.topic = ch_data.get("topic", "")
-                for nick, u_data in ch_data.get("users", {}).items():
-                    u_state = self.get_user_state(ch_name, nick)
-                    u_state.friendship = u_data.get("friendship", 0)
-                    u_state.last_seen = u_data.get("last_seen", time.time())
-                    u_state.greeted_today = u_data.get("greeted_today", False)
-                    u_state.mood_modifier = u_data.get("mood_modifier", 0.0)
-                    u_state.kill_count = u_data.get("kill_count", 0)
-                    u_state.shutup_count = u_data.get("shutup_count", 0)
-                    u_state.last_shutup_time = u_data.get("last_shutup_time", 0.0)
+            self.apply_state(data)
             logging.info(f"Loaded bot state from {path}")
         except Exception as e:
             logging.error(f"Error loading bot state: {e}")
 
+    def apply_state(self, data: Dict[str, Any]):
+        """Restore channel/user state from a state_snapshot() dict."""
+        for ch_name, ch_data in data.items():
+            if not isinstance(ch_data, dict):
+                continue
+            ch_state = self.get_channel_state(ch_name)
+            ch_state.mood = ch_data.get("mood", 0.5)
+            ch_state.topic = ch_data.get("topic", "")
+            for nick, u_data in ch_data.get("users", {}).items():
+                u_state = self.get_user_state(ch_name, nick)
+                u_state.friendship = u_data.get("friendship", 0)
+                u_state.last_seen = u_data.get("last_seen", time.time())
+                u_state.greeted_today = u_data.get("greeted_today", False)
+                u_state.mood_modifier = u_data.get("mood_modifier", 0.0)
+                u_state.kill_count = u_data.get("kill_count", 0)
+                u_state.shutup_count = u_data.get("shutup_count", 0)
+                u_state.last_shutup_time = u_data.get("last_shutup_time", 0.0)
+
     async def _periodic_state_save(self):
         """Background task that saves state every 5 minutes."""
         try:
             while True:
                 await asyncio.sleep(300)
                 self.save_state()
+                self.save_flood_limits()
         except asyncio.CancelledError:
             self.save_state()  # one final save on shutdown
 
+    def _plugin_profile_file(self) -> Optional[Path]:
+        name = self.config.get('plugin_profile', {}).get('dump_file')
+        return self._base_dir / name if name else None
+
+    def dump_plugin_profile(self):
+        """Write the plugin profiler snapshot as JSON."""
+        path = self._plugin_profile_file()
+        if path is None:
+            return
+        data = self.profiler.snapshot()
+        data['written'] = time.time()
+        tmp = str(path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        import os
+        os.replace(tmp, path)
+
+    async def _periodic_profile_dump(self):
+        """Background task that dumps the plugin profile every dump_interval seconds."""
+        interval = self.config.get('plugin_profile', {}).get('dump_interval', 300)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.dump_plugin_profile()
+            except OSError as e:
+                logging.error(f"Could not write plugin profile: {e}")
+
     def get_channel_state(self, channel: str) -> ChannelState:
-        """Get or create channel state"""
-        if channel not in self.channels_state:
-            self.channels_state[channel] = ChannelState(name=channel)
-        return self.channels_state[channel]
+        """Get or create channel state (keyed by casefolded name)"""
+        key = self.casefold(channel)
+        if key not in self.channels_state:
+            self.channels_state[key] = ChannelState(name=channel)
+        return self.channels_state[key]
     
     def get_user_state(self, channel: str, nick: str) -> UserState:
-        """Get or create user state"""
+        """Get or create user state (keyed by casefolded nick)"""
         channel_state = self.get_channel_state(channel)
-        if nick not in channel_state.users:
-            channel_state.users[nick] = UserState(nick=nick)
-        return channel_state.users[nick]
+        key = self.casefold(nick)
+        if key not in channel_state.users:
+            channel_state.users[key] = UserState(nick=nick)
+        return channel_state.users[key]
+
+    def network_key(self, name: str) -> tuple:
+        """Key for plugin state about a channel or nick. Under a NetworkHub
+        every network shares the plugin instances, so the network is part
+        of the key: #chat on one network is not #chat on another."""
+        return (self.network, self.casefold(name))
     
     # Stopwords for topic tracking
     _STOPWORDS = frozenset({
@@ -691,17 +2783,16 @@ class PyMotion(IRCBot):
             "flavor": flavor,
         }
 
-    def track_topic(self, channel: str, nick: str, message: str):
+    def track_topic(self, channel: str, nick: str, message: str, ctx: Optional[MessageContext] = None):
         """Extract notable words from a message and form opinions over time."""
-        bot_names = {self.config['nick'].lower()} | {a.lower() for a in self.config.get('aliases', [])}
-        channel_state = self.get_channel_state(channel)
-        nicks_lower = {n.lower() for n in channel_state.users}
-        nicks_lower.add(nick.lower())
+        bot_names = self.bot_names()
+        users = self.get_channel_state(channel).users  # already casefolded
+        speaker = self.casefold(nick)
 
-        words = re.findall(r'[a-zA-Z]{4,}', message.lower())
+        words = re.findall(r'[a-zA-Z]{4,}', ctx.folded if ctx else message.lower())
         now = time.time()
         for word in words:
-            if word in self._STOPWORDS or word in bot_names or word in nicks_lower:
+            if word in self._STOPWORDS or word in bot_names or word in users or word == speaker:
                 continue
             if word not in self.opinions:
                 self.opinions[word] = {
@@ -725,153 +2816,201 @@ class PyMotion(IRCBot):
             for topic, _ in sorted_topics[:to_remove]:
                 del self.opinions[topic]
 
-    async def on_message(self, source: str, command: str, params: List[str]):
+    async def _after_registration(self):
+        """Identify, set modes, join channels and start plugins after 001."""
+        # Identify with NickServ if configured
+        nickserv_config = self.config.get('nickserv', {})
+        if nickserv_config.get('enabled', False):
+            password = nickserv_config.get('password', '')
+            if password:
+                # Send IDENTIFY command to NickServ
+                await self.privmsg('NickServ', f'IDENTIFY {password}')
+                logging.info("Sent IDENTIFY command to NickServ")
+
+                # Wait a moment for NickServ to respond before continuing
+                await asyncio.sleep(2)
+
+        # Set user modes if configured
+        if self.config.get('modes'):
+            await self.set_mode(self.config['nick'], self.config['modes'])
+            logging.info(f"Set modes: {self.config['modes']}")
+
+        # CHANLIMIT/TARGMAX/LINELEN come in 005, before the end of the MOTD
+        try:
+            await asyncio.wait_for(self._welcome_done.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            logging.warning("No end of MOTD after 10s, joining with default limits")
+
+        if self._warm:
+            # Reconnect: rejoin what we were in; plugins and state are still loaded
+            await self.join_channels([(c, self.channel_keys.get(c)) for c in sorted(self.channels)])
+            if not self.join_pending:
+                self._record_rejoin()
+            return
+
+        # Join channels
+        joins = []
+        for channel_config in self.config.get('channels', []):
+            if isinstance(channel_config, str):
+                # Old format: just channel name
+                joins.append((channel_config, None))
+            elif isinstance(channel_config, dict):
+                # New format: {"name": "#channel", "key": "password"}
+                channel = channel_config.get('name')
+                if channel:
+                    joins.append((channel, channel_config.get('key')))
+        await self.join_channels(joins)
+
+        await self.start_plugins()
+        self.load_state()
+        self.create_background_task(
+            self._periodic_state_save(), name="periodic_state_save"
+        )
+        if self.config.get('plugin_profile', {}).get('dump_interval', 0) > 0:
+            self.create_background_task(
+                self._periodic_profile_dump(), name="periodic_profile_dump"
+            )
+        self._warm = True
+
+    def on_joins_settled(self):
+        self._record_rejoin()
+
+    def _record_rejoin(self):
+        """Socket loss to every channel rejoined, for the last reconnect."""
+        if self._connection_lost_at is None:
+            return
+        elapsed = time.monotonic() - self._connection_lost_at
+        self._connection_lost_at = None
+        self.reconnect_stats["last_rejoin_seconds"] = elapsed
+        logging.info(f"Reconnected and rejoined {len(self.channels)} channels in {elapsed:.3f}s")
+
+    async def on_message(self, msg: IRCMessage):
         """Handle IRC messages"""
-        if command == "CAP":
-            # Handle capability negotiation
-            if len(params) >= 2 and params[1] == "LS":
-                # Server is listing capabilities
-                caps = " ".join(params[2:]).replace(":", "")
-                if "sasl" in caps.lower():
-                    await self.send("CAP REQ :sasl")
-                else:
-                    await self.send("CAP END")
-            elif len(params) >= 2 and params[1] == "ACK":
-                # Server acknowledged capability request
-                if "sasl" in " ".join(params[2:]).lower():
-                    await self.send("AUTHENTICATE PLAIN")
-                else:
-                    await self.send("CAP END")
-            elif len(params) >= 2 and params[1] == "NAK":
-                # Server rejected capability
-                await self.send("CAP END")
-        
-        elif command == "AUTHENTICATE":
-            if len(params) >= 1 and params[0] == "+":
-                await self.handle_sasl_auth()
-        
-        elif command == "903":  # SASL authentication successful
-            logging.info("SASL authentication successful")
-            await self.send("CAP END")
-            self.sasl_in_progress = False
-        
-        elif command == "904" or command == "905":  # SASL authentication failed
-            logging.error("SASL authentication failed")
-            await self.send("CAP END")
-            self.sasl_in_progress = False
-        
-        elif command == "433":  # ERR_NICKNAMEINUSE
+        command = msg.command
+        params = msg.params
+
+        if command == "433":  # ERR_NICKNAMEINUSE
             current_nick = self.config['nick']
             new_nick = current_nick + "_"
+            if self.nicklen and len(new_nick) > self.nicklen:
+                new_nick = current_nick[:self.nicklen - 1] + "_"
             logging.warning(f"Nick '{current_nick}' is in use, trying '{new_nick}'")
             self.config['nick'] = new_nick
-            await self.send(f"NICK {new_nick}")
+            await self.send(f"NICK {new_nick}", urgent=True)
 
         elif command == "001":  # Welcome message
             logging.info("Received 001 welcome message - IRC registration complete")
             self.registered = True
-            
-            # Identify with NickServ if configured
-            nickserv_config = self.config.get('nickserv', {})
-            if nickserv_config.get('enabled', False):
-                password = nickserv_config.get('password', '')
-                if password:
-                    # Send IDENTIFY command to NickServ
-                    await self.privmsg('NickServ', f'IDENTIFY {password}')
-                    logging.info("Sent IDENTIFY command to NickServ")
-                    
-                    # Wait a moment for NickServ to respond before continuing
-                    await asyncio.sleep(2)
-            
-            # Set user modes if configured
-            if self.config.get('modes'):
-                await self.set_mode(self.config['nick'], self.config['modes'])
-                logging.info(f"Set modes: {self.config['modes']}")
-            
-            # Join channels
-            channels = self.config.get('channels', [])
-            for channel_config in channels:
-                if isinstance(channel_config, str):
-                    # Old format: just channel name
-                    await self.join_channel(channel_config)
-                elif isinstance(channel_config, dict):
-                    # New format: {"name": "#channel", "key": "password"}
-                    channel = channel_config.get('name')
-                    key = channel_config.get('key')
-                    if channel:
-                        await self.join_channel(channel, key)
-            
-            await self.start_plugins()
-            self.load_state()
-            self.create_background_task(
-                self._periodic_state_save(), name="periodic_state_save"
+            # 001 arrives on the reader's fast lane; the slow part (NickServ
+            # wait, joins, plugin start) must not hold up the socket
+            self._registration_task = self.create_background_task(
+                self._after_registration(), name="after_registration"
             )
 
         elif command == "PRIVMSG":
             if len(params) >= 2:
                 target = params[0]
-                message = params[1] if params[1].startswith(':') else f":{params[1]}"
-                
-                # The message text should have the leading colon from IRC protocol
-                # Strip it here before processing
-                message = message.lstrip(':')
-                
-                # Parse nick from source
-                nick = source.split('!')[0] if '!' in source else source
+                message = params[1]
+                nick = msg.nick
+                if self.is_me(nick):
+                    return  # echo-message copy of something we sent
                 
+                # STATUSMSG targets (@#chan) still belong to the channel
+                if target[:1] in self.statusmsg and self.is_channel(target[1:]):
+                    target = target[1:]
+
                 # Determine if this is a channel or private message
-                if target.startswith('#'):
+                if self.is_channel(target):
                     channel = target
                 else:
                     channel = nick  # Private message
                 
+                host = f"{msg.user}@{msg.host}" if msg.host else None
+
                 # Handle CTCP ACTION (/me)
                 if message.startswith('\001ACTION ') and message.endswith('\001'):
                     action = message[8:-1]  # Remove \001ACTION and \001
-                    await self.handle_action(nick, channel, action)
+                    await self.handle_action(nick, channel, action, host=host)
                 else:
-                    await self.handle_channel_message(nick, channel, message)
+                    await self.handle_channel_message(nick, channel, message, host=host)
         
         elif command == "JOIN":
+            if params and not msg.quiet:
+                await self.handle_join(msg.nick, params[0])
+        
+        elif command == "PART":
+            if len(params) >= 1:
+                reason = params[1] if len(params) > 1 else ""
+                await self.handle_part(msg.nick, params[0], reason)
+
+    def on_roster(self, msg: IRCMessage):
+        """Keep channel membership current (JOIN/PART/KICK/QUIT/NICK/NAMES)"""
+        command = msg.command
+        params = msg.params
+
+        if command == "JOIN":
             if len(params) >= 1:
                 channel = params[0]
-                nick = source.split('!')[0] if '!' in source else source
+                nick = msg.nick
                 
                 # Add user to channel tracking
-                if nick != self.config['nick']:
-                    channel_state = self.get_channel_state(channel)
-                    if nick not in channel_state.users:
-                        channel_state.users[nick] = UserState(nick=nick)
+                if not self.is_me(nick):
+                    folded = self.casefold(nick)
+                    if self.batch_type(msg) == "netjoin" or self.netsplits.returning(folded, time.monotonic()):
+                        self._netjoin(nick, folded, channel)
+                        msg.quiet = True  # coming back from a split: no per-user join callbacks
+                        return
+                    self.get_user_state(channel, nick)
                     logging.debug(f"Added {nick} to {channel} user list")
-                
-                await self.handle_join(nick, channel)
         
         elif command == "PART":
             if len(params) >= 1:
                 channel = params[0]
-                reason = params[1] if len(params) > 1 else ""
-                nick = source.split('!')[0] if '!' in source else source
+                nick = msg.nick
                 
                 # Remove user from channel tracking
-                if nick != self.config['nick']:
+                if not self.is_me(nick):
                     channel_state = self.get_channel_state(channel)
-                    if nick in channel_state.users:
-                        del channel_state.users[nick]
+                    if channel_state.users.pop(self.casefold(nick), None):
                         logging.debug(f"Removed {nick} from {channel} user list")
-                
-                await self.handle_part(nick, channel, reason)
-        
+
         elif command == "QUIT":
-            if len(params) >= 1:
-                reason = params[0] if len(params) > 0 else ""
-                nick = source.split('!')[0] if '!' in source else source
-                
-                # Remove user from all channel tracking
-                if nick != self.config['nick']:
-                    for channel_state in self.channels_state.values():
-                        if nick in channel_state.users:
-                            del channel_state.users[nick]
-                            logging.debug(f"Removed {nick} from all channels (quit)")
+            nick = msg.nick
+
+            # Remove user from all channel tracking
+            if not self.is_me(nick):
+                folded = self.casefold(nick)
+                reason = msg.trailing
+                if self.batch_type(msg) == "netsplit" or NetsplitTracker.is_split_reason(reason):
+                    # Netsplit: removed with the rest of the burst once it settles
+                    if self.netsplits.quit(folded, reason) and self._netsplit_flush is None:
+                        self._netsplit_flush = asyncio.get_running_loop().call_later(
+                            self.netsplits.settle, self._flush_netsplit
+                        )
+                    return
+                for channel_state in self.channels_state.values():
+                    if channel_state.users.pop(folded, None):
+                        logging.debug(f"Removed {nick} from all channels (quit)")
+
+        elif command == "KICK" and len(params) >= 2:
+            kicked = params[1]
+            if not self.is_me(kicked):
+                self.get_channel_state(params[0]).users.pop(self.casefold(kicked), None)
+
+        elif command == "NICK" and params:
+            old_nick, new_nick = msg.nick, params[0]
+            if not (self.is_me(old_nick) or self.is_me(new_nick)):
+                # Same UserState under the new folded key in every shared channel
+                old_key, new_key = self.casefold(old_nick), self.casefold(new_nick)
+                for channel_state in self.channels_state.values():
+                    user_state = channel_state.users.pop(old_key, None)
+                    if user_state is not None:
+                        user_state.nick = new_nick
+                        channel_state.users[new_key] = user_state
+
+        elif command == "BATCH" and msg.params and msg.params[0].startswith('-'):
+            if self.netsplits.pending:
+                self._flush_netsplit()  # end of a netsplit batch: no need to wait
         
         elif command == "353":  # NAMES reply
             if len(params) >= 4:
@@ -883,17 +3022,46 @@ class PyMotion(IRCBot):
                 channel_state = self.get_channel_state(channel)
                 
                 for name in names:
-                    # Remove mode prefixes (@, +, etc.)
-                    clean_name = name.lstrip('@+%&~!')
-                    if clean_name and clean_name != self.config['nick']:
-                        if clean_name not in channel_state.users:
-                            channel_state.users[clean_name] = UserState(nick=clean_name)
+                    # Remove the server's PREFIX status symbols (@, +, etc.)
+                    clean_name = self.strip_prefixes(name)
+                    if clean_name and not self.is_me(clean_name):
+                        self.get_user_state(channel, clean_name)
                 
                 logging.debug(f"Added {len(names)} users to {channel} from NAMES reply")
     
-    async def handle_channel_message(self, nick: str, channel: str, message: str):
-        """Handle channel messages"""
-        if nick == self.config['nick']:
+    def _flush_netsplit(self):
+        """Apply a settled netsplit burst: one pass over the channels."""
+        if self._netsplit_flush is not None:
+            self._netsplit_flush.cancel()
+            self._netsplit_flush = None
+        now = time.monotonic()
+        reason = self.netsplits.reason
+        nicks = self.netsplits.take_pending(now)
+        if not nicks:
+            return
+        channels = 0
+        for channel_key, channel_state in self.channels_state.items():
+            users = channel_state.users
+            gone = [folded for folded in users.keys() & nicks.keys() if channel_key not in nicks[folded]]
+            for folded in gone:
+                self.netsplits.park(folded, channel_key, users.pop(folded), now)
+            channels += bool(gone)
+        logging.info(f"Netsplit ({reason}): {len(nicks)} users quit, removed from {channels} channels")
+
+    def _netjoin(self, nick: str, folded: str, channel: str):
+        """A user back from a netsplit: restore their state, skip the greeting."""
+        channel_state = self.get_channel_state(channel)
+        state = self.netsplits.rejoin(folded, self.casefold(channel))
+        if state is not None and folded not in channel_state.users:
+            state.nick = nick
+            channel_state.users[folded] = state
+        else:
+            self.get_user_state(channel, nick)
+        logging.debug(f"{nick} rejoined {channel} after a netsplit")
+
+    async def handle_channel_message(self, nick: str, channel: str, message: str, host: Optional[str] = None):
+        """Handle channel messages (host is the sender's user@host, when known)"""
+        if self.is_me(nick):
             return  # Ignore our own messages
         
         now = time.time()
@@ -925,47 +3093,194 @@ class PyMotion(IRCBot):
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             async with aiofiles.open(self.irc_log_file, 'a') as f:
                 await f.write(f"[{timestamp}] [{channel}] <{nick}> {message}\n")
+
+        if not await self.inbound_allowed(nick, channel, message, host):
+            return  # over its inbound budget: no filtering, plugins or topic tracking
         
+        ctx = MessageContext(self, nick, channel, message)
+
         # Check if message contains other usernames (indicating they're talking ABOUT the bot, not TO it)
-        contains_others = self.contains_other_usernames(channel, nick, message)
+        contains_others = self.contains_other_usernames(channel, nick, message, ctx)
         if contains_others:
             logging.info(f"Username filter blocked message in {channel}: {message}")
             return
         else:
             logging.debug(f"Message passed username filter in {channel}")
         
-        # Process through plugins
-        plugin_results = []
+        # Process through plugins, skipping any whose keywords are absent
+        triggers = self.trigger_index() if self.config.get('plugins', {}).get('prefilter', True) else None
+        triggered = triggers.matches(message, ctx.folded) if triggers else ()
         for plugin in self.plugins:
+            if triggers and plugin not in triggered and plugin not in triggers.always:
+                continue
             if plugin.enabled:
-                try:
-                    logging.debug(f"[{channel}] Trying plugin {plugin.name} (priority {plugin.priority}) for message: {message[:50]}...")
-                    handled = await plugin.handle_message(self, nick, channel, message)
-                    plugin_results.append(f"{plugin.name}={handled}")
-                    if handled:
-                        logging.info(f"[{channel}] Plugin {plugin.name} handled the message")
-                        break  # Plugin handled it, stop processing
-                    else:
-                        logging.debug(f"[{channel}] Plugin {plugin.name} did not handle the message")
-                except Exception as e:
-                    logging.error(f"[{channel}] Error in plugin {plugin.name}: {e}")
-                    import traceback
-                    logging.error(traceback.format_exc())
-        
-        # Log summary of plugin attempts
-        logging.debug(f"[{channel}] Plugin results: {', '.join(plugin_results)}")
+                handle_context = getattr(plugin, 'handle_context', None)
+                if hasattr(plugin, 'match'):
+                    # Two-phase plugin: claim now, do the slow part off the dispatch path
+                    claim = self.run_plugin_match(plugin, ctx)
+                    handled = bool(claim)
+                    if claim:
+                        self.create_background_task(
+                            self.run_plugin_hook(plugin, 'respond', plugin.respond, claim),
+                            name=f"{plugin.name}.respond",
+                        )
+                elif handle_context:
+                    handled = await self.run_plugin_hook(plugin, 'handle_message', handle_context, ctx)
+                else:
+                    handled = await self.run_plugin_hook(
+                        plugin, 'handle_message', plugin.handle_message, self, nick, channel, message
+                    )
+                if handled:
+                    logging.info(f"[{channel}] Plugin {plugin.name} handled the message")
+                    break  # Plugin handled it, stop processing
+        # Per-plugin call/claim counts and timings: self.profiler (admin "perf")
 
         # Track topics for opinion formation
-        self.track_topic(channel, nick, message)
+        self.track_topic(channel, nick, message, ctx)
 
         channel_state.last_activity = now
     
-    def contains_other_usernames(self, channel: str, speaker: str, message: str) -> bool:
+    def configure_inbound_flood(self):
+        config = self.config.get('inbound_flood', {})
+        self.inbound_flood = InboundFloodControl.from_config(config) if config.get('enabled') else None
+
+    async def inbound_allowed(self, nick: str, channel: str, text: str, host: Optional[str] = None) -> bool:
+        """Inbound flood control for a channel message or action. Over-budget
+        lines are dropped before any filtering or plugin work; a user whose
+        commands are dropped may get one warning."""
+        limiter = self.inbound_flood
+        if limiter is None or nick in self.config.get('admins', []):
+            return True
+        command = text.startswith('!') or self.addressing(text).mentioned
+        user_key = host.lower() if host else self.casefold(nick)
+        channel_key = self.casefold(channel) if self.is_channel(channel) else None
+        verdict = limiter.check(user_key, channel_key, command, time.monotonic(), nick)
+        if verdict == "ok":
+            return True
+        logging.debug(f"Inbound flood control dropped a line from {nick} in {channel}")
+        if verdict == "warn":
+            warning = self.config.get('inbound_flood', {}).get('warning')
+            if warning:
+                await self.privmsg(channel, warning.format(nick=nick))
+        return False
+
+    def plugin_breaker(self, name: str) -> PluginBreaker:
+        breaker = self.plugin_breakers.get(name)
+        if breaker is None:
+            limits = self.config.get('plugin_limits', {})
+            breaker = self.plugin_breakers[name] = PluginBreaker.from_config(limits.get('breaker', {}))
+        return breaker
+
+    def plugin_budget(self, name: str, hook: str) -> float:
+        limits = self.config.get('plugin_limits', {})
+        budget = limits.get('per_plugin', {}).get(name, {}).get(hook)
+        return limits.get('budgets', {}).get(hook, 0) if budget is None else budget
+
+    def _plugin_failed(self, plugin, breaker: PluginBreaker, reason: str):
+        delay = breaker.record_failure(reason, time.monotonic())
+        if delay is not None:
+            logging.warning(f"Plugin {plugin.name} disabled for {delay:.0f}s after repeated failures ({reason})")
+
+    async def run_plugin_hook(self, plugin, hook: str, func, *args):
+        """Await one plugin hook within its wall-clock budget and feed the
+        plugin's circuit breaker. Returns the hook's result, or None if the
+        breaker is open or the hook raised or overran (it is cancelled)."""
+        stats = self.profiler.hook(plugin.name, hook)
+        breaker = self.plugin_breaker(plugin.name)
+        if not breaker.allow(time.monotonic()):
+            stats.skipped += 1
+            return None
+        budget = self.plugin_budget(plugin.name, hook)
+        stats.calls += 1
+        started = time.perf_counter()
+        deadline = asyncio.timeout(budget or None)
+        try:
+            async with deadline:
+                result = await func(*args)
+        except Exception as e:
+            if deadline.expired():  # not a TimeoutError the plugin raised itself
+                stats.timeouts += 1
+                logging.warning(f"Plugin {plugin.name}.{hook} overran its {budget:g}s budget and was cancelled")
+                self._plugin_failed(plugin, breaker, f"{hook} timed out")
+                return None
+            stats.exceptions += 1
+            logging.error(f"Error in plugin {plugin.name}.{hook}: {e}")
+            logging.error(traceback.format_exc())
+            self._plugin_failed(plugin, breaker, f"{hook}: {e}")
+            return None
+        finally:
+            stats.latency.observe(time.perf_counter() - started)
+        breaker.record_success()
+        if result:
+            stats.claims += 1
+        return result
+
+    def run_plugin_match(self, plugin, ctx: MessageContext):
+        """Synchronous counterpart of run_plugin_hook for two-phase match()."""
+        stats = self.profiler.hook(plugin.name, 'match')
+        breaker = self.plugin_breaker(plugin.name)
+        if not breaker.allow(time.monotonic()):
+            stats.skipped += 1
+            return None
+        stats.calls += 1
+        started = time.perf_counter()
+        try:
+            claim = plugin.match(ctx)
+        except Exception as e:
+            stats.exceptions += 1
+            logging.error(f"Error in plugin {plugin.name}.match: {e}")
+            logging.error(traceback.format_exc())
+            self._plugin_failed(plugin, breaker, f"match: {e}")
+            return None
+        finally:
+            stats.latency.observe(time.perf_counter() - started)
+        if claim:
+            stats.claims += 1
+        else:
+            breaker.record_success()  # a claim is judged by its respond()
+        return claim
+
+    def plugin_breaker_report(self) -> Dict[str, str]:
+        """Breaker state for every plugin that has failed recently or is disabled."""
+        now = time.monotonic()
+        return {
+            name: breaker.describe(now) for name, breaker in self.plugin_breakers.items()
+            if breaker.state != "closed" or breaker.failures
+        }
+
+    def trigger_index(self) -> TriggerIndex:
+        """The keyword prefilter, rebuilt when plugins reload or the nick changes."""
+        names = self.bot_names()
+        index = self._trigger_index
+        if index is None or index.plugins is not self.plugins or index.names != names:
+            index = self._trigger_index = TriggerIndex(self.plugins, names)
+        return index
+
+    def bot_names(self) -> tuple:
+        """The nick followed by the configured aliases, lowercased."""
+        source = (self.config['nick'], tuple(self.config.get('aliases', [])))
+        matcher = self._address_matcher
+        if matcher is None or matcher.source != source:
+            matcher = self._address_matcher = AddressMatcher(*source)
+        return matcher.names
+
+    def addressing(self, message: str) -> Addressing:
+        """Whether message addresses or mentions the bot, and what follows the name.
+
+        Every plugin asks about the same line, so the last answer is kept.
+        """
+        names = self.bot_names()
+        last_message, last_names, result = self._last_addressing
+        if message is not last_message or names is not last_names:
+            result = self._address_matcher.match(message)
+            self._last_addressing = (message, names, result)
+        return result
+
+    def contains_other_usernames(self, channel: str, speaker: str, message: str,
+                                 ctx: Optional[MessageContext] = None) -> bool:
         """Check if message contains usernames other than the bot's and speaker's"""
-        # Bot names (including aliases)
-        bot_names = [self.config['nick'].lower()] + [alias.lower() for alias in self.config.get('aliases', [])]
-        
-        message_lower = message.lower()
+        ctx = ctx or MessageContext(self, speaker, channel, message)
+        message_lower = ctx.folded
         
         # Special case: Allow "what's my cat's name?" pattern
         if re.search(r"what'?s my cat'?s name", message_lower):
@@ -974,60 +3289,37 @@ class PyMotion(IRCBot):
         
         # Don't filter if this looks like a command to the bot
         # Commands typically have bot name at the start
-        for bot_name in bot_names:
+        for bot_name in self.bot_names():
             if message_lower.startswith(bot_name) or message_lower.startswith(f"@{bot_name}"):
                 logging.debug(f"Message is a command to the bot, skipping username filter")
                 return False
         
-        # Get list of users in this channel
-        channel_state = self.get_channel_state(channel)
-        
-        # Words in the message
-        words = message.lower().split()
-        
-        # Check each word against known usernames
-        for word in words:
-            # Clean the word (remove punctuation)
-            clean_word = ''.join(c for c in word if c.isalnum())
-            if not clean_word:
-                continue
-                
-            # Skip if it's the speaker's name
-            if clean_word == speaker.lower():
-                continue
-                
-            # Skip if it's one of the bot's names
-            if clean_word in bot_names:
-                continue
-                
-            # Check if it matches any user in the channel
-            for username in channel_state.users:
-                if clean_word == username.lower():
-                    logging.debug(f"Found other username '{username}' in message, filtering out")
-                    return True
+        # Other channel members named in the message (speaker and bot excluded)
+        if ctx.mentioned_nicks:
+            logging.debug(f"Found other usernames {sorted(ctx.mentioned_nicks)} in message, filtering out")
+            return True
         
         return False
     
-    async def handle_action(self, nick: str, channel: str, action: str):
+    async def handle_action(self, nick: str, channel: str, action: str, host: Optional[str] = None):
         """Handle /me actions"""
-        if nick == self.config['nick']:
+        if self.is_me(nick):
             return
         
         logging.info(f"[{channel}] * {nick} {action}")
+        if not await self.inbound_allowed(nick, channel, action, host):
+            return
         
         # Process through plugins
         for plugin in self.plugins:
-            if plugin.enabled:
-                try:
-                    handled = await plugin.handle_action(self, nick, channel, action)
-                    if handled:
-                        break
-                except Exception as e:
-                    logging.error(f"Error in plugin {plugin.name}: {e}")
+            hook = getattr(plugin, 'handle_action', None)  # optional for match/handle_context plugins
+            if plugin.enabled and hook:
+                if await self.run_plugin_hook(plugin, 'handle_action', hook, self, nick, channel, action):
+                    break
     
     async def handle_join(self, nick: str, channel: str):
         """Handle user joins"""
-        if nick == self.config['nick']:
+        if self.is_me(nick):
             logging.info(f"Joined {channel}")
             return
         
@@ -1035,31 +3327,56 @@ class PyMotion(IRCBot):
         
         # Process through plugins (stop chain if a plugin returns True)
         for plugin in self.plugins:
-            if plugin.enabled:
-                try:
-                    handled = await plugin.handle_join(self, nick, channel)
-                    if handled:
-                        break
-                except Exception as e:
-                    logging.error(f"Error in plugin {plugin.name}: {e}")
+            hook = getattr(plugin, 'handle_join', None)  # optional for match/handle_context plugins
+            if plugin.enabled and hook:
+                if await self.run_plugin_hook(plugin, 'handle_join', hook, self, nick, channel):
+                    break
 
     async def handle_part(self, nick: str, channel: str, reason: str):
         """Handle user parts"""
-        if nick == self.config['nick']:
+        if self.is_me(nick):
             return
 
         logging.info(f"[{channel}] {nick} left ({reason})")
 
         # Process through plugins (stop chain if a plugin returns True)
         for plugin in self.plugins:
-            if plugin.enabled:
+            hook = getattr(plugin, 'handle_part', None)  # optional for match/handle_context plugins
+            if plugin.enabled and hook:
+                if await self.run_plugin_hook(plugin, 'handle_part', hook, self, nick, channel, reason):
+                    break
+    
+    def request_stop(self):
+        """Stop run(): close the connection and skip any pending reconnect."""
+        self.connected = False
+        self._stop_requested.set()
+        if self.writer:
+            self.writer.close()
+
+    async def cleanup_plugins(self):
+        """Call every plugin's cleanup() hook."""
+        for plugin in self.plugins:
+            if hasattr(plugin, 'cleanup'):
                 try:
-                    handled = await plugin.handle_part(self, nick, channel, reason)
-                    if handled:
-                        break
+                    await plugin.cleanup()
                 except Exception as e:
-                    logging.error(f"Error in plugin {plugin.name}: {e}")
-    
+                    logging.error(f"Error cleaning up plugin {plugin.name}: {e}")
+
+    async def _close_connection(self):
+        """Connection-scoped teardown before a reconnect; plugins, background
+        tasks, caches and HTTP pools stay up."""
+        if self._registration_task and not self._registration_task.done():
+            self._registration_task.cancel()
+        try:
+            self.save_flood_limits()
+        except Exception as e:
+            logging.error(f"Error saving flood limits: {e}")
+        try:
+            # Lines still queued were meant for a socket that is gone
+            await self.disconnect(flush_timeout=0)
+        except Exception as e:
+            logging.error(f"Error closing writer: {e}")
+
     async def _cleanup(self):
         """Run all cleanup tasks (background tasks, plugins, writer)."""
         try:
@@ -1067,29 +3384,34 @@ class PyMotion(IRCBot):
         except Exception as e:
             logging.error(f"Error saving state: {e}")
 
+        try:
+            self.save_flood_limits()
+        except Exception as e:
+            logging.error(f"Error saving flood limits: {e}")
+
         try:
             await self._cancel_background_tasks()
         except Exception as e:
             logging.error(f"Error cancelling background tasks: {e}")
 
-        for plugin in self.plugins:
-            if hasattr(plugin, 'cleanup'):
-                try:
-                    await plugin.cleanup()
-                except Exception as e:
-                    logging.error(f"Error cleaning up plugin {plugin.name}: {e}")
+        # Shared plugins outlive any one network; the hub cleans them up
+        if not self.hub:
+            await self.cleanup_plugins()
 
         try:
-            if self.writer:
-                self.writer.close()
-                await self.writer.wait_closed()
+            await self.disconnect()
         except Exception as e:
             logging.error(f"Error closing writer: {e}")
 
     async def run(self):
-        """Main bot loop with reconnection and exponential backoff."""
+        """Main bot loop with reconnection and exponential backoff.
+
+        A connection that got as far as registering is retried at once (at
+        most once a minute); failures after that back off exponentially.
+        """
         backoff = 1
         max_backoff = 300  # 5 minutes max
+        last_fast_retry = float('-inf')
 
         while True:
             try:
@@ -1102,27 +3424,189 @@ class PyMotion(IRCBot):
             except Exception as e:
                 logging.error(f"Bot error: {e}")
 
-            await self._cleanup()
+            was_registered = self.registered
+            if was_registered:
+                self._connection_lost_at = time.monotonic()
+            await self._close_connection()
 
             # If a graceful shutdown was requested, exit now
             if self.exit_code:
+                await self._cleanup()
+                if self.hub:
+                    await self.hub.shutdown(self.exit_code)
+                    break
                 sys.exit(self.exit_code)
 
             # If connected was explicitly set to False (e.g. admin shutdown), exit
             if not self.connected:
                 break
 
+            self.reconnect_stats["count"] += 1
+            if was_registered and time.monotonic() - last_fast_retry > 60:
+                last_fast_retry = time.monotonic()
+                logging.info("Connection lost, reconnecting now")
+                continue
+
             logging.info(f"Reconnecting in {backoff}s...")
-            await asyncio.sleep(backoff)
+            try:
+                await asyncio.wait_for(self._stop_requested.wait(), timeout=backoff)
+                break
+            except asyncio.TimeoutError:
+                pass
             backoff = min(backoff * 2, max_backoff)
 
         await self._cleanup()
 
+class NetworkHub:
+    """Several IRC networks in one process.
+
+    Each network is a PyMotion with its own connection, flood limiter and
+    channel state. Plugin instances (and whatever they hold, like the AI
+    plugin's HTTP client), opinions and bot_state.json are shared; plugins
+    key their per-channel and per-nick state with bot.network_key. Enabled
+    by a non-empty "networks" list in the config; each entry is merged over
+    the top-level config and needs a unique "name".
+    """
+
+    def __init__(self, config_file: str = "pymotion.json"):
+        # A plain PyMotion loads the shared config and plugins; it is not connected
+        self._loader = PyMotion(config_file)
+        self.config = self._loader.config
+        self.plugins = self._loader.plugins
+        self.opinions = self._loader.opinions
+        self.profiler = self._loader.profiler
+        self.exit_code = 0
+        self.networks: Dict[str, PyMotion] = {}
+        for net_config in self.config.get('networks', []):
+            name = net_config['name']
+            self.networks[name] = PyMotion(config_file, network=name, hub=self)
+        self.load_state()
+
+    def network_config(self, name: str) -> Dict[str, Any]:
+        """The shared config with network `name`'s overrides merged in."""
+        import copy
+        base = {k: v for k, v in self.config.items() if k != 'networks'}
+        overrides = next(n for n in self.config['networks'] if n['name'] == name)
+        merged = PyMotion._deep_merge(copy.deepcopy(base), overrides)
+        merged['network_name'] = name
+        return merged
+
+    def save_state(self):
+        """Persist every network's state plus the shared opinions."""
+        data = {
+            "_opinions": self.opinions,
+            "_networks": {name: net.state_snapshot() for name, net in self.networks.items()},
+        }
+        path = self._loader._state_file()
+        tmp = str(path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        import os
+        os.replace(tmp, path)
+        logging.debug("Bot state saved to disk")
+
+    def load_state(self):
+        """Load persisted state; a single-network file goes to the first network."""
+        path = self._loader._state_file()
+        if not path.exists() or not self.networks:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.opinions.update(data.pop("_opinions", {}))
+            per_network = data.pop("_networks", None)
+            if per_network is None:
+                per_network = {next(iter(self.networks)): data}
+            for name, net_data in per_network.items():
+                if name in self.networks:
+                    self.networks[name].apply_state(net_data)
+            logging.info(f"Loaded bot state from {path}")
+        except Exception as e:
+            logging.error(f"Error loading bot state: {e}")
+
+    async def reload_config_and_plugins(self):
+        """Reload shared config and plugins; network connections stay up."""
+        for net in self.networks.values():
+            await net._cancel_background_tasks()
+        await self._loader.cleanup_plugins()
+        self._loader.config = self._loader.load_config()
+        self.config = self._loader.config
+        self._loader.load_plugins()
+        # load_plugins rebinds the list; keep every network pointed at the new one
+        self.plugins = self._loader.plugins
+        for name, net in self.networks.items():
+            net.plugins = self.plugins
+            net.plugin_breakers.clear()
+            if name in {n['name'] for n in self.config.get('networks', [])}:
+                current_nick = net.config['nick']  # may carry a 433 suffix
+                net.config.update(self.network_config(name))
+                net.config['nick'] = current_nick
+                net.configure_inbound_flood()
+            if net.registered:
+                await net.start_plugins()
+
+    def stop(self, exit_code: int = 0):
+        """Stop every network; run() returns once they have all closed."""
+        self.exit_code = self.exit_code or exit_code
+        for net in self.networks.values():
+            net.request_stop()
+
+    async def shutdown(self, exit_code: int = 0):
+        self.stop(exit_code)
+
+    async def run(self):
+        await asyncio.gather(*(net.run() for net in self.networks.values()))
+        self.save_state()
+        await self._loader.cleanup_plugins()
+        if self.exit_code:
+            sys.exit(self.exit_code)
+
+
+def run_with_event_loop(coro, event_loop: str = "asyncio"):
+    """asyncio.run() on the configured event loop ("asyncio" or "uvloop").
+
+    Falls back to the stdlib loop with a warning when uvloop isn't installed.
+    """
+    loop_factory = None
+    if event_loop == "uvloop":
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            logging.warning("event_loop is 'uvloop' but uvloop is not installed; using asyncio")
+    elif event_loop != "asyncio":
+        logging.warning(f"Unknown event_loop '{event_loop}'; using asyncio")
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(coro)
+
+
+def _raw_config(config_file: str = "pymotion.json") -> Dict[str, Any]:
+    """The config file as written (no defaults), for choices made before
+    any bot is built; empty if it is missing or unreadable."""
+    path = Path(__file__).resolve().parent / config_file
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _configured_event_loop(config_file: str = "pymotion.json") -> str:
+    """Read event_loop from the config before any loop exists."""
+    return _raw_config(config_file).get('event_loop', 'asyncio')
+
+
 async def main():
     """Entry point"""
     import signal
 
-    bot = PyMotion()
+    # Decide single bot vs hub from the file itself: building a PyMotion
+    # just to look would load (and start) every plugin twice
+    if _raw_config().get('networks'):
+        bot = NetworkHub()
+    else:
+        bot = PyMotion()
+    logging.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
 
     # Handle SIGTERM for clean systemd shutdown
     loop = asyncio.get_running_loop()
@@ -1132,11 +3616,14 @@ async def main():
     await bot.run()
 
 
-def _handle_signal(bot: PyMotion):
+def _handle_signal(bot):
     """Signal handler that triggers graceful shutdown."""
     logging.info("Received shutdown signal")
-    bot.connected = False
+    if isinstance(bot, NetworkHub):
+        bot.stop()
+    else:
+        bot.connected = False
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_with_event_loop(main(), _configured_event_loop())
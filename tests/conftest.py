@@ -0,0 +1,42 @@
+"""
+Shared fixtures: PyMotion bots built from a pymotion.json in tmp_path, with
+state, flood-limit and plugin-profile files kept out of the checkout.
+"""
+
+import json
+
+import pytest
+
+from pymotion_bot import PyMotion
+
+BASE_CONFIG = {"nick": "pybot", "irc_log_file": "", "log_level": "INFO", "plugins": {"enabled": ["admin"]}}
+
+
+@pytest.fixture
+def write_config(tmp_path, monkeypatch):
+    """write_config(**overrides) -> path of a pymotion.json holding BASE_CONFIG plus overrides."""
+    monkeypatch.setattr(PyMotion, "_state_file", lambda self: tmp_path / "bot_state.json")
+    monkeypatch.setattr(PyMotion, "_flood_limits_file", lambda self: tmp_path / "flood_limits.json")
+    monkeypatch.setattr(PyMotion, "_plugin_profile_file", lambda self: tmp_path / "plugin_profile.json")
+
+    def write(**overrides):
+        config_file = tmp_path / "pymotion.json"
+        config_file.write_text(json.dumps({**BASE_CONFIG, **overrides}))
+        return str(config_file)
+    return write
+
+
+@pytest.fixture
+def pymotion(write_config):
+    """pymotion(record=False, **overrides) -> PyMotion. With record=True,
+    privmsg/action replies are collected in bot.sent instead of sent."""
+    def make(record=False, **overrides):
+        bot = PyMotion(write_config(**overrides))
+        if record:
+            bot.sent = []
+
+            async def record_reply(target, text, ambient=False):
+                bot.sent.append(text)
+            bot.privmsg = bot.action = record_reply
+        return bot
+    return make
@@ -0,0 +1,149 @@
+"""
+Minimal in-process IRC server for tests and benchmarks.
+
+Registers any client after NICK/USER, echoes JOINs back with a hostmask,
+answers client PINGs and records every line the client sent. With ``caps``
+set it also speaks CAP LS 302 (split over several lines) and holds
+registration until CAP END.
+"""
+
+import asyncio
+import time
+
+from pymotion_bot import LineFramer
+
+
+class FakeIRCServer:
+    def __init__(self, server_name: str = "irc.fake.test", auto_welcome: bool = True,
+                 isupport: str = "", caps: list[str] | None = None, caps_per_line: int = 3):
+        self.server_name = server_name
+        self.auto_welcome = auto_welcome
+        self.isupport = isupport
+        self.caps = caps or []
+        self.answer_pings = True  # False simulates a silently dead link
+        self.join_errors: dict[str, list[str]] = {}  # channel -> numerics to answer JOINs with, in order
+        self.caps_per_line = caps_per_line
+        self.enabled_caps: set[str] = set()
+        self._cap_negotiating = False
+        self._user_seen = False
+        self.received: list[tuple[float, str]] = []
+        self.nick = None
+        self.writer = None
+        self.connections = 0
+        self._server = None
+        self._connected = asyncio.Event()
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def close(self):
+        self.drop_client()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def drop_client(self):
+        """Close the current client connection without any QUIT/ERROR."""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+            self._connected.clear()
+
+    async def wait_connected(self, timeout: float = 5.0):
+        await asyncio.wait_for(self._connected.wait(), timeout)
+
+    def send(self, *lines: str):
+        self.writer.write("".join(f"{line}\r\n" for line in lines).encode("utf-8"))
+
+    def sent_lines(self, command: str | None = None) -> list[str]:
+        lines = [line for _, line in self.received]
+        if command:
+            lines = [line for line in lines if line.split(" ", 1)[0] == command]
+        return lines
+
+    async def wait_for(self, predicate, timeout: float = 5.0, interval: float = 0.005):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            await asyncio.sleep(interval)
+        return predicate()
+
+    async def _handle(self, reader, writer):
+        self.drop_client()
+        self.writer = writer
+        self.connections += 1
+        self.enabled_caps = set()
+        self._cap_negotiating = False
+        self._user_seen = False
+        self._connected.set()
+        framer = LineFramer()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for line in framer.feed(data):
+                    self.received.append((time.monotonic(), line))
+                    self._on_line(line, writer)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def _welcome(self):
+        if not self.auto_welcome:
+            return
+        self.send(f":{self.server_name} 001 {self.nick} :Welcome to the fake network")
+        if self.isupport:
+            self.send(f":{self.server_name} 005 {self.nick} {self.isupport} :are supported by this server")
+        self.send(f":{self.server_name} 422 {self.nick} :MOTD File is missing")
+
+    def _on_cap(self, rest: str):
+        subcommand, _, args = rest.partition(" ")
+        nick = self.nick or "*"
+        if subcommand == "LS":
+            self._cap_negotiating = True
+            chunks = [self.caps[i:i + self.caps_per_line]
+                      for i in range(0, len(self.caps), self.caps_per_line)] or [[]]
+            for i, chunk in enumerate(chunks):
+                more = "* " if i < len(chunks) - 1 else ""
+                self.send(f":{self.server_name} CAP {nick} LS {more}:{' '.join(chunk)}")
+        elif subcommand == "REQ":
+            requested = args.lstrip(":").split()
+            offered = {cap.partition("=")[0] for cap in self.caps}
+            if all(cap.lstrip("-") in offered for cap in requested):
+                self.enabled_caps.update(cap for cap in requested if not cap.startswith("-"))
+                self.send(f":{self.server_name} CAP {nick} ACK :{' '.join(requested)}")
+            else:
+                self.send(f":{self.server_name} CAP {nick} NAK :{' '.join(requested)}")
+        elif subcommand == "END":
+            self._cap_negotiating = False
+            if self._user_seen:
+                self._welcome()
+
+    def _on_line(self, line: str, writer):
+        if writer is not self.writer:
+            return
+        command, _, rest = line.partition(" ")
+        if command == "NICK":
+            self.nick = rest.lstrip(":")
+        elif command == "USER":
+            self._user_seen = True
+            if not self._cap_negotiating:
+                self._welcome()
+        elif command == "CAP" and self.caps:
+            self._on_cap(rest)
+        elif command == "PING" and self.answer_pings:
+            self.send(f":{self.server_name} PONG {self.server_name} :{rest.lstrip(':')}")
+        elif command == "JOIN":
+            for channel in rest.split(" ", 1)[0].split(","):
+                errors = self.join_errors.get(channel)
+                if errors:
+                    numeric, _, text = errors.pop(0).partition(" ")
+                    self.send(f":{self.server_name} {numeric} {self.nick} {channel} :{text}")
+                else:
+                    self.send(f":{self.nick}!bot@fake.host JOIN {channel}")
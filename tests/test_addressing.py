@@ -0,0 +1,53 @@
+import asyncio
+import random
+
+from pymotion_bot import AddressMatcher, Addressing
+
+
+def test_address_matcher_forms():
+    matcher = AddressMatcher("PyBot", ["motion", "pb"])
+    assert matcher.names == ("pybot", "motion", "pb")
+
+    assert matcher.match("pybot: make me a sandwich") == Addressing(True, True, "make me a sandwich", "pybot")
+    assert matcher.match("@Motion,tell me a joke") == Addressing(True, True, "tell me a joke", "motion")
+    assert matcher.match("PB") == Addressing(True, True, "", "pb")
+    assert matcher.match("hey pybot fire pie at bob") == Addressing(False, True, "fire pie at bob", "pybot")
+    assert matcher.match("pybot's broken again") == Addressing(False, True, "'s broken again", "pybot")
+    assert matcher.match("pybots everywhere") == Addressing(False, False, "pybots everywhere", None)
+    assert matcher.match("emotional damage").mentioned is False
+
+
+def _pymotion(pymotion):
+    return pymotion(record=True, aliases=["motion"],
+                    plugins={"enabled": ["cancel", "decision", "kill", "projectile"]})
+
+
+def test_addressing_is_rebuilt_on_nick_change_and_cached_per_line(pymotion):
+    bot = _pymotion(pymotion)
+    line = "pybot_: hi"
+    assert not bot.addressing(line).addressed
+
+    bot.config['nick'] = "pybot_"  # 433 fallback
+    first = bot.addressing(line)
+    assert first.addressed and first.which_alias == "pybot_"
+    assert bot.addressing(line) is first
+    assert bot.bot_names() == ("pybot_", "motion")
+
+
+def test_migrated_plugins_answer_to_aliases(pymotion, monkeypatch):
+    bot = _pymotion(pymotion)
+    monkeypatch.setattr(random, "random", lambda: 0.5)  # no rare "neither option" replies
+
+    async def say(text):
+        bot.sent.clear()
+        await bot.handle_channel_message("alice", "#chan", text)
+        await asyncio.gather(*bot.background_tasks)  # two-phase plugins reply in the background
+        return list(bot.sent)
+
+    async def scenario():
+        assert await say("motion: should I sleep or code?") in (["alice: sleep"], ["alice: code"])
+        assert await say("motion cancel motion") == ["Nice try, alice, but I'm uncancellable!"]
+        assert await say("kill bob") == []
+        assert await say("cancel bob, motion") == []
+
+    asyncio.run(scenario())
@@ -1,3 +1,5 @@
+import asyncio
+
 from plugins.ai_response import AIResponsePlugin
 
 
@@ -11,11 +13,21 @@ def test_ai_response_triggers_on_alias_mentions():
     assert plugin._is_triggered("@pybot, tell me about python", bot_names) is True
 
 
-def test_ai_response_extracts_prompt_from_alias_mentions():
+def test_ai_response_prompts_with_the_addressed_text(pymotion):
+    bot = pymotion(record=True, aliases=["motion"])
     plugin = AIResponsePlugin()
-    bot_names = ["pymotion", "pybot", "motion"]
+    plugin.config.update(response_probability=1.0, cooldown_seconds=0)
+    prompts = []
+
+    async def reply(prompt, context):
+        prompts.append(prompt)
+        return "sure"
+    plugin._get_response_with_retries = reply
 
-    assert plugin._extract_prompt("motion:hi", bot_names) == "hi"
-    assert plugin._extract_prompt("@motion: hi", bot_names) == "hi"
-    assert plugin._extract_prompt("@pybot, tell me about python", bot_names) == "tell me about python"
+    async def scenario():
+        for message in ("motion:hi", "@motion: hi", "@pybot, tell me about python", "what do you think?"):
+            assert await plugin.handle_message(bot, "alice", "#chan", message)
 
+    asyncio.run(scenario())
+    assert prompts == ["hi", "hi", "tell me about python", "what do you think?"]
+    assert bot.sent == ["sure"] * 4
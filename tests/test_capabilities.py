@@ -0,0 +1,75 @@
+import asyncio
+
+from fake_ircd import FakeIRCServer
+from pymotion_bot import CapabilityManager, IRCBot
+
+
+def test_multiline_ls_is_buffered_until_final_line():
+    caps = CapabilityManager(["server-time", "batch", "chghost"])
+    assert caps.on_ls(["*", "multi-prefix server-time"]) == []
+    assert caps.on_ls(["*", "sasl=PLAIN,EXTERNAL batch"]) == []
+    lines = caps.on_ls(["account-tag"])
+    assert lines == ["CAP REQ :batch server-time"]
+    assert caps.available["sasl"] == "PLAIN,EXTERNAL"
+    assert caps.on_ack(["batch server-time"]) == ["CAP END"]
+    assert caps.enabled == {"batch", "server-time"}
+
+
+def test_nak_still_ends_negotiation_and_nothing_offered_ends_immediately():
+    caps = CapabilityManager(["server-time"])
+    assert caps.on_ls(["server-time"]) == ["CAP REQ :server-time"]
+    assert caps.on_nak(["server-time"]) == ["CAP END"]
+    assert caps.enabled == set()
+
+    caps = CapabilityManager(["server-time"])
+    assert caps.on_ls(["multi-prefix"]) == ["CAP END"]
+
+
+def test_sasl_holds_cap_end_until_result():
+    caps = CapabilityManager(["server-time"], sasl=True)
+    caps.on_ls(["sasl server-time"])
+    assert caps.on_ack(["sasl server-time"]) == ["AUTHENTICATE PLAIN"]
+    assert caps.sasl_done() == ["CAP END"]
+
+
+def test_cap_notify_new_and_del():
+    caps = CapabilityManager(["away-notify", "cap-notify"])
+    caps.on_ls(["cap-notify"])
+    caps.on_ack(["cap-notify"])
+    assert caps.on_new(["away-notify"]) == ["CAP REQ :away-notify"]
+    caps.on_ack(["away-notify"])
+    assert "away-notify" in caps.enabled
+    caps.on_del(["away-notify"])
+    assert "away-notify" not in caps.enabled
+
+
+def test_negotiates_with_server_before_registration_and_tracks_state():
+    async def scenario():
+        offered = ["multi-prefix", "server-time", "extended-join", "away-notify",
+                   "account-notify", "batch", "draft/unknown"]
+        server = await FakeIRCServer(caps=offered, caps_per_line=2).start()
+        bot = IRCBot({"server": "127.0.0.1", "port": server.port, "ssl": False,
+                      "nick": "pybot", "realname": "test"})
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+
+        assert await server.wait_for(lambda: server.sent_lines("CAP")[-1:] == ["CAP END"])
+        sent = [line.split(" ", 1)[0] for line in server.sent_lines()]
+        assert sent[0] == "CAP"
+        assert bot.caps.enabled == set(offered) - {"draft/unknown"}
+        assert bot.has_cap("extended-join") and not bot.has_cap("echo-message")
+
+        server.send(":alice!a@h JOIN #chan alice_acct :Alice",
+                    ":bob!b@h AWAY :gone fishing",
+                    ":carol!c@h ACCOUNT carol_acct")
+        assert await server.wait_for(lambda: "carol" in bot.accounts)
+        assert bot.accounts == {"alice": "alice_acct", "carol": "carol_acct"}
+        assert bot.away == {"bob"}
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+import asyncio
+
+from pymotion_bot import IRCBot, casefold, parse_irc_message
+
+
+def test_casefold_tables():
+    assert casefold("Nick[A]\\~") == "nick{a}|^"
+    assert casefold("Nick[A]\\~", "strict-rfc1459") == "nick{a}|~"
+    assert casefold("Nick[A]\\~", "ascii") == "nick[a]\\~"
+    assert casefold("ÄRGER[x]", "rfc7613") == "ärger{x}"
+
+
+def test_isupport_drives_folding_prefixes_and_chantypes():
+    bot = IRCBot({"nick": "Py[Bot]"})
+    assert bot.is_me("py{bot}") and bot.casemapping == "rfc1459"
+    assert bot.strip_prefixes("@+nick") == "nick"
+    assert bot._line_target("PRIVMSG #A[ :hi") == bot._line_target("NOTICE #a{ :hi") == "#a{"
+
+    bot._update_isupport(["CASEMAPPING=ascii", "PREFIX=(qaohv)~&@%+", "CHANTYPES=#!",
+                          "NICKLEN=9", "STATUSMSG=@+"])
+    assert not bot.is_me("py{bot}") and bot.is_me("PY[BOT]")
+    assert bot._line_target("PRIVMSG #a[ :hi") != bot._line_target("PRIVMSG #a{ :hi")  # separate DRR lanes
+    assert bot.prefix_modes == {"q": "~", "a": "&", "o": "@", "h": "%", "v": "+"}
+    assert bot.strip_prefixes("~&@nick") == "nick"
+    assert bot.is_channel("!abcdechan") and not bot.is_channel("&local")
+    assert bot.nicklen == 9 and bot.statusmsg == "@+"
+
+
+def test_user_state_is_shared_across_rfc1459_spellings(pymotion):
+    bot = pymotion()
+    bot._update_isupport(["PREFIX=(qov)~@+"])
+
+    async def feed(*lines):
+        for line in lines:
+            await bot.dispatch_message(parse_irc_message(line))
+
+    asyncio.run(feed(
+        ":irc.test 353 pybot = #Chan :~@Pybot ~Alice @+Bob[away] +carol",
+        ":Bob{AWAY}!b@h PRIVMSG #CHAN :hello",
+    ))
+    state = bot.get_channel_state("#chan")
+    assert set(state.users) == {"alice", "bob{away}", "carol"}
+    assert state.users["bob{away}"].nick == "Bob[away]"
+    assert bot.get_user_state("#Chan", "BOB[AWAY]") is state.users["bob{away}"]
+    assert list(bot.channels_state) == ["#chan"]
+
+    asyncio.run(feed(":BOB{away}!b@h QUIT :bye"))
+    assert "bob{away}" not in state.users
+
+
+def test_username_filter_matches_folded_nicks(pymotion):
+    bot = pymotion()
+    bot.get_user_state("#chan", "ALICE")
+    assert bot.contains_other_usernames("#chan", "dave", "what does alice think, pybot?")
+    assert not bot.contains_other_usernames("#chan", "Alice", "I think alice is right")
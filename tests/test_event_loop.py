@@ -0,0 +1,25 @@
+import asyncio
+import sys
+
+import pytest
+
+from pymotion_bot import run_with_event_loop
+
+
+async def _loop_module():
+    return type(asyncio.get_running_loop()).__module__
+
+
+def test_default_loop_is_stdlib():
+    assert run_with_event_loop(_loop_module()).startswith("asyncio")
+
+
+def test_missing_uvloop_falls_back_to_asyncio(monkeypatch, caplog):
+    monkeypatch.setitem(sys.modules, "uvloop", None)  # makes the import fail
+    assert run_with_event_loop(_loop_module(), "uvloop").startswith("asyncio")
+    assert "uvloop is not installed" in caplog.text
+
+
+def test_uvloop_when_installed():
+    pytest.importorskip("uvloop")
+    assert run_with_event_loop(_loop_module(), "uvloop").startswith("uvloop")
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from fake_ircd import FakeIRCServer
+from pymotion_bot import IRCBot
+
+
+class BusyBot(IRCBot):
+    """Spends a little time on every queued line, like a plugin chain would."""
+
+    async def on_message(self, msg):
+        await asyncio.sleep(0.0005)
+
+
+def test_ping_answered_during_10k_line_flood_with_saturated_output():
+    async def scenario():
+        server = await FakeIRCServer(auto_welcome=False).start()
+        bot = BusyBot({"server": "127.0.0.1", "port": server.port, "ssl": False,
+                       "nick": "pybot", "realname": "test"})
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+        await server.wait_connected()
+
+        # Fill the outbound token bucket with channel chatter (~10s worth)
+        chatter = [asyncio.create_task(bot.send(f"PRIVMSG #chan :chatter {i}")) for i in range(20)]
+        server.send(*(f":n{i % 50}!u@h PRIVMSG #chan :flood line {i}" for i in range(10_000)))
+        server.send("PING :still-there")
+        pinged_at = time.monotonic()
+
+        assert await server.wait_for(lambda: "PONG :still-there" in server.sent_lines("PONG"), timeout=2.0)
+        pong_at = next(t for t, line in server.received if line == "PONG :still-there")
+        assert pong_at - pinged_at < 1.0
+        # The flood itself is still being worked through by the dispatcher
+        assert bot.inbound_stats["dispatched"] < 10_000
+
+        bot.connected = False
+        for task in chatter + [listener]:
+            task.cancel()
+        await asyncio.gather(*chatter, listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+import asyncio
+
+from plugins.admin import AdminPlugin
+from pymotion_bot import GCRA, InboundFloodControl, parse_irc_message
+
+
+def test_gcra_allows_a_burst_then_the_rate():
+    bucket = GCRA(rate=2.0, burst=3)
+    assert [bucket.allow("k", 0.0) for _ in range(4)] == [True, True, True, False]
+    assert not bucket.allow("k", 0.4)
+    assert bucket.allow("k", 0.5)
+    assert bucket.allow("other", 0.5)
+
+    bucket.prune(10.0)
+    assert bucket.tat == {}
+
+
+def test_lines_dropped_for_the_channel_do_not_charge_the_user():
+    limiter = InboundFloodControl(user={"command": {"rate": 0.01, "burst": 2}, "ambient": {"rate": 0.01, "burst": 2}},
+                                  channel={"command": {"rate": 0.01, "burst": 1}, "ambient": {"rate": 0.01, "burst": 1}})
+    assert limiter.check("u@h", "#a", True, 0.0) == "ok"
+    assert limiter.check("u@h", "#a", True, 0.0) == "drop"  # the channel is out; the user is not charged
+    assert limiter.check("u@h", "#b", True, 0.0) == "ok"
+    assert limiter.check("u@h", "#c", True, 0.0) == "warn"
+
+
+class Counter:
+    name, priority, enabled = "counter", 50, True
+
+    def __init__(self):
+        self.seen = []
+
+    async def handle_message(self, bot, nick, channel, message):
+        self.seen.append((nick, message))
+        return False
+
+
+def _pymotion(pymotion):
+    bot = pymotion(record=True, admins=["root"], inbound_flood={
+        "user": {"command": {"rate": 0.01, "burst": 2}, "ambient": {"rate": 0.01, "burst": 5}},
+        "channel": {"command": {"rate": 0.01, "burst": 100}, "ambient": {"rate": 0.01, "burst": 7}}})
+    counter = Counter()
+    bot.plugins = [counter]
+    return bot, counter
+
+
+def test_spammed_commands_are_dropped_with_one_warning(pymotion):
+    bot, counter = _pymotion(pymotion)
+
+    async def scenario():
+        for _ in range(5):
+            await bot.on_message(parse_irc_message(":spammer!u@spam.host PRIVMSG #chan :pybot kill bob"))
+        # A new nick from the same user@host shares the budget
+        await bot.on_message(parse_irc_message(":spammer2!u@spam.host PRIVMSG #chan :!rate ramones"))
+        for i in range(5):
+            await bot.handle_channel_message("root", "#chan", f"pybot status {i}")  # admins are exempt
+
+    asyncio.run(scenario())
+    assert [nick for nick, _ in counter.seen].count("spammer") == 2
+    assert "spammer2" not in {nick for nick, _ in counter.seen}
+    assert [nick for nick, _ in counter.seen].count("root") == 5
+    assert bot.sent == ["spammer: easy there, I'm ignoring you for a bit."]
+
+    stats = bot.inbound_flood.stats()
+    assert stats["dropped"] == 4
+    assert stats["top"]["u@spam.host"] == {"allowed": 2, "dropped": 4, "warned": 1}
+
+    bot.plugins = [AdminPlugin()]
+    asyncio.run(bot.handle_channel_message("alice", "#chan", "pybot status"))
+    assert bot.sent[-1].endswith("Flood-dropped: 4 (most: spammer2)")  # the nick, never the user@host
+
+
+def test_ambient_budgets_are_separate_and_per_channel(pymotion):
+    bot, counter = _pymotion(pymotion)
+
+    async def scenario():
+        for i in range(10):
+            await bot.handle_channel_message(f"user{i}", "#busy", "just chatting")
+        await bot.handle_channel_message("user1", "#busy", "pybot kill bob")  # commands have their own budget
+        await bot.handle_channel_message("user2", "#calm", "hello")
+
+    asyncio.run(scenario())
+    busy = [nick for nick, message in counter.seen if message == "just chatting"]
+    assert len(busy) == 7  # the channel's ambient burst; dropped silently
+    assert ("user1", "pybot kill bob") in counter.seen
+    assert ("user2", "hello") in counter.seen
+    assert bot.sent == []
+    assert bot.inbound_flood.stats()["top"]["#busy"]["dropped"] == 3
@@ -0,0 +1,180 @@
+import asyncio
+
+from fake_ircd import FakeIRCServer
+from pymotion_bot import IRCBot
+
+
+class SlowBot(IRCBot):
+    def __init__(self, config):
+        super().__init__(config)
+        self.seen = 0
+
+    async def on_message(self, msg):
+        self.seen += 1
+        await asyncio.sleep(0.01)
+
+
+def _config(port, **extra):
+    config = {"server": "127.0.0.1", "port": port, "ssl": False, "nick": "pybot", "realname": "test"}
+    config.update(extra)
+    return config
+
+
+def test_reader_keeps_reading_while_dispatch_is_slow():
+    async def scenario():
+        server = await FakeIRCServer(auto_welcome=False).start()
+        bot = SlowBot(_config(server.port))
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+        await server.wait_connected()
+
+        server.send(*(f":n!u@h PRIVMSG #chan :line {i}" for i in range(300)))
+        assert await server.wait_for(lambda: bot.inbound_stats["enqueued"] == 300, timeout=2.0)
+        assert bot.seen < 300
+        stats = bot.inbound_queue_stats()
+        assert stats["depth"] > 0
+        assert stats["latency"]["count"] >= 1
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_drop_oldest_policy_bounds_the_queue():
+    async def scenario():
+        server = await FakeIRCServer(auto_welcome=False).start()
+        bot = SlowBot(_config(server.port, inbound_queue={"max_size": 10, "overflow": "drop_oldest"}))
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+        await server.wait_connected()
+
+        server.send(*(f":n!u@h PRIVMSG #chan :line {i}" for i in range(200)))
+        assert await server.wait_for(lambda: bot.inbound_stats["enqueued"] == 200, timeout=2.0)
+        assert bot.inbound_stats["dropped"] > 0
+        assert bot.inbound_queue_stats()["depth"] <= 10
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+class LaneBot(IRCBot):
+    def __init__(self, config):
+        super().__init__(config)
+        self.log = []
+
+    async def on_message(self, msg):
+        if msg.command == "PRIVMSG":
+            if msg.params[0] == "#busy":
+                await asyncio.sleep(0.01)
+            self.log.append((msg.params[0], msg.params[1]))
+
+
+async def _lane_bot(**inbound_queue):
+    server = await FakeIRCServer(auto_welcome=False).start()
+    bot = LaneBot(_config(server.port, inbound_queue=inbound_queue))
+    await bot.connect()
+    listener = asyncio.create_task(bot.listen())
+    await server.wait_connected()
+    return server, bot, listener
+
+
+async def _stop(server, bot, listener):
+    bot.connected = False
+    listener.cancel()
+    await asyncio.gather(listener, return_exceptions=True)
+    await bot.disconnect()
+    await server.close()
+
+
+def test_quiet_channel_is_not_stuck_behind_a_flood():
+    async def scenario():
+        server, bot, listener = await _lane_bot()
+        server.send(*(f":n!u@h PRIVMSG #busy :line {i}" for i in range(50)))
+        server.send(":m!u@h PRIVMSG #quiet :hello", ":m!u@h PRIVMSG pybot :psst")
+        assert await server.wait_for(lambda: ("#quiet", "hello") in bot.log, timeout=0.3)
+        assert ("pybot", "psst") in bot.log
+        assert sum(1 for channel, _ in bot.log if channel == "#busy") < 50
+
+        assert await server.wait_for(lambda: len(bot.log) == 52, timeout=3.0)
+        busy = [text for channel, text in bot.log if channel == "#busy"]
+        assert busy == [f"line {i}" for i in range(50)]
+        await _stop(server, bot, listener)
+
+    asyncio.run(scenario())
+
+
+def test_lanes_are_capped_and_reaped_when_idle():
+    async def scenario():
+        server, bot, listener = await _lane_bot(lanes=2, lane_idle_seconds=0.05)
+        server.send(*(f":n!u@h PRIVMSG #c{i % 4} :line {i}" for i in range(40)))
+        assert await server.wait_for(lambda: len(bot.log) == 40, timeout=2.0)
+        for n in range(4):
+            assert [text for channel, text in bot.log if channel == f"#c{n}"] == \
+                [f"line {i}" for i in range(n, 40, 4)]
+
+        assert await server.wait_for(lambda: bot.inbound_queue_stats()["lanes"]["active"] == 0, timeout=1.0)
+        lanes = bot.inbound_queue_stats()["lanes"]
+        assert lanes["max_active"] == 2 and lanes["waited"] >= 2
+        assert lanes["reaped"] == lanes["started"]
+        await _stop(server, bot, listener)
+
+    asyncio.run(scenario())
+
+
+class Blocker:
+    name, priority, enabled = "blocker", 50, True
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.joins = []
+
+    async def handle_message(self, bot, nick, channel, message):
+        if message == "!block":
+            await self.release.wait()
+            return True
+        return False
+
+    async def handle_join(self, bot, nick, channel):
+        self.joins.append((nick, channel))
+
+
+def test_membership_keeps_arrival_order_across_lanes(pymotion):
+    async def scenario():
+        server = await FakeIRCServer(auto_welcome=False).start()
+        bot = pymotion(server="127.0.0.1", port=server.port, ssl=False, modes="", channels=[])
+        blocker = Blocker()
+        bot.plugins = [blocker]
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+        await server.wait_connected()
+
+        # #a's lane is stuck, so its JOINs would be dispatched after the
+        # QUIT and NICK that follow them on the server lane
+        server.send(":alice!u@h PRIVMSG #a :!block", ":carol!u@h JOIN #a", ":carol!u@h QUIT :bye",
+                    ":dave!u@h JOIN #a", ":dave!u@h NICK :david", ":david!u@h PRIVMSG #b :hi")
+        assert await server.wait_for(lambda: bot.inbound_stats["enqueued"] == 6, timeout=2.0)
+        users = bot.get_channel_state("#a").users
+        assert set(users) == {"alice", "david"} and users["david"].nick == "david"
+        assert blocker.joins == []  # membership is current before the lane gets there
+
+        blocker.release.set()
+        assert await server.wait_for(lambda: bot.inbound_stats["dispatched"] == 6, timeout=2.0)
+        assert set(bot.get_channel_state("#a").users) == {"alice", "david"}
+        assert blocker.joins == [("carol", "#a"), ("dave", "#a")]
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
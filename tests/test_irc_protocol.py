@@ -0,0 +1,51 @@
+from pymotion_bot import LineFramer, parse_irc_message
+
+
+def test_framer_handles_crlf_split_across_reads():
+    framer = LineFramer()
+
+    assert framer.feed(b"PING :abc\r") == []
+    assert framer.feed(b"\n:a!b@c PRIVMSG #x :hi\r\n:a!b@c") == ["PING :abc", ":a!b@c PRIVMSG #x :hi"]
+    assert framer.pending() == len(b":a!b@c")
+
+
+def test_framer_keeps_multibyte_utf8_split_across_reads():
+    framer = LineFramer()
+    payload = ":a!b@c PRIVMSG #x :café 🎸\r\n".encode("utf-8")
+    cut = payload.index("🎸".encode("utf-8")) + 2
+
+    assert framer.feed(payload[:cut]) == []
+    assert framer.feed(payload[cut:]) == [":a!b@c PRIVMSG #x :café 🎸"]
+
+
+def test_framer_accepts_bare_lf_and_skips_empty_lines():
+    framer = LineFramer()
+
+    assert framer.feed(b"PING :one\n\r\n\nPING :two\n") == ["PING :one", "PING :two"]
+
+
+def test_parse_privmsg_with_tags_and_source():
+    msg = parse_irc_message(
+        r"@time=2024-01-01T00:00:00.000Z;msgid=a\sb\:c :nick!user@host.example PRIVMSG #chan :hello :) world"
+    )
+
+    assert msg.command == "PRIVMSG"
+    assert (msg.nick, msg.user, msg.host) == ("nick", "user", "host.example")
+    assert msg.params == ["#chan", "hello :) world"]
+    assert msg.trailing == "hello :) world"
+    assert msg.tags == {"time": "2024-01-01T00:00:00.000Z", "msgid": "a b;c"}
+
+
+def test_parse_keeps_every_param():
+    msg = parse_irc_message(":irc.example.net 353 PyMotion = #chan :@op +voice plain")
+
+    assert msg.nick == "irc.example.net"
+    assert msg.params == ["PyMotion", "=", "#chan", "@op +voice plain"]
+
+
+def test_parse_without_source_or_trailing():
+    assert parse_irc_message("PING irc.example.net").params == ["irc.example.net"]
+    assert parse_irc_message("AUTHENTICATE +").params == ["+"]
+    assert parse_irc_message(":n!u@h JOIN #chan").params == ["#chan"]
+    assert parse_irc_message(":n!u@h QUIT").params == []
+    assert parse_irc_message(":lonely") is None
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+from fake_ircd import FakeIRCServer
+from pymotion_bot import IRCBot, plan_joins
+
+
+def test_plan_packs_keys_first_within_byte_limit():
+    channels = [(f"#channel-{i:03d}", None) for i in range(100)] + [("#secret", "hunter2"), ("#vault", "k2")]
+    lines = plan_joins(channels)
+    assert all(len(line.encode()) + 2 <= 512 for line in lines)
+    assert lines[0].startswith("JOIN #secret,#vault,#channel-000") and lines[0].endswith(" hunter2,k2")
+    joined = [c for line in lines for c in line.split(" ")[1].split(",")]
+    assert sorted(joined) == sorted(c for c, _ in channels)
+    assert len(lines) == 3
+
+
+def test_plan_respects_max_targets_and_line_limit():
+    channels = [(f"#c{i}", None) for i in range(10)]
+    assert [line.count(",") + 1 for line in plan_joins(channels, max_targets=4)] == [4, 4, 2]
+    assert all(len(line) + 2 <= 30 for line in plan_joins(channels, line_limit=30))
+
+
+def _pymotion(pymotion, port, channels):
+    return pymotion(server="127.0.0.1", port=port, ssl=False, modes="", channels=channels,
+                    flood_control={"adaptive": False})
+
+
+def test_500_configured_channels_join_in_a_few_lines(pymotion):
+    async def scenario():
+        server = await FakeIRCServer(isupport="CHANLIMIT=#:600 TARGMAX=PRIVMSG:4,JOIN:50").start()
+        channels = [f"#room{i}" for i in range(490)] + [{"name": f"#locked{i}", "key": f"key{i}"} for i in range(10)]
+        bot = _pymotion(pymotion, server.port, channels)
+        started = time.monotonic()
+        runner = asyncio.create_task(bot.run())
+
+        assert await server.wait_for(lambda: len(bot.join_confirmed) == 500, timeout=10)
+        elapsed = time.monotonic() - started
+        lines = server.sent_lines("JOIN")
+        assert len(lines) == 10  # TARGMAX JOIN:50
+        assert all(len(line.encode()) + 2 <= 512 for line in lines)
+        assert lines[0].endswith(" " + ",".join(f"key{i}" for i in range(10)))
+        assert not bot.join_pending and not bot.join_failed
+        # One line per channel would need ~250s at 2 lines/s
+        assert elapsed < 5.0
+
+        bot.request_stop()
+        await asyncio.wait_for(runner, timeout=5)
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_chanlimit_caps_joins(pymotion):
+    async def scenario():
+        server = await FakeIRCServer(isupport="CHANLIMIT=#:100").start()
+        bot = _pymotion(pymotion, server.port, [f"#room{i}" for i in range(150)])
+        runner = asyncio.create_task(bot.run())
+
+        assert await server.wait_for(lambda: len(bot.join_confirmed) == 100)
+        assert len(bot.join_failed) == 50 and set(bot.join_failed.values()) == {"CHANLIMIT"}
+        assert len(bot.channels) == 100
+
+        bot.request_stop()
+        await asyncio.wait_for(runner, timeout=5)
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_refused_joins_fail_or_retry():
+    async def scenario():
+        server = await FakeIRCServer().start()
+        server.join_errors = {"#banned": ["474 Cannot join channel (+b)"],
+                              "#busy": ["437 Channel is temporarily unavailable"]}
+        bot = IRCBot({"server": "127.0.0.1", "port": server.port, "ssl": False, "nick": "pybot",
+                      "realname": "test", "capabilities": [], "join_throttle": {"retry_after": 0.1}})
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+        await server.wait_for(lambda: bot.registered)
+
+        await bot.join_channels([("#ok", None), ("#banned", None), ("#busy", None)])
+        assert await server.wait_for(lambda: bot.join_confirmed == {"#ok", "#busy"})
+        assert server.sent_lines("JOIN") == ["JOIN #ok,#banned,#busy", "JOIN #busy"]
+        assert bot.join_failed["#banned"].startswith("474")
+        assert "#banned" not in bot.channels
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_join_throttle_paces_channels():
+    async def scenario():
+        server = await FakeIRCServer().start()
+        bot = IRCBot({"server": "127.0.0.1", "port": server.port, "ssl": False, "nick": "pybot",
+                      "realname": "test", "capabilities": [],
+                      "join_throttle": {"channels_per_second": 20, "burst": 5}})
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+        await server.wait_for(lambda: bot.registered)
+
+        started = time.monotonic()
+        await bot.join_channels([(f"#c{i}", None) for i in range(15)])
+        # 5 channels per line; after the first burst, 5 more every 0.25s
+        assert time.monotonic() - started >= 0.45
+        assert await server.wait_for(lambda: len(bot.join_confirmed) == 15)
+        assert [line.count(",") + 1 for line in server.sent_lines("JOIN")] == [5, 5, 5]
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from fake_ircd import FakeIRCServer
+from pymotion_bot import IRCBot
+
+
+def _bot(server, **keepalive):
+    return IRCBot({"server": "127.0.0.1", "port": server.port, "ssl": False,
+                   "nick": "pybot", "realname": "test", "capabilities": [],
+                   "keepalive": keepalive})
+
+
+def test_lag_is_measured_from_our_own_pings():
+    async def scenario():
+        server = await FakeIRCServer().start()
+        bot = _bot(server, interval=0.05)
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+
+        assert await server.wait_for(lambda: bot.lag_histogram.count >= 3)
+        assert all(line.startswith("PING :pymotion-") for line in server.sent_lines("PING"))
+        assert 0 < bot.lag < 0.5
+        assert bot.lag_histogram.snapshot()["p99"] < 0.5
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_silent_link_is_dropped_after_max_lag():
+    async def scenario():
+        server = await FakeIRCServer().start()
+        server.answer_pings = False
+        bot = _bot(server, interval=0.05, max_lag=0.3)
+        await bot.connect()
+        started = time.monotonic()
+
+        # listen() returning is what sends PyMotion.run() into its reconnect path
+        await asyncio.wait_for(bot.listen(), timeout=3)
+        assert time.monotonic() - started < 1.5
+        assert bot.lag_reconnects == 1
+
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_ambient_lines_wait_while_lagging():
+    async def scenario():
+        server = await FakeIRCServer().start()
+        bot = _bot(server, interval=0, ambient_max_lag=1.0)
+        await bot.connect()
+        listener = asyncio.create_task(bot.listen())
+
+        bot._ping_sent_at = time.monotonic() - 2.0  # a PONG overdue by 2s
+        assert bot.congested()
+        await bot.privmsg("#chan", "random chatter", ambient=True)
+        await bot.privmsg("#chan", "reply to a command")
+        assert await server.wait_for(lambda: "PRIVMSG #chan :reply to a command" in server.sent_lines())
+        await asyncio.sleep(0.2)
+        assert "PRIVMSG #chan :random chatter" not in server.sent_lines()
+        assert bot.outbound_queue_stats()["ambient"] == 1
+
+        bot._ping_sent_at = None  # PONG arrived
+        assert await server.wait_for(lambda: "PRIVMSG #chan :random chatter" in server.sent_lines())
+
+        bot.connected = False
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
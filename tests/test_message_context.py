@@ -0,0 +1,65 @@
+import asyncio
+
+from pymotion_bot import MessageContext, Plugin
+
+
+def test_derived_views(pymotion):
+    bot = pymotion(aliases=["motion"])
+    for nick in ("Alice", "Bob[x]", "carol"):
+        bot.get_user_state("#chan", nick)
+
+    ctx = MessageContext(bot, "carol", "#chan", "\x02Motion\x02, does \x0304,01ALICE\x03 know Carol?  ")
+    assert ctx.plain == "Motion, does ALICE know Carol?  "
+    assert ctx.folded == "motion, does alice know carol?  "
+    assert ctx.words == ("motion", "does", "alice", "know", "carol")
+    assert ctx.addressed and ctx.mentioned and ctx.addressing.which_alias == "motion"
+    assert ctx.mentioned_nicks == {"alice"}
+    assert ctx.is_question and not ctx.is_caps
+
+    shout = MessageContext(bot, "carol", "#chan", "WHY IS IT SO LOUD")
+    assert shout.is_caps and not shout.is_question and not shout.mentioned
+    assert not MessageContext(bot, "carol", "#chan", "OK!!").is_caps
+
+
+def test_views_are_computed_once(pymotion):
+    bot = pymotion(aliases=["motion"])
+    calls = []
+    real = bot.addressing
+    bot.addressing = lambda message: calls.append(message) or real(message)
+
+    ctx = MessageContext(bot, "alice", "#chan", "pybot: hi")
+    assert ctx.addressed and ctx.mentioned and ctx.addressing.stripped_text == "hi"
+    assert calls == ["pybot: hi"]
+    assert ctx.words is ctx.words
+
+
+def test_old_and_new_plugin_signatures_share_the_dispatch(pymotion):
+    bot = pymotion(aliases=["motion"])
+    seen = []
+
+    class OldStyle:
+        name, priority, enabled = "old", 60, True
+
+        async def handle_message(self, bot, nick, channel, message):
+            seen.append(("old", nick, channel, message))
+            return False
+
+    class Subclassed(Plugin):
+        async def handle_message(self, bot, nick, channel, message):
+            seen.append(("subclassed", message))
+            return False
+
+    class ContextStyle:
+        name, priority, enabled = "ctx", 40, True
+
+        async def handle_context(self, ctx):
+            seen.append(("ctx", ctx.nick, ctx.folded, ctx.is_question))
+            return True
+
+    bot.plugins = [OldStyle(), Subclassed("subclassed", 50), ContextStyle()]
+    asyncio.run(bot.handle_channel_message("Alice", "#chan", "Pybot: Ready?"))
+    assert seen == [
+        ("old", "Alice", "#chan", "Pybot: Ready?"),
+        ("subclassed", "Pybot: Ready?"),
+        ("ctx", "Alice", "pybot: ready?", True),
+    ]
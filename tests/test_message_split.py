@@ -0,0 +1,40 @@
+from pymotion_bot import IRCBot, split_message
+
+
+def test_split_breaks_on_words_within_byte_budget():
+    text = "the quick brown fox jumps over the lazy dog " * 20
+    chunks = split_message(text.strip(), 100)
+
+    assert all(len(chunk.encode("utf-8")) <= 100 for chunk in chunks)
+    assert " ".join(chunks) == text.strip()
+    assert not any(chunk.startswith(" ") or chunk.endswith(" ") for chunk in chunks)
+
+
+def test_split_never_cuts_inside_a_code_point_or_grapheme():
+    family = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+    text = ("日本語" * 40) + family * 10
+    chunks = split_message(text, 50)
+
+    assert "".join(chunks) == text
+    assert all(len(chunk.encode("utf-8")) <= 50 for chunk in chunks)
+    assert not any(chunk.startswith("‍") or chunk.endswith("‍") for chunk in chunks)
+
+    accented = "é" * 60
+    assert all(not chunk.startswith("́") for chunk in split_message(accented, 25))
+
+
+def test_split_turns_newlines_into_separate_lines():
+    assert split_message("one\ntwo\r\nthree", 400) == ["one", "two", "three"]
+
+
+def test_reply_budget_uses_learned_prefix_and_caps_line_count():
+    bot = IRCBot({"nick": "pybot", "max_reply_lines": 2})
+    worst_case = bot._text_budget("#chan")
+    bot.own_prefix = "pybot!~pybot@host.example"
+    assert bot._text_budget("#chan") == 512 - len(":pybot!~pybot@host.example PRIVMSG #chan :") - 2
+    assert bot._text_budget("#chan") > worst_case
+
+    chunks = bot._split_reply("#chan", "word " * 300)
+    assert len(chunks) == 2
+    assert chunks[-1].endswith("...")
+    assert all(len(c.encode("utf-8")) <= bot._text_budget("#chan") for c in chunks)
@@ -0,0 +1,101 @@
+import asyncio
+
+from pymotion_bot import NetsplitTracker, parse_irc_message
+
+
+def test_split_reasons():
+    assert NetsplitTracker.is_split_reason("*.net *.split")
+    assert NetsplitTracker.is_split_reason("hub.example.org leaf.example.org")
+    assert not NetsplitTracker.is_split_reason("Quit: see you.later")
+    assert not NetsplitTracker.is_split_reason("Ping timeout: 240 seconds")
+    assert not NetsplitTracker.is_split_reason("http://x.y a.b")
+
+
+class JoinRecorder:
+    name, priority, enabled = "joins", 50, True
+
+    def __init__(self):
+        self.joins = []
+
+    async def handle_message(self, bot, nick, channel, message):
+        return False
+
+    async def handle_join(self, bot, nick, channel):
+        self.joins.append((nick, channel))
+
+
+def _pymotion(pymotion):
+    bot = pymotion(netsplit={"settle": 0.01})
+    recorder = JoinRecorder()
+    bot.plugins = [recorder]
+    return bot, recorder
+
+
+async def _feed(bot, *lines):
+    for line in lines:
+        await bot.dispatch_message(parse_irc_message(line))
+
+
+def test_split_burst_is_applied_in_bulk_and_netjoin_is_quiet(pymotion):
+    bot, recorder = _pymotion(pymotion)
+    for channel in ("#a", "#b"):
+        for i in range(50):
+            bot.get_user_state(channel, f"user{i}")
+    bot.get_user_state("#a", "user7").friendship = 5
+
+    async def scenario():
+        await _feed(bot, *(f":user{i}!u@h QUIT :*.net *.split" for i in range(40)))
+        assert len(bot.get_channel_state("#a").users) == 50  # not yet: the burst is still open
+        await asyncio.sleep(0.05)
+        assert len(bot.get_channel_state("#a").users) == 10
+        assert len(bot.get_channel_state("#b").users) == 10
+        assert bot.netsplits.stats["bursts"] == 1
+
+        await _feed(bot, ":user7!u@h JOIN #a", ":user8!u@h JOIN #b", ":newbie!u@h JOIN #a")
+        assert recorder.joins == [("newbie", "#a")]
+        assert bot.get_user_state("#a", "user7").friendship == 5  # state survived the split
+        assert bot.netsplits.stats["restored"] == 2
+
+        await _feed(bot, ":user45!u@h QUIT :Quit: bye")
+        assert "user45" not in bot.get_channel_state("#b").users
+
+    asyncio.run(scenario())
+
+
+def test_rejoining_one_channel_still_applies_the_split_elsewhere(pymotion):
+    bot, recorder = _pymotion(pymotion)
+    for channel in ("#a", "#b"):
+        bot.get_user_state(channel, "alice")
+        bot.get_user_state(channel, "bob")
+
+    async def scenario():
+        await _feed(bot, ":alice!u@h QUIT :*.net *.split", ":bob!u@h QUIT :*.net *.split",
+                    ":alice!u@h JOIN #a")  # back in #a before the burst settles
+        await asyncio.sleep(0.05)
+        assert set(bot.get_channel_state("#a").users) == {"alice"}
+        assert set(bot.get_channel_state("#b").users) == set()
+
+        await _feed(bot, ":bob!u@h JOIN #b")  # after the burst: #b restored, #a stays parked
+        assert set(bot.get_channel_state("#b").users) == {"bob"}
+        assert "bob" not in bot.get_channel_state("#a").users
+        assert recorder.joins == []
+
+    asyncio.run(scenario())
+
+
+def test_batch_tags_mark_split_and_rejoin(pymotion):
+    bot, recorder = _pymotion(pymotion)
+    bot.get_user_state("#a", "alice")
+
+    async def scenario():
+        await _feed(bot, ":irc.test BATCH +s1 netsplit hub.test leaf.test",
+                        "@batch=s1 :alice!u@h QUIT :Remote host closed the connection")
+        assert "alice" in bot.get_channel_state("#a").users
+        await _feed(bot, ":irc.test BATCH -s1")
+        assert "alice" not in bot.get_channel_state("#a").users  # applied at the batch end
+
+        await _feed(bot, ":irc.test BATCH +j1 netjoin hub.test leaf.test", "@batch=j1 :bob!u@h JOIN #a")
+        assert recorder.joins == []
+        assert "bob" in bot.get_channel_state("#a").users
+
+    asyncio.run(scenario())
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+from fake_ircd import FakeIRCServer
+from pymotion_bot import NetworkHub, _handle_signal
+
+
+def _hub(write_config, networks, **extra):
+    config = {"ssl": False, "modes": "", "plugins": {"enabled": ["admin", "kill"]}, "networks": networks}
+    return NetworkHub(write_config(**{**config, **extra}))
+
+
+def test_networks_share_plugins_but_not_connection_state(write_config, tmp_path):
+    hub = _hub(write_config, [
+        {"name": "alpha", "server": "irc.alpha.test", "channels": ["#a"]},
+        {"name": "beta", "server": "irc.beta.test", "nick": "pybeta", "flood_control": {"rate": 4.0}},
+    ])
+    alpha, beta = hub.networks["alpha"], hub.networks["beta"]
+
+    assert alpha.network == "alpha" and beta.network == "beta"
+    assert alpha.plugins is beta.plugins is hub.plugins
+    assert {p.name for p in hub.plugins} == {"admin", "kill"}
+    assert alpha.opinions is beta.opinions
+    assert alpha.flood is not beta.flood and beta.flood.rate == 4.0
+    assert (alpha.config["nick"], beta.config["nick"]) == ("pybot", "pybeta")
+    assert beta.config["channels"] != ["#a"]
+
+    alpha.get_user_state("#a", "alice").friendship = 3
+    beta.get_user_state("#a", "bob").friendship = 5
+    hub.save_state()
+    saved = json.loads((tmp_path / "bot_state.json").read_text())
+    assert set(saved["_networks"]) == {"alpha", "beta"}
+    assert list(saved["_networks"]["alpha"]["#a"]["users"]) == ["alice"]
+
+    reloaded = _hub(write_config, [{"name": "alpha"}, {"name": "beta"}])
+    assert reloaded.networks["beta"].get_user_state("#a", "bob").friendship == 5
+    assert "alice" not in reloaded.networks["beta"].get_channel_state("#a").users
+
+
+def test_single_network_state_file_migrates_to_first_network(write_config, tmp_path):
+    (tmp_path / "bot_state.json").write_text(json.dumps({
+        "#old": {"mood": 0.9, "topic": "", "users": {}}, "_opinions": {"pie": {"sentiment": 1}},
+    }))
+    hub = _hub(write_config, [{"name": "first"}, {"name": "second"}])
+    assert hub.networks["first"].get_channel_state("#old").mood == 0.9
+    assert "#old" not in hub.networks["second"].channels_state
+    assert hub.networks["second"].opinions["pie"]["sentiment"] == 1
+
+
+def test_plugin_state_stays_on_its_network(write_config):
+    hub = _hub(write_config, [{"name": "alpha"}, {"name": "beta"}],
+               plugins={"enabled": ["shutup", "ai_response"]})
+    ai = next(plugin for plugin in hub.plugins if plugin.name == "ai_response")
+    ai.enabled = True
+    ai.config.update(response_probability=1.0, cooldown_seconds=60)
+    contexts = []
+
+    async def reply(prompt, context):
+        contexts.append(context)
+        return "sure"
+    ai._get_response_with_retries = reply
+
+    sent = []
+    for net in hub.networks.values():
+        async def record(target, text, ambient=False, network=net.network):
+            sent.append((network, text))
+        net.privmsg = net.action = record
+    alpha, beta = hub.networks["alpha"], hub.networks["beta"]
+
+    async def scenario():
+        await alpha.handle_channel_message("alice", "#chat", "pybot: hello")
+        await beta.handle_channel_message("alice", "#chat", "pybot: hi")  # another alice, own cooldown
+        await alpha.handle_channel_message("carol", "#chat", "pybot shut up")
+        await beta.handle_channel_message("bob", "#chat", "pybot: still there?")
+        await alpha.handle_channel_message("dave", "#chat", "pybot: hello?")
+
+    asyncio.run(scenario())
+    assert [text for network, text in sent if network == "beta"] == ["sure", "sure"]
+    assert [text for network, text in sent if network == "alpha"][:1] == ["sure"]
+    assert len([network for network, _ in sent if network == "alpha"]) == 2  # the reply, then the sulk
+    assert contexts == ["", "", "Recent conversation: alice: pybot: hi | Bot: sure"]
+
+
+def test_plugin_loops_run_per_network(write_config):
+    hub = _hub(write_config, [{"name": "alpha"}, {"name": "beta"}], plugins={"enabled": ["liljon"]})
+    liljon = hub.plugins[0]
+    alpha, beta = hub.networks["alpha"], hub.networks["beta"]
+
+    async def scenario():
+        await alpha.start_plugins()
+        await beta.start_plugins()
+        await alpha.start_plugins()  # a reconnect does not start a second loop
+        assert set(liljon._passive_tasks) == {"alpha", "beta"}
+        assert len(alpha.background_tasks) == len(beta.background_tasks) == 1
+
+        await alpha._cancel_background_tasks()  # alpha disconnects
+        assert liljon._passive_tasks["alpha"].done()
+        assert not liljon._passive_tasks["beta"].done()
+        await alpha.start_plugins()
+        assert not liljon._passive_tasks["alpha"].done()
+        await hub._loader.cleanup_plugins()
+        assert liljon._passive_tasks == {}
+
+    asyncio.run(scenario())
+
+
+def test_hub_runs_both_connections_and_shuts_down(write_config):
+    async def scenario():
+        server_a = await FakeIRCServer("irc.alpha.test").start()
+        server_b = await FakeIRCServer("irc.beta.test").start()
+        hub = _hub(write_config, [
+            {"name": "alpha", "server": "127.0.0.1", "port": server_a.port, "channels": ["#a"]},
+            {"name": "beta", "server": "127.0.0.1", "port": server_b.port, "channels": ["#b"]},
+        ])
+        runner = asyncio.create_task(hub.run())
+
+        assert await server_a.wait_for(lambda: "JOIN #a" in server_a.sent_lines("JOIN"))
+        assert await server_b.wait_for(lambda: "JOIN #b" in server_b.sent_lines("JOIN"))
+        assert "JOIN #b" not in server_a.sent_lines("JOIN")
+
+        _handle_signal(hub)  # SIGTERM: stops every network without a stray task
+        await asyncio.wait_for(runner, timeout=5)
+        await server_a.close()
+        await server_b.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from pymotion_bot import parse_irc_message
+
+
+@pytest.fixture
+def bot(pymotion):
+    bot = pymotion()
+    bot.plugins = []
+    return bot
+
+
+def test_membership_follows_join_part_kick_nick_quit(bot):
+
+    async def scenario():
+        for line in (":irc.test 353 pybot = #a :@pybot Op_Guy +Voice|x [Bracket]",
+                     ":carol!u@h JOIN #a", ":carol!u@h JOIN #b", ":dave!u@h JOIN #a"):
+            await bot.dispatch_message(parse_irc_message(line))
+        bot.get_user_state("#a", "carol").friendship = 3
+
+        await bot.dispatch_message(parse_irc_message(":carol!u@h NICK :Caroline"))
+        await bot.dispatch_message(parse_irc_message(":op_guy!u@h KICK #a dave :bye"))
+        await bot.dispatch_message(parse_irc_message(":voice|x!u@h PART #a"))
+
+    asyncio.run(scenario())
+    assert set(bot.get_channel_state("#a").users) == {"op_guy", "{bracket}", "caroline"}
+    assert set(bot.get_channel_state("#b").users) == {"caroline"}
+    moved = bot.get_channel_state("#a").users["caroline"]
+    assert moved.nick == "Caroline" and moved.friendship == 3
+
+
+def test_filter_finds_nicks_with_punctuation(bot):
+    for nick in ("Op_Guy", "[Bracket]", "some-one", "alice"):
+        bot.get_user_state("#a", nick)
+
+    def filtered(text):
+        return bot.contains_other_usernames("#a", "alice", text)
+
+    assert filtered("ask op_guy about it")
+    assert filtered("is {bracket}'s bot broken?")  # same nick under rfc1459 casemapping
+    assert filtered("SOME-ONE: hi")
+    assert not filtered("alice here, anyone around?")  # the speaker
+    assert not filtered("someone said op guy")
+    assert not filtered("pybot: tell op_guy hi")  # commands to the bot pass
+
+
+def test_rfc1459_bot_names_and_self_detection(bot):
+    bot.config['nick'] = "Py[Bot]"
+    bot.get_user_state("#a", "py{bot}")  # a stale entry for ourselves under the folded key
+    bot.get_user_state("#a", "alice")
+    seen = []
+
+    class Joins:
+        name, priority, enabled = "joins", 50, True
+
+        async def handle_join(self, bot, nick, channel):
+            seen.append(nick)
+
+    bot.plugins = [Joins()]
+    asyncio.run(bot.handle_join("PY{BOT}", "#a"))
+    assert seen == []
+    assert not bot.contains_other_usernames("#a", "alice", "anyone seen py{bot} today?")
@@ -0,0 +1,122 @@
+import asyncio
+
+from fake_ircd import FakeIRCServer
+from pymotion_bot import FloodLimiter, IRCBot, OutboundScheduler
+
+
+def _bot(port):
+    return IRCBot({"server": "127.0.0.1", "port": port, "ssl": False, "nick": "pybot", "realname": "test"})
+
+
+def test_writer_coalesces_eligible_lines_and_confirms_each():
+    async def scenario():
+        server = await FakeIRCServer(auto_welcome=False).start()
+        bot = _bot(server.port)
+        bot.flood.tokens = bot.flood.burst = 10.0
+        await bot.connect()
+        await server.wait_connected()
+        await asyncio.sleep(0.05)  # let NICK/USER go out
+        writes_before = bot.outbound_stats["writes"]
+
+        futures = [bot.queue_line(f"PRIVMSG #chan :line {i}") for i in range(6)]
+        assert await asyncio.gather(*futures) == [True] * 6
+        assert bot.outbound_stats["writes"] - writes_before == 1
+        assert await server.wait_for(lambda: len(server.sent_lines("PRIVMSG")) == 6)
+
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_send_does_not_block_caller_when_out_of_tokens():
+    async def scenario():
+        server = await FakeIRCServer(auto_welcome=False).start()
+        bot = _bot(server.port)
+        await bot.connect()
+        await server.wait_connected()
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(10):
+            await bot.send(f"PRIVMSG #chan :line {i}")
+        assert loop.time() - started < 0.1
+
+        bot.flood.rate = 50.0
+        assert await bot.send("PRIVMSG #chan :confirmed", wait=True) is True
+        assert await server.wait_for(lambda: server.sent_lines("PRIVMSG")[-1:] == ["PRIVMSG #chan :confirmed"])
+
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_fair_scheduler_bounds_reply_latency_across_20_channels():
+    scheduler = OutboundScheduler()
+    rate = 2.0  # lines/sec, the default flood budget
+
+    # A kill "overkill" style sequence floods one channel first...
+    for i in range(200):
+        scheduler.push("#busy", ("#busy", i), len(f"PRIVMSG #busy :overkill line number {i}") + 2)
+    # ...then 19 other channels each queue a short reply
+    for n in range(19):
+        for i in range(3):
+            channel = f"#quiet{n}"
+            scheduler.push(channel, (channel, i), len(f"PRIVMSG {channel} :reply {i}") + 2)
+
+    order = [scheduler.pop() for _ in range(len(scheduler))]
+    assert scheduler.pop() is None
+
+    last_quiet = max(pos for pos, (channel, _) in enumerate(order) if channel != "#busy")
+    worst_latency = (last_quiet + 1) / rate
+    # FIFO would have made every quiet channel wait behind all 200 busy lines (100s)
+    assert last_quiet < 100
+    assert worst_latency < 50
+    # Order within each channel is preserved
+    for channel in {c for c, _ in order}:
+        seq = [i for c, i in order if c == channel]
+        assert seq == sorted(seq)
+
+
+def test_outbound_stats_report_per_target_depth():
+    async def scenario():
+        server = await FakeIRCServer(auto_welcome=False).start()
+        bot = _bot(server.port)
+        await bot.connect()
+        await server.wait_connected()
+        bot.flood.tokens = 0.0
+        for channel in ("#a", "#b", "#b"):
+            bot.queue_line(f"PRIVMSG {channel} :hi")
+
+        stats = bot.outbound_queue_stats()
+        assert stats["targets"] == {"#a": 1, "#b": 2}
+        assert stats["peak_target_depth"] == 2
+
+        bot.flood.rate = 100.0
+        await bot.disconnect()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_flood_limiter_ramps_when_quiet_and_backs_off_on_flood():
+    limiter = FloodLimiter(rate=2.0, ramp_step=0.5, ramp_interval=10.0)
+    start = limiter.last_adjust
+
+    limiter.wait_time()  # ran out of tokens during the interval
+    limiter.maybe_ramp_up(start + 11.0)
+    assert limiter.rate == 2.5
+
+    limiter.maybe_ramp_up(start + 22.0)  # never saturated since: hold
+    assert limiter.rate == 2.5
+
+    limiter.on_throttle("ERROR: Closing Link (Excess Flood)")
+    limiter.on_throttle("disconnected while rate limited")  # same incident
+    assert limiter.rate == 1.25
+    assert limiter.throttle_count == 1
+    assert limiter.tokens == 0.0
+
+    restored = FloodLimiter()
+    restored.restore(limiter.to_dict())
+    assert restored.rate == 1.25
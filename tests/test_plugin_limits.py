@@ -0,0 +1,86 @@
+import asyncio
+
+from pymotion_bot import PluginBreaker
+
+
+def test_breaker_trips_and_backs_off_exponentially():
+    breaker = PluginBreaker(threshold=2, window=10, base_delay=5, max_delay=12)
+    assert breaker.record_failure("boom", 0.0) is None
+    assert breaker.record_failure("boom", 20.0) is None  # first one aged out of the window
+    assert breaker.record_failure("boom", 21.0) == 5
+    assert not breaker.allow(25.0)
+
+    assert breaker.allow(26.0) and breaker.state == "half_open"
+    assert breaker.record_failure("still broken", 26.0) == 10  # the probe failed
+    assert breaker.allow(36.0)
+    assert breaker.record_failure("still broken", 36.0) == 12  # capped at max_delay
+    assert "3 trips" in breaker.describe(40.0)
+
+    assert breaker.allow(48.0)
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.describe(48.0) == "closed"
+    breaker.record_failure("again", 49.0)
+    assert breaker.record_failure("again", 49.5) == 5  # backoff starts over
+
+
+class Stuck:
+    name, priority, enabled = "stuck", 80, True
+
+    def __init__(self):
+        self.cancelled = 0
+
+    async def handle_message(self, bot, nick, channel, message):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+class Echo:
+    name, priority, enabled = "echo", 10, True
+
+    async def handle_message(self, bot, nick, channel, message):
+        await bot.privmsg(channel, f"echo {message}")
+        return True
+
+
+def test_overrunning_plugin_is_cancelled_then_tripped(pymotion):
+    bot = pymotion(record=True, admins=["root"],
+                   plugin_limits={"budgets": {"handle_message": 0.05},
+                                  "breaker": {"threshold": 2, "base_delay": 60}})
+    stuck = Stuck()
+    bot.plugins = [bot.plugins[0], stuck, Echo()]
+
+    async def scenario():
+        for i in range(3):
+            await bot.handle_channel_message("alice", "#chan", f"hello {i}")
+        assert bot.sent == ["echo hello 0", "echo hello 1", "echo hello 2"]
+        assert stuck.cancelled == 2  # the third message skipped it
+        assert bot.plugin_breaker("stuck").state == "open"
+
+        bot.sent.clear()
+        await bot.handle_channel_message("root", "#chan", "pybot: plugins")
+        assert any(line.startswith("🧯 Breakers [1]: stuck (open 60s, 1 trips") for line in bot.sent)
+
+        await bot.reload_config_and_plugins()
+        assert bot.plugin_breaker_report() == {}
+
+    asyncio.run(scenario())
+
+
+class SlowUpstream:
+    name, priority, enabled = "upstream", 50, True
+
+    async def handle_message(self, bot, nick, channel, message):
+        raise asyncio.TimeoutError("upstream API timed out")
+
+
+def test_plugins_own_timeouts_are_ordinary_errors(pymotion):
+    bot = pymotion(record=True)
+    plugin = SlowUpstream()
+    for budget in (0, 5):
+        bot.config['plugin_limits'] = {"budgets": {"handle_message": budget}}
+        asyncio.run(bot.run_plugin_hook(plugin, "handle_message", plugin.handle_message, bot, "alice", "#chan", "hi"))
+    stats = bot.profiler.hook("upstream", "handle_message")
+    assert (stats.exceptions, stats.timeouts) == (2, 0)
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+
+class Claims:
+    name, priority, enabled = "claims", 50, True
+
+    async def handle_message(self, bot, nick, channel, message):
+        if message == "boom":
+            raise ValueError("boom")
+        return message.startswith("mine")
+
+    async def handle_join(self, bot, nick, channel):
+        return False
+
+
+class TwoPhase:
+    name, priority, enabled = "twophase", 40, True
+
+    def match(self, ctx):
+        return ctx.message if ctx.message == "claim me" else None
+
+    async def respond(self, claim):
+        pass
+
+
+def test_hooks_are_counted_and_dumped(pymotion, tmp_path):
+    bot = pymotion(record=True, admins=["root"])
+    bot.plugins = [bot.plugins[0], Claims(), TwoPhase()]
+
+    async def scenario():
+        for message in ("hello", "mine now", "boom", "claim me"):
+            await bot.handle_channel_message("alice", "#chan", message)
+        await bot.handle_join("bob", "#chan")
+        await asyncio.gather(*bot.background_tasks)
+
+        hooks = bot.profiler.snapshot()["plugins"]
+        assert hooks["claims"]["handle_message"]["calls"] == 4
+        assert hooks["claims"]["handle_message"]["claims"] == 1
+        assert hooks["claims"]["handle_message"]["exceptions"] == 1
+        assert hooks["claims"]["handle_join"]["calls"] == 1
+        assert hooks["twophase"]["match"]["calls"] == 3
+        assert hooks["twophase"]["match"]["claims"] == 1
+        assert hooks["twophase"]["respond"]["calls"] == 1
+
+        await bot.handle_channel_message("root", "#chan", "pybot perf claims")
+        assert bot.sent[-1].startswith("⏱️ Plugin perf (0m): claims.handle_join 1 calls/0 claims")
+        assert "claims.handle_message 4 calls/1 claims" in bot.sent[-1]
+        assert "1 errors, 0 timeouts" in bot.sent[-1]
+
+        bot.dump_plugin_profile()
+        dumped = json.loads((tmp_path / "plugin_profile.json").read_text())
+        assert dumped["plugins"]["claims"]["handle_message"]["calls"] == 4
+        assert set(dumped["plugins"]["claims"]["handle_message"]) >= {"p50", "p95", "p99", "total"}
+
+        await bot.handle_channel_message("root", "#chan", "pybot perf reset")
+        assert bot.profiler.hooks == {}
+
+    asyncio.run(scenario())
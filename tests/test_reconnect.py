@@ -0,0 +1,65 @@
+import asyncio
+
+from fake_ircd import FakeIRCServer
+
+
+def _bot(pymotion, port):
+    return pymotion(server="127.0.0.1", port=port, ssl=False, modes="",
+                    channels=["#one", {"name": "#two", "key": "sekrit"}],
+                    plugins={"enabled": ["admin", "kill"]})
+
+
+def test_reconnect_keeps_plugins_and_rejoins_from_memory(pymotion):
+    async def scenario():
+        server = await FakeIRCServer().start()
+        bot = _bot(pymotion, server.port)
+        calls = {"start_plugins": 0, "load_state": 0, "cleanup": 0}
+
+        def counting(name, original):
+            def wrapper(*args, **kwargs):
+                calls[name] += 1
+                return original(*args, **kwargs)
+            return wrapper
+
+        bot.start_plugins = counting("start_plugins", bot.start_plugins)
+        bot.load_state = counting("load_state", bot.load_state)
+        bot.cleanup_plugins = counting("cleanup", bot.cleanup_plugins)
+        plugins = list(bot.plugins)
+        runner = asyncio.create_task(bot.run())
+
+        assert await server.wait_for(lambda: server.sent_lines("JOIN") == ["JOIN #two,#one sekrit"])
+        bot.channels.add("#joined-later")
+        server.drop_client()
+
+        assert await server.wait_for(lambda: bot.reconnect_stats["last_rejoin_seconds"] is not None)
+        assert bot.reconnect_stats["last_rejoin_seconds"] < 1.0
+        assert server.connections == 2
+        assert server.sent_lines("JOIN")[1:] == ["JOIN #two,#joined-later,#one sekrit"]
+        assert calls == {"start_plugins": 1, "load_state": 1, "cleanup": 0}
+        assert bot.plugins == plugins
+
+        bot.request_stop()
+        await asyncio.wait_for(runner, timeout=5)
+        assert calls["cleanup"] == 1
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_parted_channels_are_not_rejoined(pymotion):
+    async def scenario():
+        server = await FakeIRCServer().start()
+        bot = _bot(pymotion, server.port)
+        runner = asyncio.create_task(bot.run())
+
+        assert await server.wait_for(lambda: bot.join_confirmed == {"#one", "#two"})
+        server.send(":pybot!bot@fake.host PART #one :bye",
+                    ":op!o@h KICK #two pybot :out")
+        assert await server.wait_for(lambda: not bot.channels)
+        assert bot.channel_keys == {}
+
+        bot.request_stop()
+        await asyncio.wait_for(runner, timeout=5)
+        await server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+import asyncio
+
+from pymotion_bot import TriggerIndex
+
+
+class Recorder:
+    def __init__(self, name, priority=50, **declared):
+        self.name = name
+        self.priority = priority
+        self.enabled = True
+        self.seen = []
+        for attr, value in declared.items():
+            setattr(self, attr, value)
+
+    async def handle_message(self, bot, nick, channel, message):
+        self.seen.append(message)
+        return False
+
+
+def test_literals_patterns_and_nick_placeholder():
+    play = Recorder("play", keywords=["play"])
+    playing = Recorder("playing", keywords=["playing"])
+    named = Recorder("named", keywords=["{nick}"])
+    holiday = Recorder("holiday", keyword_patterns=[r"(?i)\bpie\b", r"\sor\s"])
+    ambient = Recorder("ambient")
+    never = Recorder("never", keywords=[])
+    index = TriggerIndex([play, playing, named, holiday, ambient, never], ["PyBot", "pyb"])
+
+    assert index.always == {ambient}
+    assert index.matches("now PLAYING: something") == {play, playing}
+    assert index.matches("hey pyb, how goes") == {named}
+    assert index.matches("PyBot!") == {named}
+    assert index.matches("I want PIE") == {holiday}
+    assert index.matches("tea or coffee") == {holiday}
+    assert index.matches("piece of cake") == set()
+
+
+def test_bad_pattern_makes_the_plugin_always_run():
+    broken = Recorder("broken", keyword_patterns=["(unclosed"])
+    index = TriggerIndex([broken], ["pybot"])
+    assert broken in index.always
+
+
+def test_dispatch_skips_plugins_whose_keywords_are_absent(pymotion):
+    bot = pymotion()
+    fire = Recorder("fire", keywords=["fire"])
+    ambient = Recorder("ambient")
+    bot.plugins = [fire, ambient]
+
+    asyncio.run(bot.handle_channel_message("alice", "#chan", "just chatting"))
+    asyncio.run(bot.handle_channel_message("alice", "#chan", "pybot fire cake at bob"))
+    assert fire.seen == ["pybot fire cake at bob"]
+    assert len(ambient.seen) == 2
+
+    # Nick changes (433 suffix) and plugin reloads rebuild the index
+    named = Recorder("named", keywords=["{nick}"])
+    bot.plugins = [named]
+    bot.config['nick'] = "pybot_"
+    asyncio.run(bot.handle_channel_message("alice", "#chan", "pybot_: hi"))
+    assert named.seen == ["pybot_: hi"]
+
+
+def test_prefilter_can_be_switched_off(pymotion):
+    bot = pymotion(plugins={"enabled": ["admin"], "prefilter": False})
+    fire = Recorder("fire", keywords=["fire"])
+    bot.plugins = [fire]
+    asyncio.run(bot.handle_channel_message("alice", "#chan", "just chatting"))
+    assert fire.seen == ["just chatting"]
+
+
+def test_shipped_plugins_still_see_their_commands(pymotion):
+    bot = pymotion(plugins={"enabled": []})
+    index = bot.trigger_index()
+    by_name = {plugin.name: plugin for plugin in bot.plugins}
+    commands = {
+        "kill": "pybot kill bob", "cancel": "pybot cancel bob", "makeme": "pybot make me a sandwich",
+        "projectile": "pybot fire pie at bob", "decision": "pybot should I sleep or code?",
+        "stealth": "pybot sneak", "punkrating": "!rate ramones", "liljon": "!GETCRUNK",
+        "questions": "pybot why?", "greetings": "hi pybot", "music": "what are you listening to",
+        "karma_reaction": "pybot++", "admin": "!kill", "styx_cat": "what's my cat's name",
+    }
+    for name, message in commands.items():
+        plugin = by_name[name]
+        assert plugin in index.matches(message) or plugin in index.always, name
+    assert by_name["actions"] not in index.matches("pybot kill bob")
@@ -0,0 +1,60 @@
+import asyncio
+
+
+class SlowClaimer:
+    name, priority, enabled = "slow", 60, True
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.done = []
+
+    def match(self, ctx):
+        return ctx if ctx.message.startswith("!slow") else None
+
+    async def respond(self, ctx):
+        await self.release.wait()
+        self.done.append(ctx.message)
+
+
+class Fallback:
+    name, priority, enabled = "fallback", 10, True
+
+    def __init__(self):
+        self.seen = []
+
+    async def handle_message(self, bot, nick, channel, message):
+        self.seen.append(message)
+        return False
+
+
+def test_claimed_reply_runs_in_background_and_stops_the_chain(pymotion):
+    bot = pymotion(record=True, plugins={"enabled": ["admin"]})
+
+    async def scenario():
+        slow, fallback = SlowClaimer(), Fallback()
+        bot.plugins = [slow, fallback]
+        await asyncio.wait_for(bot.handle_channel_message("alice", "#chan", "!slow one"), timeout=1)
+        await asyncio.wait_for(bot.handle_channel_message("alice", "#chan", "just chatting"), timeout=1)
+
+        assert fallback.seen == ["just chatting"]  # claimed line never reached it
+        assert slow.done == [] and len(bot.background_tasks) == 1
+
+        slow.release.set()
+        await asyncio.gather(*bot.background_tasks)
+        assert slow.done == ["!slow one"] and not bot.background_tasks
+
+    asyncio.run(scenario())
+
+
+def test_makeme_claims_without_waiting_for_its_pauses(pymotion):
+    bot = pymotion(record=True, plugins={"enabled": ["makeme"]})
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bot.handle_channel_message("alice", "#chan", "pybot make me a sandwich")
+        assert loop.time() - started < 0.2
+        assert [task.get_name() for task in bot.background_tasks] == ["makeme.respond"]
+        await bot._cancel_background_tasks()
+
+    asyncio.run(scenario())